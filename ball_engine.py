@@ -0,0 +1,198 @@
+"""
+Struct-of-arrays ball store for modes with thousands of balls.
+
+BallArray keeps x/y/dx/dy/debounce of every ball in NumPy arrays and runs
+Ball.move, Ball.check_collision and goal scoring as batched array
+operations with the same rules (moving-toward test, snap-out, 8-frame
+debounce, dy clamp). NumPy is optional: the classic modes keep using
+pong_game.Ball and only chaos mode needs it.
+"""
+import pygame
+
+from pong_game import WIDTH, HEIGHT, WHITE, BALL_RADIUS, BALL_SPEED
+
+try:
+    import numpy as np
+except ImportError:  # chaos mode is unavailable without numpy
+    np = None
+
+BALL_DIAMETER = BALL_RADIUS * 2
+MAX_DY = BALL_SPEED * 1.5
+HIT_DEBOUNCE_FRAMES = 8
+
+
+class BallView:
+    """Read-only stand-in for a Ball, enough for ai_move to aim at."""
+
+    __slots__ = ("x", "y", "dx", "dy")
+
+    def __init__(self, x, y, dx, dy):
+        self.x = x
+        self.y = y
+        self.dx = dx
+        self.dy = dy
+
+
+class BallArray:
+    def __init__(self, capacity, rng=None):
+        if np is None:
+            raise ImportError("BallArray needs numpy (pip install numpy)")
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.dx = np.zeros(capacity)
+        self.dy = np.zeros(capacity)
+        self.debounce = np.zeros(capacity, dtype=np.int32)
+        # positions at the start of the last tick, for render interpolation
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        # numpy stream derived from the match ball rng so seeded matches replay exactly
+        seed = rng.getrandbits(64) if rng is not None else None
+        self.np_rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def add(self, x, y, dx, dy):
+        """Append one ball; returns False when the store is full."""
+        i = self.count
+        if i >= self.capacity:
+            return False
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.dx[i] = dx
+        self.dy[i] = dy
+        self.debounce[i] = 0
+        self.count = i + 1
+        return True
+
+    def spawn(self, x=50, y=HEIGHT // 2):
+        """Append a ball with the same start velocity as Ball()."""
+        dy = BALL_SPEED if self.np_rng.random() < 0.5 else -BALL_SPEED
+        return self.add(x, y, BALL_SPEED, dy)
+
+    def spawn_burst(self, n, x=WIDTH // 2):
+        """Append up to n balls spread along a vertical line, heading both ways."""
+        start = self.count
+        n = min(n, self.capacity - start)
+        end = start + n
+        rng = self.np_rng
+        self.x[start:end] = x
+        self.y[start:end] = rng.uniform(BALL_RADIUS, HEIGHT - BALL_RADIUS, n)
+        self.prev_x[start:end] = self.x[start:end]
+        self.prev_y[start:end] = self.y[start:end]
+        self.dx[start:end] = rng.choice((-BALL_SPEED, BALL_SPEED), n)
+        self.dy[start:end] = rng.uniform(-MAX_DY, MAX_DY, n)
+        self.debounce[start:end] = 0
+        self.count = end
+        return n
+
+    # ----- Batched Ball.move -----
+    def move(self):
+        n = self.count
+        x, y, dy, debounce = self.x[:n], self.y[:n], self.dy[:n], self.debounce[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        x += self.dx[:n]
+        y += dy
+
+        # wall bounce
+        bounce = (y - BALL_RADIUS <= 0) | (y + BALL_RADIUS >= HEIGHT)
+        np.negative(dy, out=dy, where=bounce)
+
+        # decay hit debounce
+        np.subtract(debounce, 1, out=debounce, where=debounce > 0)
+
+    # ----- Batched Ball.check_collision -----
+    def collide(self, paddle, is_left_paddle):
+        """
+        Same contract as Ball.check_collision, for every ball at once.
+        Returns the number of legitimate hits this call.
+        """
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        rect = paddle.rect
+
+        # quick circle-rect overlap via each ball's integer AABB
+        left = np.trunc(x - BALL_RADIUS)
+        top = np.trunc(y - BALL_RADIUS)
+        overlap = ((left < rect.right) & (left + BALL_DIAMETER > rect.left)
+                   & (top < rect.bottom) & (top + BALL_DIAMETER > rect.top))
+        idx = np.flatnonzero(overlap)
+        if idx.size == 0:
+            return 0
+
+        bx = self.x[idx]
+        bdx = self.dx[idx]
+        if is_left_paddle:
+            edge = rect.right + BALL_RADIUS
+            toward = bdx < 0
+            # moving away only separates; debounced and legit hits snap to the edge
+            self.x[idx] = np.where(toward, edge, np.maximum(bx, edge))
+        else:
+            edge = rect.left - BALL_RADIUS
+            toward = bdx > 0
+            self.x[idx] = np.where(toward, edge, np.minimum(bx, edge))
+
+        hits = idx[toward & (self.debounce[idx] == 0)]
+        if hits.size == 0:
+            return 0
+
+        # reflect X velocity, add angle from the contact point, clamp dy
+        self.dx[hits] *= -1
+        offset = (self.y[hits] - rect.centery) / (rect.height / 2)
+        self.dy[hits] = np.clip(self.dy[hits] + offset * 2, -MAX_DY, MAX_DY)
+        self.debounce[hits] = HIT_DEBOUNCE_FRAMES
+        return int(hits.size)
+
+    # ----- Scoring -----
+    def score(self):
+        """
+        Reset every ball that left the screen to a fresh Ball() start.
+        Returns (goals for left player, goals for right player).
+        """
+        n = self.count
+        x = self.x[:n]
+        out_left = x < 0
+        out_right = x > WIDTH
+        left_goals = int(np.count_nonzero(out_right))
+        right_goals = int(np.count_nonzero(out_left))
+        if left_goals or right_goals:
+            gone = np.flatnonzero(out_left | out_right)
+            self.x[gone] = self.prev_x[gone] = 50
+            self.y[gone] = self.prev_y[gone] = HEIGHT // 2
+            self.dx[gone] = BALL_SPEED
+            self.dy[gone] = self.np_rng.choice((-BALL_SPEED, BALL_SPEED), gone.size)
+            self.debounce[gone] = 0
+        return left_goals, right_goals
+
+    # ----- AI support -----
+    def ai_view(self):
+        """[BallView] of the closest ball heading right, or [] (ai_move's target)."""
+        n = self.count
+        if n == 0:
+            return []
+        incoming = self.dx[:n] > 0
+        if not incoming.any():
+            return []
+        i = int(np.argmax(np.where(incoming, self.x[:n], -np.inf)))
+        return [BallView(float(self.x[i]), float(self.y[i]), float(self.dx[i]), float(self.dy[i]))]
+
+    def positions(self, alpha=1.0):
+        """Integer draw positions, interpolated between the last two ticks by alpha."""
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        if alpha < 1.0:
+            x = self.prev_x[:n] + (x - self.prev_x[:n]) * alpha
+            y = self.prev_y[:n] + (y - self.prev_y[:n]) * alpha
+        return x.astype(int), y.astype(int)
+
+    def draw(self, screen, alpha=1.0):
+        """Draw every ball; returns the drawn rects."""
+        xs, ys = self.positions(alpha)
+        circle = pygame.draw.circle
+        return [circle(screen, WHITE, (px, py), BALL_RADIUS) for px, py in zip(xs.tolist(), ys.tolist())]
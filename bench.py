@@ -0,0 +1,306 @@
+"""
+Scripted performance benchmarks with regression thresholds.
+
+Every scenario runs the real simulation and drawing code under the SDL
+dummy video driver (no window, same software blits) with a scripted
+left paddle, and reports:
+
+    fps              frames (or stage builds) per second
+    p99_ms           99th percentile frame time
+    blocks_per_frame net allocated memory blocks per frame (sys.getallocatedblocks),
+                     the smaller of the two halves of the run, so it doesn't
+                     depend on --frames
+    gc_per_kframe    generation-0 collections per 1000 frames: object churn
+
+menu_idle sits in interface.main_menu for a second and reports CPU use;
+ball_memory reports the bytes one pooled Ball costs (tracemalloc).
+
+    python bench.py                       # run, compare with bench_baseline.json
+    python bench.py --only pong_1000 campaign_late
+    python bench.py --update-baseline     # accept the current numbers
+
+Exits 1 when a scenario is slower, has a worse p99, allocates more or
+idles hotter or has heavier balls than the baseline by more than --tolerance. Timings are per
+machine: refresh the baseline on the machine that runs the comparison.
+Scenarios measured with a different --frames than the baseline are
+skipped, not compared.
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+from array import array
+
+import pygame
+
+import session
+from pong_game import BallPool, draw_match, WIDTH, HEIGHT, BALL_SPEED
+from campaign import draw_campaign, generate_random_bricks, MAX_BALLS as MAX_SPLIT_BALLS
+from render import Renderer
+from simulation import Match, Inputs
+from text_cache import get_font
+from tournament import tracking_bot
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+TOLERANCE = 0.25        # allowed relative slowdown / growth before a metric counts as a regression
+BLOCKS_SLACK = 2.0      # absolute blocks/frame always allowed on top of the baseline
+P99_SLACK_MS = 1.0      # absolute p99 jitter allowed (scheduler noise dominates sub-ms frames)
+FRAMES = 600
+WARMUP_FRAMES = 300     # unmeasured frames first: long enough for the pools and caches to fill
+SEED = 1
+
+
+# ---------------------- Scenarios ----------------------
+# Each scenario is a function returning a per-frame callable.
+
+def scatter(ball, rng, left, right, directions=(-BALL_SPEED, BALL_SPEED)):
+    """Give a freshly served ball its own spot and course, so N balls on the table really are N balls."""
+    ball.x, ball.y = rng.uniform(left, right), rng.uniform(20, HEIGHT - 20)
+    ball.prev_x, ball.prev_y = ball.x, ball.y
+    ball.dx, ball.dy = rng.choice(directions), rng.uniform(-BALL_SPEED, BALL_SPEED)
+    return ball
+
+
+def pong_scenario(balls, ball_collisions=False):
+    """start_game play with `balls` balls on the table, topped back up after each round."""
+    def setup():
+        screen = session.get_screen()
+        renderer = Renderer(screen)
+        font = get_font(None, 36)
+        inputs = Inputs()
+        match = Match("ai", seed=SEED, difficulty="Hard", ball_collisions=ball_collisions)
+
+        def frame():
+            nonlocal match
+            if match.state.done:
+                match = Match("ai", seed=SEED, difficulty="Hard", ball_collisions=ball_collisions)
+            if len(match.balls) < balls:
+                match.balls.extend(scatter(match.ball_pool.acquire(), match.ball_rng, 30, WIDTH - 30)
+                                   for _ in range(balls - len(match.balls)))
+            match.step(tracking_bot(match, inputs))
+            draw_match(renderer, match, font)
+            renderer.present()
+        return frame
+    return setup
+
+
+def campaign_late():
+    """run_campaign at stage 20: full brick field, kept at campaign.MAX_BALLS balls as if fully split."""
+    screen = session.get_screen()
+    renderer = Renderer(screen)
+    inputs = Inputs()
+    match = Match("campaign", seed=SEED, stage=20)
+
+    def frame():
+        nonlocal match
+        if match.state.done or match.state.stage > 20:
+            match = Match("campaign", seed=SEED, stage=20)
+        while len(match.balls) < MAX_SPLIT_BALLS:  # splits spawn at the serve line, heading for the bricks
+            match.balls.append(scatter(match.ball_pool.acquire(), match.ball_rng, 40, 60, (BALL_SPEED,)))
+        match.step(tracking_bot(match, inputs))
+        draw_campaign(renderer, match)
+        renderer.present()
+    return frame
+
+
+def generate_high_stage():
+    """One generate_random_bricks call at stage 40 per 'frame'."""
+    rng = random.Random(SEED)
+
+    def frame():
+        generate_random_bricks(40, rng=rng)
+    return frame
+
+
+def ball_collide_200():
+    """One BallCollider.collide over 200 balls spread across the table and moving, per 'frame'."""
+    from collision import BallCollider
+    rng = random.Random(SEED)
+    pool = BallPool(rng)
+    balls = [scatter(pool.acquire(), rng, 30, WIDTH - 30) for _ in range(200)]
+    collider = BallCollider()
+
+    def frame():
+        for ball in balls:
+            ball.move()
+            if ball.x < 0 or ball.x > WIDTH:
+                ball.dx = -ball.dx  # no goals: the same 200 balls all the time
+        collider.collide(balls)
+    return frame
+
+
+def vec_env_64():
+    """One VecEnv.step of 64 headless pong instances per 'frame' (fps x 64 = env-steps/s)."""
+    from vec_env import VecEnv
+    env = VecEnv(64, seed=SEED)
+    actions = env.actions  # all zeros: the agent stands still
+
+    def frame():
+        env.step(actions)
+    return frame
+
+
+SCENARIOS = {
+    "pong_1": pong_scenario(1),
+    "pong_16": pong_scenario(16),
+    "pong_100": pong_scenario(100),
+    "pong_1000": pong_scenario(1000),
+    "pong_100_collide": pong_scenario(100, ball_collisions=True),
+    "campaign_late": campaign_late,
+    "generate_stage40": generate_high_stage,
+    "ball_collide_200": ball_collide_200,
+    "vec_env_64": vec_env_64,
+}
+
+
+def run_frames(setup, frames):
+    frame = setup()
+    for _ in range(WARMUP_FRAMES):  # warm caches (sprites, fonts, text, ball pools) before measuring
+        frame()
+    gc.collect()
+    times = array("d", bytes(8 * frames))  # preallocated so recording doesn't count as allocation
+    half = frames // 2
+    gen0_before = gc.get_stats()[0]["collections"]
+    blocks = [sys.getallocatedblocks()]
+    start = time.perf_counter()
+    for i in range(frames):
+        if i == half:
+            blocks.append(sys.getallocatedblocks())
+        t0 = time.perf_counter()
+        frame()
+        times[i] = time.perf_counter() - t0
+    elapsed = time.perf_counter() - start
+    blocks.append(sys.getallocatedblocks())
+    gen0 = gc.get_stats()[0]["collections"] - gen0_before
+    times = sorted(times)
+    # a steady leak grows both halves; a one-off (a cache filling, a new match) lands in only one
+    grown = min(blocks[1] - blocks[0], blocks[2] - blocks[1])
+    return {
+        "fps": frames / elapsed,
+        "p99_ms": times[min(frames - 1, frames * 99 // 100)] * 1000,
+        "blocks_per_frame": max(grown, 0) / half,
+        "gc_per_kframe": gen0 * 1000 / frames,
+        "frames": frames,
+    }
+
+
+def menu_idle(seconds=1.0):
+    """CPU share used by the main menu while nobody touches a key."""
+    import interface
+    session.get_screen()
+    pygame.time.set_timer(pygame.QUIT, int(seconds * 1000), 1)
+    wall, cpu = time.perf_counter(), time.process_time()
+    interface.main_menu()  # closes the session when the QUIT arrives
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return {"cpu_pct": cpu / wall * 100}
+
+
+def ball_memory(count=10000):
+    """Bytes per Ball handed out by a BallPool, and the bytes a recycled one adds (should be 0)."""
+    import tracemalloc
+    pool = BallPool(random.Random(SEED))
+    balls = []
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    balls.extend(pool.acquire() for _ in range(count))
+    per_ball = (tracemalloc.get_traced_memory()[0] - before) / count
+    pool.release_all(balls)
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(count):
+        pool.release(pool.acquire())
+    recycled = (tracemalloc.get_traced_memory()[0] - before) / count
+    tracemalloc.stop()
+    return {"bytes_per_ball": per_ball, "recycled_bytes_per_ball": recycled}
+
+
+# ---------------------- Comparison ----------------------
+def regressions(name, result, base, tolerance):
+    """Human-readable list of metrics that got worse than `base` allows."""
+    found = []
+    if "fps" in base and result["fps"] < base["fps"] * (1 - tolerance):
+        found.append(f"{name}: fps {result['fps']:.0f} < baseline {base['fps']:.0f}")
+    if "p99_ms" in base and result["p99_ms"] > base["p99_ms"] * (1 + tolerance) + P99_SLACK_MS:
+        found.append(f"{name}: p99 {result['p99_ms']:.2f} ms > baseline {base['p99_ms']:.2f} ms")
+    if "blocks_per_frame" in base and \
+            result["blocks_per_frame"] > base["blocks_per_frame"] * (1 + tolerance) + BLOCKS_SLACK:
+        found.append(f"{name}: {result['blocks_per_frame']:.1f} blocks/frame > baseline {base['blocks_per_frame']:.1f}")
+    if "bytes_per_ball" in base and result["bytes_per_ball"] > base["bytes_per_ball"] * (1 + tolerance):
+        found.append(f"{name}: {result['bytes_per_ball']:.0f} bytes/ball > baseline {base['bytes_per_ball']:.0f}")
+    if result.get("recycled_bytes_per_ball", 0) > 1:
+        found.append(f"{name}: recycling a ball allocates {result['recycled_bytes_per_ball']:.0f} bytes")
+    if "cpu_pct" in base and result["cpu_pct"] > base["cpu_pct"] * (1 + tolerance) + 1:
+        found.append(f"{name}: idle cpu {result['cpu_pct']:.1f}% > baseline {base['cpu_pct']:.1f}%")
+    return found
+
+
+def format_result(result):
+    return "  ".join(f"{k} {v:.2f}" if isinstance(v, float) else f"{k} {v}" for k, v in result.items())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the benchmark scenarios and compare with the baseline.")
+    parser.add_argument("--only", nargs="+", metavar="SCENARIO", choices=sorted(SCENARIOS) + ["menu_idle", "ball_memory"])
+    parser.add_argument("--frames", type=int, default=FRAMES, help="measured frames per scenario")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    names = args.only or list(SCENARIOS) + ["menu_idle", "ball_memory"]
+    results = {}
+    for name in names:
+        if name == "menu_idle":
+            results[name] = menu_idle()
+        elif name == "ball_memory":
+            results[name] = ball_memory()
+        else:
+            results[name] = run_frames(SCENARIOS[name], args.frames)
+        print(f"{name:18} {format_result(results[name])}")
+    session.close()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"baseline updated: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --update-baseline first")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    failed = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        if baseline[name].get("frames", result.get("frames")) != result.get("frames"):
+            # restarts and spikes land differently in a shorter or longer run
+            print(f"SKIPPED {name}: baseline measured {baseline[name]['frames']} frames, not {result['frames']}")
+            continue
+        failed += regressions(name, result, baseline[name], args.tolerance)
+    for line in failed:
+        print("REGRESSION", line)
+    if not failed:
+        print("no regressions against", args.baseline)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Array-backed brick storage for the campaign.
+
+BrickField keeps brick rects, remaining hits and the indestructible flag in
+compact arrays with an alive bitmask, and buckets bricks into a uniform grid
+so a ball only tests the bricks in the cells its box touches. Removing a
+brick is a bit clear instead of list.remove, and every contact of a frame is
+resolved in brick order, so results are deterministic.
+
+For drawing, the field keeps an off-screen layer with every brick on it and
+only repaints the cells of bricks that changed state.
+"""
+from array import array
+
+import pygame
+
+from pong_game import BALL_RADIUS, WIDTH, HEIGHT
+
+GRID_CELL = 64  # px; bricks are 20x40 and balls 30x30, so a box spans at most 2x2 cells
+
+
+def resolve_collision(ball, left, top, right, bottom):
+    """
+    Pushes the ball completely outside the rect and reverses velocity
+    along the axis of least overlap.
+    """
+    overlap_left = ball.x + BALL_RADIUS - left
+    overlap_right = right - (ball.x - BALL_RADIUS)
+    overlap_top = ball.y + BALL_RADIUS - top
+    overlap_bottom = bottom - (ball.y - BALL_RADIUS)
+
+    # Find the minimum overlap to separate ball
+    min_overlap = min(overlap_left, overlap_right, overlap_top, overlap_bottom)
+    ball.intercept = None  # the AI's cached prediction no longer holds
+
+    if min_overlap == overlap_left:
+        ball.x = left - BALL_RADIUS
+        ball.dx = -abs(ball.dx)
+    elif min_overlap == overlap_right:
+        ball.x = right + BALL_RADIUS
+        ball.dx = abs(ball.dx)
+    elif min_overlap == overlap_top:
+        ball.y = top - BALL_RADIUS
+        ball.dy = -abs(ball.dy)
+    elif min_overlap == overlap_bottom:
+        ball.y = bottom + BALL_RADIUS
+        ball.dy = abs(ball.dy)
+
+
+class BrickField:
+    def __init__(self, cell_size=GRID_CELL):
+        self.cell_size = cell_size
+        self.x = array("i")
+        self.y = array("i")
+        self.w = array("i")
+        self.h = array("i")
+        self.hits = array("b")
+        self.indestructible = bytearray()
+        self.alive = 0  # bit i set while brick i is alive
+        self.alive_count = 0
+        self.grid = {}  # (col, row) -> brick indices in insertion order
+        self.changed = []  # bricks hit since the renderer last looked
+        self._layer = None  # off-screen surface with every alive brick, built on first use
+
+    @classmethod
+    def from_bricks(cls, bricks, cell_size=GRID_CELL):
+        """Build a field from campaign.Brick objects (e.g. generate_random_bricks)."""
+        field = cls(cell_size)
+        for brick in bricks:
+            r = brick.rect
+            field.add(r.x, r.y, r.width, r.height, brick.hits, brick.indestructible)
+        return field
+
+    def __len__(self):
+        return self.alive_count
+
+    def add(self, x, y, w, h, hits=1, indestructible=False):
+        i = len(self.x)
+        self.x.append(x)
+        self.y.append(y)
+        self.w.append(w)
+        self.h.append(h)
+        self.hits.append(hits)
+        self.indestructible.append(1 if indestructible else 0)
+        self.alive |= 1 << i
+        self.alive_count += 1
+
+        cs = self.cell_size
+        for col in range(x // cs, (x + w - 1) // cs + 1):
+            for row in range(y // cs, (y + h - 1) // cs + 1):
+                self.grid.setdefault((col, row), []).append(i)
+        return i
+
+    def is_alive(self, i):
+        return (self.alive >> i) & 1 == 1
+
+    def rect(self, i):
+        return pygame.Rect(self.x[i], self.y[i], self.w[i], self.h[i])
+
+    def indices(self):
+        """Alive brick indices in insertion order."""
+        alive = self.alive
+        return [i for i in range(len(self.x)) if (alive >> i) & 1]
+
+    def query(self, left, top, right, bottom):
+        """Sorted alive brick indices whose grid cells touch the box [left, right) x [top, bottom)."""
+        cs = self.cell_size
+        grid = self.grid
+        alive = self.alive
+        c0, c1 = left // cs, (right - 1) // cs
+        r0, r1 = top // cs, (bottom - 1) // cs
+        if c0 == c1 and r0 == r1:
+            return [i for i in grid.get((c0, r0), ()) if (alive >> i) & 1]
+        found = set()
+        for col in range(c0, c1 + 1):
+            for row in range(r0, r1 + 1):
+                found.update(grid.get((col, row), ()))
+        return sorted(i for i in found if (alive >> i) & 1)
+
+    def overlaps(self, x, y, w, h):
+        """True if the rect (x, y, w, h) overlaps any alive brick (same test as Rect.colliderect)."""
+        for i in self.query(x, y, x + w, y + h):
+            bx, by = self.x[i], self.y[i]
+            if x < bx + self.w[i] and x + w > bx and y < by + self.h[i] and y + h > by:
+                return True
+        return False
+
+    def hit(self, i, ball):
+        """Same rules as campaign.Brick.hit. Returns True if the brick died."""
+        resolve_collision(ball, self.x[i], self.y[i], self.x[i] + self.w[i], self.y[i] + self.h[i])
+        if self.indestructible[i]:
+            return False
+        self.hits[i] -= 1
+        self.changed.append(i)
+        if self.hits[i] <= 0:
+            self.alive &= ~(1 << i)
+            self.alive_count -= 1
+            return True
+        return False
+
+    def collide(self, ball):
+        """
+        Resolve every brick the ball overlaps this frame, in brick order.
+        Each candidate is re-tested after earlier pushes moved the ball.
+        Returns the number of bricks hit.
+        """
+        left = int(ball.x - BALL_RADIUS)
+        top = int(ball.y - BALL_RADIUS)
+        size = BALL_RADIUS * 2
+        contacts = 0
+        for i in self.query(left, top, left + size, top + size):
+            bx, by = self.x[i], self.y[i]
+            if left < bx + self.w[i] and left + size > bx and top < by + self.h[i] and top + size > by:
+                self.hit(i, ball)
+                contacts += 1
+                left = int(ball.x - BALL_RADIUS)
+                top = int(ball.y - BALL_RADIUS)
+        return contacts
+
+    def take_changed(self):
+        """Indices of bricks hit (damaged or destroyed) since the last call."""
+        changed = self.changed
+        self.changed = []
+        return changed
+
+    def draw(self, screen, area=None):
+        """Draw alive bricks, or only those touching `area` (a pygame.Rect)."""
+        if area is None:
+            indices = self.indices()
+        else:
+            indices = self.query(area.left, area.top, area.right, area.bottom)
+        for i in indices:
+            self._draw_brick(screen, i)
+
+    def _draw_brick(self, surface, i):
+        rect = (self.x[i], self.y[i], self.w[i], self.h[i])
+        if self.indestructible[i]:
+            pygame.draw.rect(surface, (50, 50, 50), rect, width=4)  # thicker border for walls
+        elif self.hits[i] == 2:
+            pygame.draw.rect(surface, (200, 100, 100), rect, width=2)
+        else:
+            pygame.draw.rect(surface, (200, 200, 200), rect, width=2)
+
+    # ----- Static brick layer -----
+    def layer(self):
+        """
+        The whole field pre-rendered on a black screen-sized surface, drawn
+        once per stage; blit it instead of filling the background.
+        """
+        if self._layer is None:
+            layer = pygame.Surface((WIDTH, HEIGHT))
+            if pygame.display.get_surface() is not None:
+                layer = layer.convert()
+            layer.fill((0, 0, 0))
+            self.draw(layer)
+            self._layer = layer
+        return self._layer
+
+    def repaint(self, i):
+        """Bring brick i up to date on the layer (damaged or destroyed). Returns its rect."""
+        rect = self.rect(i)
+        if self._layer is not None:
+            self._layer.fill((0, 0, 0), rect)
+            if self.is_alive(i):
+                self._draw_brick(self._layer, i)
+        return rect
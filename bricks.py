@@ -1,45 +1,19 @@
-import pygame
+"""
+Preset progressive brick layouts (levels 1-10).
 
+Layouts are built on first use instead of at import; `python level_pack.py
+presets` stores them as a binary level pack. The playable Brick class lives
+in campaign.py.
+"""
 BRICK_WIDTH = 20
 BRICK_HEIGHT = 40
 BRICK_COLOR = (200, 50, 50)
 
-class Brick:
-    def __init__(self, x, y, hits=1, indestructible=False):
-        self.rect = pygame.Rect(x, y, BRICK_WIDTH, BRICK_HEIGHT)
-        self.hits = hits
-        self.indestructible = indestructible
-        self.alive = True
+PRESET_COUNT = 10
 
-    def hit(self):
-        if self.indestructible:
-            return
-        self.hits -= 1
-        if self.hits <= 0:
-            self.alive = False
 
-    def draw(self, screen):
-        if not self.alive:
-            return
-        if self.indestructible:
-            color = (50, 50, 50)  # wall
-        elif self.hits == 2:
-            color = (200, 100, 100)  # strong brick
-        else:
-            color = (200, 200, 200)  # normal
-        pygame.draw.rect(screen, color, self.rect)
-
-
-
-
-
-import random
-
-
-
-# Progressive levels
-LEVELS = []
-for level in range(1, 11):  # Levels 1-10
+def level_layout(level):
+    """Top-left (x, y) of every brick in preset level 1..PRESET_COUNT."""
     bricks = []
     cols = min(level, 5)  # max 5 columns
     rows = 10 + level      # rows grow with level
@@ -50,6 +24,13 @@ for level in range(1, 11):  # Levels 1-10
             y = r * BRICK_HEIGHT
             if y + BRICK_HEIGHT < 600:  # stay inside screen height
                 bricks.append((x, y))
+    return bricks
 
-    LEVELS.append(bricks)
 
+def __getattr__(name):
+    # LEVELS used to be built at import; keep the name, build it on first access
+    if name == "LEVELS":
+        levels = [level_layout(level) for level in range(1, PRESET_COUNT + 1)]
+        globals()["LEVELS"] = levels
+        return levels
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,19 +1,18 @@
 import pygame, random
-from pong_game import Ball, Paddle, WIDTH, HEIGHT, BALL_RADIUS, PADDLE_SPEED
+from pong_game import Ball, Paddle, WIDTH, HEIGHT, BALL_RADIUS, PADDLE_SPEED, RENDER_FPS
+from brick_field import BrickField, resolve_collision
+from level_pack import LevelPack
+import session
+from menu import show_screen, centered
+from text_cache import get_font, render_text
+from sprites import ball_batch, paddle_batch, blit_batch
+from intercept import plan_target
 import os
 
 def load_highscore():
-    if os.path.exists("highscore.txt"):
-        with open("highscore.txt", "r") as f:
-            try:
-                return int(f.read().strip())
-            except:
-                return 0
-    return 0
-
-def save_highscore(score):
-    with open("highscore.txt", "w") as f:
-        f.write(str(score))   
+    """Best stage reached, from the leaderboard's in-memory cache (see leaderboard.py)."""
+    from leaderboard import get_leaderboard
+    return get_leaderboard().best_stage()
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 
@@ -24,8 +23,20 @@ LIVES_PER_STAGE = 3
 BRICK_WIDTH = 20
 BRICK_HEIGHT = 40
 FPS = 60    
+
+# Stage difficulty curve (measured with tournament.py): chance = min(base + step * stage, max)
+BRICK_TUNING = {
+    "wall_base": 0.1, "wall_step": 0.02, "wall_max": 0.3,        # indestructible bricks
+    "strong_base": 0.3, "strong_step": 0.05, "strong_max": 0.5,  # 2-hit bricks
+}
+PREFETCH_STAGES = 2  # upcoming stages built in the background during play
+LEVEL_PACK = "stages.pack"  # curated stages played first, if the file exists (see level_pack.py)
+# Campaign AI: same keys as pong_game.AI_PROFILES
+CAMPAIGN_AI = {"error": 25, "smoothing": 3, "speed_offset": -1}
 # ---------------------- Brick Class ----------------------
 class Brick:
+    __slots__ = ("rect", "hits", "indestructible", "alive")
+
     def __init__(self, x, y, hits=1, indestructible=False):
         self.rect = pygame.Rect(x, y, BRICK_WIDTH, BRICK_HEIGHT)
         self.hits = hits
@@ -53,27 +64,7 @@ class Brick:
         Pushes the ball completely outside the brick and reverses velocity.
         Works for destructible and indestructible bricks.
         """
-        overlap_left = ball.x + BALL_RADIUS - self.rect.left
-        overlap_right = self.rect.right - (ball.x - BALL_RADIUS)
-        overlap_top = ball.y + BALL_RADIUS - self.rect.top
-        overlap_bottom = self.rect.bottom - (ball.y - BALL_RADIUS)
-
-        # Find the minimum overlap to separate ball
-        min_overlap = min(overlap_left, overlap_right, overlap_top, overlap_bottom)
-
-        if min_overlap == overlap_left:
-            ball.x = self.rect.left - BALL_RADIUS
-            ball.dx = -abs(ball.dx)
-        elif min_overlap == overlap_right:
-            ball.x = self.rect.right + BALL_RADIUS
-            ball.dx = abs(ball.dx)
-        elif min_overlap == overlap_top:
-            ball.y = self.rect.top - BALL_RADIUS
-            ball.dy = -abs(ball.dy)
-        elif min_overlap == overlap_bottom:
-            ball.y = self.rect.bottom + BALL_RADIUS
-            ball.dy = abs(ball.dy)
-
+        resolve_collision(ball, self.rect.left, self.rect.top, self.rect.right, self.rect.bottom)
 
     def draw(self, screen):
         if not self.alive:
@@ -93,93 +84,149 @@ class Brick:
 
 # ---------------------- Random Brick Generator ----------------------
 # ---------------------- Random Brick Generator ----------------------
-def generate_random_bricks(stage_index, right_clearance=80):
-    bricks = []
-    row_count = min(random.randint(5 + stage_index//2, 9 + stage_index//2), 13)  # cap at 13
-    wall_chance = min(0.1 + 0.02 * stage_index, 0.3)
-    strong_chance = min(0.3 + 0.05 * stage_index, 0.5)
+def generate_brick_field(stage_index, right_clearance=80, rng=random, tuning=None):
+    """
+    Random stage straight into a BrickField. The field's grid doubles as the
+    occupancy index, so the overlap check only looks at bricks in nearby
+    cells instead of every brick placed so far. Draws from `rng` in exactly
+    the same order as always, so a given rng state yields the same stage.
+    """
+    t = BRICK_TUNING if tuning is None else tuning
+    field = BrickField()
+    row_count = min(rng.randint(5 + stage_index//2, 9 + stage_index//2), 13)  # cap at 13
+    wall_chance = min(t["wall_base"] + t["wall_step"] * stage_index, t["wall_max"])
+    strong_chance = min(t["strong_base"] + t["strong_step"] * stage_index, t["strong_max"])
 
     for r in range(row_count):
         # shift bricks so they don’t spawn flush against the right paddle
-        x = WIDTH - right_clearance - (r + 1) * (BRICK_WIDTH + random.randint(15, 30))
+        x = WIDTH - right_clearance - (r + 1) * (BRICK_WIDTH + rng.randint(15, 30))
 
         y = 0
         last_y = -100
 
         while y < HEIGHT - BRICK_HEIGHT:
             density_factor = 0.2 + 0.3 * (r / row_count)
-            if random.random() < density_factor:
-                indestructible = random.random() < wall_chance
-                hits = 1 if indestructible else (2 if random.random() < strong_chance else 1)
-                new_brick_rect = pygame.Rect(x, y, BRICK_WIDTH, BRICK_HEIGHT)
-
-                # check collision and vertical spacing
-                collision = any(new_brick_rect.colliderect(b.rect) for b in bricks)
-                if not collision and y - last_y >= BRICK_HEIGHT + 5:
-                    bricks.append(Brick(x, y, hits, indestructible))
+            if rng.random() < density_factor:
+                indestructible = rng.random() < wall_chance
+                hits = 1 if indestructible else (2 if rng.random() < strong_chance else 1)
+
+                # check vertical spacing and collision with nearby bricks
+                if y - last_y >= BRICK_HEIGHT + 5 and not field.overlaps(x, y, BRICK_WIDTH, BRICK_HEIGHT):
+                    field.add(x, y, BRICK_WIDTH, BRICK_HEIGHT, hits, indestructible)
                     last_y = y
 
-            y += BRICK_HEIGHT + random.randint(5, 20)
+            y += BRICK_HEIGHT + rng.randint(5, 20)
+
+    return field
 
-    return bricks
 
+def generate_random_bricks(stage_index, right_clearance=80, rng=random, tuning=None):
+    """generate_brick_field as a list of Brick objects."""
+    field = generate_brick_field(stage_index, right_clearance, rng, tuning)
+    return [Brick(field.x[i], field.y[i], field.hits[i], bool(field.indestructible[i])) for i in field.indices()]
 
 
+# ---------------------- Stage Pregeneration ----------------------
+def stage_rng(stage_seed, stage_index):
+    """Independent random stream per stage, so any stage can be built ahead of time."""
+    return random.Random(f"{stage_seed}:{stage_index}")
 
 
+def build_stage(stage_seed, stage_index, tuning=None, pack=None):
+    """Stage stage_index from `pack` (a level_pack.LevelPack) if it has one, else generated."""
+    if pack is not None and stage_index <= len(pack):
+        return pack.load(stage_index - 1)
+    return generate_brick_field(stage_index, rng=stage_rng(stage_seed, stage_index), tuning=tuning)
+
+
+class StagePrefetcher:
+    """
+    Builds the next PREFETCH_STAGES stages on a background thread while the
+    current one is played, so clearing a stage just swaps in a ready field.
+    """
+
+    def __init__(self, stage_seed, tuning=None, ahead=PREFETCH_STAGES, pack=None):
+        from concurrent.futures import ThreadPoolExecutor  # only the interactive campaign needs it
+        self.stage_seed = stage_seed
+        self.tuning = tuning
+        self.pack = pack
+        self.ahead = ahead
+        self.pending = {}  # stage index -> Future[BrickField]
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stage-prefetch")
+
+    def prefetch(self, stage_index):
+        """Queue stage_index .. stage_index + ahead - 1 if they aren't already."""
+        for stage in range(stage_index, stage_index + self.ahead):
+            if stage not in self.pending:
+                self.pending[stage] = self.executor.submit(build_stage, self.stage_seed, stage, self.tuning, self.pack)
+
+    def take(self, stage_index):
+        """The field for stage_index (waiting for it only if the worker is behind)."""
+        future = self.pending.pop(stage_index, None)
+        field = future.result() if future is not None else build_stage(self.stage_seed, stage_index, self.tuning, self.pack)
+        self.prefetch(stage_index + 1)
+        return field
+
+    def close(self):
+        """Drop queued builds and wait out the one running, so the pack can be closed right after."""
+        self.pending.clear()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
 
 # ---------------------- Reset Stage ----------------------
-def reset_stage(stage_index):
-    balls = [Ball()]
+def reset_stage(stage_index, rng=random, tuning=None, bricks=None, pool=None, balls=None):
+    if pool is None:
+        balls = [Ball(rng)]
+    else:
+        # recycle: the old stage's balls go back to the pool and the list is reused
+        if balls is None:
+            balls = []
+        pool.release_all(balls)
+        balls.append(pool.acquire())
     left_speed = PADDLE_SPEED
     right_speed = PADDLE_SPEED
     split_multiplier = 1.0
     hits_since_last_split = 0
     lives = LIVES_PER_STAGE
-    bricks = generate_random_bricks(stage_index)
+    if bricks is None:
+        bricks = generate_brick_field(stage_index, rng=rng, tuning=tuning)
     return balls, bricks, left_speed, right_speed, split_multiplier, hits_since_last_split, lives
 
 # ---------------------- HUD ----------------------
 def draw_hud(screen, stage, lives, bricks, goals):
-    font = pygame.font.SysFont("Arial", 24, bold=True)
+    font = get_font("Arial", 24, bold=True)
     hud_text = f"Stage: {stage}   Lives: {lives}   Bricks left: {len(bricks)}   Goals: {goals}"
-    text_surface = font.render(hud_text, True, WHITE)
-    screen.blit(text_surface, (20, 20))
+    text_surface = render_text(font, hud_text, WHITE)
+    return screen.blit(text_surface, (20, 20))
 
 # ---------------------- AI Movement ----------------------
 import random
 
-def ai_move(paddle, balls, speed):
+def ai_move(paddle, balls, speed, rng=random, profile=None):
     """
     AI paddle movement (slightly easier than medium difficulty).
-    Predicts the ball's Y position but reacts with smoothing and random error.
+    Plans on the bounce-aware intercepts of the incoming balls but reacts
+    with smoothing and a random miss. `profile` overrides CAMPAIGN_AI.
+    Bricks aren't predicted; a deflection just triggers a new prediction.
     """
-    # Balls moving toward AI (right paddle)
-    incoming_balls = [ball for ball in balls if ball.dx > 0]
-    if not incoming_balls:
+    if profile is None:
+        profile = CAMPAIGN_AI
+    max_move = speed + profile["speed_offset"]  # slightly slower than player
+
+    # Where to be when the next catchable ball arrives (±25 px miss by default)
+    predicted_y = plan_target(paddle, balls, max_move, paddle.rect.left - BALL_RADIUS,
+                              BALL_RADIUS, HEIGHT - BALL_RADIUS, rng, profile["error"])
+    if predicted_y is None:
         return  # no threat, stay put
 
-    # Choose closest incoming ball
-    target = min(incoming_balls, key=lambda b: WIDTH - b.x)
-
-    # Predict Y position at paddle's x
-    if target.dx != 0:
-        frames_to_reach = (paddle.rect.left - target.x) / target.dx
-        predicted_y = target.y + target.dy * frames_to_reach
-    else:
-        predicted_y = target.y
-
-    # Add random prediction error to make AI less perfect
-    predicted_y += random.randint(-25, 25)  # ±25 px miss
-
     # Clamp inside screen
     predicted_y = max(0, min(HEIGHT, predicted_y))
 
     # Weighted smoothing: more weight to current paddle position (slower reaction)
-    target_y = (paddle.rect.centery * 3 + predicted_y) / 4
+    weight = profile["smoothing"]
+    target_y = (paddle.rect.centery * weight + predicted_y) / (weight + 1)
 
     # Move toward target with capped speed
-    max_move = speed - 1  # slightly slower than player
     if paddle.rect.centery < target_y - 5:
         paddle.rect.y += max_move
     elif paddle.rect.centery > target_y + 5:
@@ -197,154 +244,111 @@ def ai_move(paddle, balls, speed):
 
 # ---------------------- Campaign Loop ----------------------
 
+def draw_campaign(renderer, match, alpha=1.0):
+    """
+    Draw a campaign Match through a render.Renderer, interpolated by `alpha`.
+    Bricks live on the field's pre-rendered layer, which is the renderer's
+    background; only bricks hit since the last frame are repainted on it.
+    """
+    screen = renderer.screen
+    track = renderer.track
+    bricks = match.bricks
+    changed = [bricks.repaint(i) for i in bricks.take_changed()]
+    renderer.set_background(bricks.layer())
+    renderer.begin()
+    for rect in changed:
+        renderer.erase(rect)
+    batch = ball_batch(match.balls, alpha) + paddle_batch(match.paddles, alpha)
+    renderer.track_all(blit_batch(screen, batch, renderer.dirty))
+    state = match.state
+    track(draw_hud(screen, state.stage, state.lives, bricks, state.goals))
+
 def run_campaign():
-    pygame.init()
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    clock = pygame.time.Clock()
-    left_paddle = Paddle(20, HEIGHT//2 - 50)
-    right_paddle = Paddle(WIDTH - 30, HEIGHT//2 - 50)
+    from simulation import Match, Inputs, FixedTimestep
+    from render import Renderer
+    from profiler import get_profiler
+    from replay import ReplayRecorder
+    from spectator import get_broadcaster
+    from leaderboard import get_leaderboard
+    screen = session.get_screen("Pong Bricks")
+    clock = session.get_clock()
     # --- Internal Game Over Screen ---
     def game_over_screen():
-        font = pygame.font.Font(None, 50)
-        while True:
-            screen.fill(BLACK)
-            title = font.render("GAME OVER", True, WHITE)
-            restart_text = font.render("Press R to Restart", True, WHITE)
-            quit_text = font.render("Press Q to Quit", True, WHITE)
-
-            screen.blit(title, (WIDTH//2 - title.get_width()//2, HEIGHT//3))
-            screen.blit(restart_text, (WIDTH//2 - restart_text.get_width()//2, HEIGHT//2))
-            screen.blit(quit_text, (WIDTH//2 - quit_text.get_width()//2, HEIGHT//2 + 60))
-            pygame.display.flip()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    exit()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_r:
-                        return "restart"
-                    elif event.key == pygame.K_q:
-                        return "quit"
-            clock.tick(FPS)
+        return static_screen("GAME OVER", "Press R to Restart", "Press Q to Quit",
+                             {pygame.K_r: "restart", pygame.K_q: "quit"})
     # --- Pause Menu ---
     def pause_menu():
-        font = pygame.font.Font(None, 50)
-        while True:
-            screen.fill(BLACK)
-            title = font.render("PAUSED", True, WHITE)
-            resume_text = font.render("Press R to Resume", True, WHITE)
-            quit_text = font.render("Press Q to Quit to Main Menu", True, WHITE)
-
-            screen.blit(title, (WIDTH//2 - title.get_width()//2, HEIGHT//3))
-            screen.blit(resume_text, (WIDTH//2 - resume_text.get_width()//2, HEIGHT//2))
-            screen.blit(quit_text, (WIDTH//2 - quit_text.get_width()//2, HEIGHT//2 + 60))
-            pygame.display.flip()
-
+        return static_screen("PAUSED", "Press R to Resume", "Press Q to Quit to Main Menu",
+                             {pygame.K_r: "resume", pygame.K_q: "quit"})
+    def static_screen(title, first, second, keys):
+        # drawn once, then asleep in event.wait until one of the keys (or a close) arrives
+        font = get_font(None, 50)
+        blits = [centered(render_text(font, title, WHITE), HEIGHT//3),
+                 centered(render_text(font, first, WHITE), HEIGHT//2),
+                 centered(render_text(font, second, WHITE), HEIGHT//2 + 60)]
+        return show_screen(blits, keys, on_quit="quit")
+    leaderboard = get_leaderboard()  # runs are recorded on the way out, never mid-frame
+    stages_cleared = 0
+    pack = LevelPack(LEVEL_PACK) if os.path.exists(LEVEL_PACK) else None
+    match = Match("campaign", prefetch_stages=True, level_pack=pack)
+    renderer = Renderer(screen)
+    inputs = Inputs()
+    timestep = FixedTimestep()
+    profiler = match.profiler = get_profiler()
+    recorder = ReplayRecorder(match, LEVEL_PACK if pack is not None else None)
+    broadcaster = get_broadcaster()  # None unless spectators were asked for
+
+    try:
+        running = True
+        while running:
+            profiler.begin_frame()
+            frame_time = clock.tick(RENDER_FPS) / 1000
+            profiler.mark("tick")
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    exit()
+                    session.request_quit()
+                    return
                 if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_r:
-                        return "resume"
-                    elif event.key == pygame.K_q:
-                        return "quit"
-            clock.tick(FPS)
-    # --- Load highscore ---
-    highscore = load_highscore()            
-    stage_index = 1
-    balls, bricks, left_speed, right_speed, split_multiplier, hits_since_last_split, lives = reset_stage(stage_index)
-    base_speed = PADDLE_SPEED
-    goals = 0
-
-    running = True
-    while running:
-        dt = clock.get_time() / 1000  # seconds
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                return
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    action = pause_menu()
-                    if action == "quit":
-                        return
-
-        # --- Player input ---
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_s]: left_paddle.move(-left_speed)
-        if keys[pygame.K_w]: left_paddle.move(left_speed)
-        if keys[pygame.K_SPACE]:
-            left_paddle.activate_full_height()
-        # --- Update paddle timers ---
-        left_paddle.update(dt)            
-        # --- AI ---
-        ai_move(right_paddle, balls, right_speed)
-
-        # --- Ball update ---
-        for ball in balls[:]:
-            ball.move()
-
-            # lose life if ball goes past left
-            if ball.x < 0:
-                lives -= 1
-                if lives > 0:
-                    ball.reset()
-                    left_paddle.rect.centery = HEIGHT//2
-                    right_paddle.rect.centery = HEIGHT//2
-                else:
-                    game_over_screen()  # This works because it is already the lambda
+                    if event.key == pygame.K_ESCAPE:
+                        action = pause_menu()
+                        if action == "quit":
+                            return
+                        timestep.reset()  # don't fast-forward through the pause
+                        renderer.invalidate()  # the pause screen covered everything
+                        profiler.begin_frame()  # time spent paused isn't frame time
+                    else:
+                        profiler.handle_key(event.key)
+
+            # --- Simulation (fixed ticks) ---
+            inputs.read_keys(pygame.key.get_pressed())
+            profiler.mark("events")
+            for _ in range(timestep.advance(frame_time)):
+                state = recorder.step(inputs)
+                if broadcaster is not None:
+                    broadcaster.publish(match)
+
+                if "game_over" in state.events:
+                    game_over_screen()
                     return
-                break
-
-            # win: score against right
-            if ball.x > WIDTH:
-                goals += 1
-                print(f"✅ Stage {stage_index} cleared!")
-                stage_index += 1
-                # --- Update highscore ---
-                if stage_index > highscore:
-                    highscore = stage_index
-                    save_highscore(highscore)
-
-                balls, bricks, left_speed, right_speed, split_multiplier, hits_since_last_split, lives = reset_stage(stage_index)
-                left_paddle.rect.centery = HEIGHT//2
-                right_paddle.rect.centery = HEIGHT//2
-                goals = 0
-                break
-
-            # paddle collisions
-            if ball.check_collision(left_paddle, True) or ball.check_collision(right_paddle, False):
-                hits_since_last_split += 1
-
-            for brick in bricks[:]:
-                if brick.alive and brick.rect.colliderect(
-                        pygame.Rect(ball.x - BALL_RADIUS, ball.y - BALL_RADIUS, BALL_RADIUS*2, BALL_RADIUS*2)):
-                    brick.hit(ball)  # pass the ball here
-                    if not brick.alive:
-                        bricks.remove(brick)
-                    break
-
-        # --- Ball splitting ---
-        if hits_since_last_split >= HITS_TO_SPLIT:
-            hits_since_last_split = 0
-            if len(balls) < MAX_BALLS:
-                balls.append(Ball())
-                if split_multiplier < 3.0:
-                    split_multiplier += 0.2
-                    left_speed = min(base_speed * split_multiplier, base_speed*3)
-                    right_speed = min(base_speed * split_multiplier, base_speed*3)
-
-        # --- Draw ---
-        screen.fill(BLACK)
-        left_paddle.draw(screen)
-        right_paddle.draw(screen)
-        for ball in balls: ball.draw(screen)
-        for brick in bricks: brick.draw(screen)
-        draw_hud(screen, stage_index, lives, bricks, goals)
-
-        pygame.display.flip()
-        clock.tick(60)
-
-    pygame.quit()
+
+                if "stage_clear" in state.events:
+                    print(f"✅ Stage {state.stage - 1} cleared!")
+                    stages_cleared += 1
+
+            # --- Draw ---
+            draw_campaign(renderer, match, timestep.alpha)
+            overlay = profiler.draw_overlay(screen)
+            if overlay is not None:
+                renderer.track(overlay)
+            profiler.mark("draw")
+
+            renderer.present()
+            profiler.mark("flip")
+            profiler.end_frame(len(match.balls), len(match.bricks))
+    finally:
+        if match.state.frame:
+            leaderboard.record(match.state.stage, match.state.frame / FPS, stages_cleared, match.seed)
+        recorder.save()  # last_replay.pgr: replay.py verify / bug reports
+        match.close()
+        if pack is not None:
+            pack.close()
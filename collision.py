@@ -0,0 +1,200 @@
+"""
+Swept (continuous) ball collision tests.
+
+The discrete checks in Ball.check_collision and BrickField.collide look at
+the ball's box once per frame, so a ball that moves further than a paddle or
+brick is wide in one frame can jump clean over it. These helpers sweep the
+ball's box along its displacement so the Match can tell when a frame needs
+to be split into sub-steps.
+
+The sweep uses the same square box (half-size BALL_RADIUS) as the discrete
+tests, so the swept and per-frame checks never disagree about a contact.
+
+BallCollider adds the optional ball-vs-ball bounces (Match(...,
+ball_collisions=True)).
+"""
+import math
+
+from pong_game import BALL_RADIUS, HEIGHT
+
+SUBSTEP_THRESHOLD = 10  # px per frame; half a brick/paddle width
+MAX_SUBSTEPS = 8
+
+
+def sweep_box(x, y, dx, dy, half, left, top, right, bottom):
+    """
+    Earliest time t in [0, 1] at which a box of half-size `half` centred at
+    (x, y) and moving by (dx, dy) touches the rect, or None if it stays clear.
+    A box that already overlaps returns 0.
+    """
+    # Minkowski sum: grow the rect by the box and cast the centre as a ray
+    left -= half
+    right += half
+    top -= half
+    bottom += half
+
+    t_enter, t_exit = 0.0, 1.0
+    if dx == 0:
+        if x < left or x > right:
+            return None
+    else:
+        ta = (left - x) / dx
+        tb = (right - x) / dx
+        if ta > tb:
+            ta, tb = tb, ta
+        t_enter = max(t_enter, ta)
+        t_exit = min(t_exit, tb)
+        if t_enter > t_exit:
+            return None
+
+    if dy == 0:
+        if y < top or y > bottom:
+            return None
+    else:
+        ta = (top - y) / dy
+        tb = (bottom - y) / dy
+        if ta > tb:
+            ta, tb = tb, ta
+        t_enter = max(t_enter, ta)
+        t_exit = min(t_exit, tb)
+        if t_enter > t_exit:
+            return None
+
+    return t_enter
+
+
+def sweep_ball_rect(ball, rect):
+    """Time of impact of the ball's box with a pygame.Rect over the next frame, or None."""
+    return sweep_box(ball.x, ball.y, ball.dx, ball.dy, BALL_RADIUS,
+                     rect.left, rect.top, rect.right, rect.bottom)
+
+
+def substeps_needed(ball, paddles, bricks=None):
+    """
+    How many sub-steps the ball's next frame should be split into.
+    Slow balls (displacement under SUBSTEP_THRESHOLD) and fast balls whose
+    swept path touches no paddle or brick need 1; otherwise enough steps
+    that no step moves further than the threshold.
+    """
+    dx, dy = ball.dx, ball.dy
+    displacement = max(abs(dx), abs(dy))
+    if displacement <= SUBSTEP_THRESHOLD:
+        return 1
+
+    steps = min(math.ceil(displacement / SUBSTEP_THRESHOLD), MAX_SUBSTEPS)
+    for paddle in paddles:
+        if sweep_ball_rect(ball, paddle.rect) is not None:
+            return steps
+
+    if bricks is not None:
+        x, y = ball.x, ball.y
+        left = int(min(x, x + dx) - BALL_RADIUS)
+        top = int(min(y, y + dy) - BALL_RADIUS)
+        right = int(max(x, x + dx) + BALL_RADIUS) + 1
+        bottom = int(max(y, y + dy) + BALL_RADIUS) + 1
+        for i in bricks.query(left, top, right, bottom):
+            if sweep_box(x, y, dx, dy, BALL_RADIUS, bricks.x[i], bricks.y[i],
+                         bricks.x[i] + bricks.w[i], bricks.y[i] + bricks.h[i]) is not None:
+                return steps
+    return 1
+
+
+# ---------------------- Ball vs Ball ----------------------
+MIN_BALL_DX = 1.0  # px/frame a ball keeps toward a goal after a ball-ball bounce
+
+
+class BallCollider:
+    """
+    Optional elastic ball-ball contacts (equal masses, circles of
+    BALL_RADIUS) with a sort-and-sweep broad phase along x.
+
+    The balls are kept in a list sorted by x between frames. Balls move
+    only a few px per frame, so re-sorting it with insertion sort is close
+    to linear, and the sweep only tests pairs whose x ranges overlap.
+    Overlapping balls (two spawns on the same spot included) are pushed
+    apart along the line between their centres, and their velocity
+    components along that line are swapped if they are closing.
+    """
+
+    def __init__(self, radius=BALL_RADIUS, height=HEIGHT):
+        self.radius = radius
+        self.height = height
+        self.order = []        # balls in play, sorted by x
+        self.members = set()
+        self.tests = 0         # narrow-phase pair tests in the last collide()
+
+    def _sync(self, balls):
+        """Follow goals, spawns and resets: new balls join the order, gone ones leave it."""
+        members = self.members
+        if len(balls) == len(members):
+            for ball in balls:
+                if ball not in members:
+                    break
+            else:
+                return
+        self.members = set(balls)
+        self.order = [ball for ball in self.order if ball in self.members] + \
+                     [ball for ball in balls if ball not in members]
+
+    def collide(self, balls):
+        """Resolve every overlapping pair among `balls`; returns the number of contacts."""
+        self._sync(balls)
+        order = self.order
+        n = len(order)
+        # insertion sort: last frame's order is nearly right
+        for i in range(1, n):
+            ball = order[i]
+            x = ball.x
+            j = i - 1
+            while j >= 0 and order[j].x > x:
+                order[j + 1] = order[j]
+                j -= 1
+            order[j + 1] = ball
+
+        diameter = self.radius * 2
+        touch = diameter * diameter
+        contacts = tests = 0
+        for i in range(n):
+            a = order[i]
+            for j in range(i + 1, n):
+                b = order[j]
+                dx = b.x - a.x
+                if dx >= diameter:
+                    break  # sorted by x: nothing further right can reach a
+                tests += 1
+                dy = b.y - a.y
+                dist2 = dx * dx + dy * dy
+                if dist2 < touch:
+                    self._resolve(a, b, dx, dy, dist2)
+                    contacts += 1
+        self.tests = tests
+        return contacts
+
+    def _resolve(self, a, b, dx, dy, dist2):
+        if dist2:
+            dist = math.sqrt(dist2)
+            nx, ny = dx / dist, dy / dist
+        else:
+            dist, nx, ny = 0.0, 0.0, 1.0  # same spot (spawns): split them vertically
+        # separate: each moves half the overlap along the normal, staying off the walls
+        push = (self.radius * 2 - dist) / 2
+        low, high = self.radius, self.height - self.radius
+        a.x -= nx * push
+        a.y = min(high, max(low, a.y - ny * push))
+        b.x += nx * push
+        b.y = min(high, max(low, b.y + ny * push))
+        # equal masses: swap the velocity components along the normal if closing
+        closing = (a.dx - b.dx) * nx + (a.dy - b.dy) * ny
+        if closing > 0:
+            a_dx, b_dx = a.dx, b.dx
+            a.dx -= closing * nx
+            a.dy -= closing * ny
+            b.dx += closing * nx
+            b.dy += closing * ny
+            # a ball knocked (nearly) vertical would bounce between the walls forever
+            if abs(a.dx) < MIN_BALL_DX:
+                a.dx = math.copysign(MIN_BALL_DX, a.dx or a_dx)
+            if abs(b.dx) < MIN_BALL_DX:
+                b.dx = math.copysign(MIN_BALL_DX, b.dx or b_dx)
+        a.intercept = None  # moved or deflected: the AI's cached predictions are stale
+        b.intercept = None
@@ -0,0 +1,492 @@
+"""
+Event-driven fast-forward for headless matches (replay checks, AI runs, soaks).
+
+Match.step moves every ball one frame at a time, but between contacts a
+ball only flies straight and bounces off the top and bottom walls.
+EventEngine wraps a Match and works out, for every ball, the last frame
+before it could touch something: a paddle's column, a goal line or (in the
+campaign) a brick. Those frames sit in a heapq priority queue. While the
+inputs hold steady the engine jumps straight to the earliest one. It moves
+balls, paddles and timers in closed form, then hands the frames where
+something happens to Match.step itself. Contacts, scoring and spawns
+therefore run through the exact same code. Afterwards only the balls whose
+quiet spell ran out go back on the queue; goals, spawns and resets rebuild it.
+
+Wall bounces are solved inside a jump. Positions keep the float rounding
+of frame-by-frame `y += dy` (repeat_add), so a fast-forwarded match stays
+bit-identical to a stepped one, state hashes included.
+
+A jump needs steady conditions: no boost key held or boost running, no
+paddle pressed both ways, and an AI with at most one incoming ball that it
+has already predicted (intercept.py). Otherwise the frame is stepped, so
+crowded scenes fall back to Match.step speed. Quiet spells shorter than
+MIN_JUMP are stepped too.
+
+Every paddle contact is still stepped, so the gain is bounded by how much
+of a match is open flight, not by the queue. With idle players (`speed`)
+pvp runs about 3.5x faster than Match.step; ai about 1.4x, since the AI
+rarely has a single incoming ball once play goes multi-ball; campaign
+about 1.0x, since bricks keep spells short. replay.playback only uses the
+engine for PAYS_OFF modes.
+
+    engine = EventEngine(Match("pvp", seed=3))
+    engine.run([(bits, frames), ...])     # key runs, e.g. from a replay
+
+    python event_engine.py check          # compare with Match.step on random input
+    python event_engine.py speed --mode pvp --ticks 360000
+"""
+import heapq
+import math
+import os
+import sys
+import time
+from math import frexp, ldexp, ulp
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from collision import SUBSTEP_THRESHOLD
+from campaign import CAMPAIGN_AI
+from intercept import cached
+from pong_game import AI_PROFILES, WIDTH, HEIGHT, BALL_RADIUS, PADDLE_SPEED
+from simulation import Match, Inputs
+
+MODES = ("ai", "pvp", "campaign")  # chaos keeps its balls in a BallArray
+PAYS_OFF = ("pvp", "ai")  # modes where jumping beats Match.step; bricks keep campaign horizons short
+MIN_JUMP = 8    # shortest quiet spell worth jumping
+STEP_RUN = 4    # fewest frames stepped between queue checks: balls in a paddle's column are re-planned once per run
+BRICK_LOOKAHEAD = 128  # px around a ball searched for bricks; anything farther is at least this far away
+EPSILON = 1e-9
+EXACT_INTS = 2 ** 53  # whole floats below this add without rounding
+
+
+# ---------------------- Exact Flight ----------------------
+def repeat_add(v, d, n):
+    """
+    v after n rounds of `v += d`, with the same rounding, in a few steps.
+    Whole numbers add exactly. Otherwise, inside one binade every sum
+    rounds to the same grid, so each addition adds the same representable
+    step and a run of them is one multiply; only binade crossings, exact
+    half-way ties and non-positive values fall back to single additions.
+    """
+    if d == int(d) and v == int(v) and abs(v) + n * abs(d) < EXACT_INTS:
+        return v + n * d
+    while n > 0:
+        nxt = v + d
+        if nxt == v:
+            return v  # d is under half an ulp: v never moves again
+        if v <= 0 or nxt <= 0:
+            v = nxt
+            n -= 1
+            continue
+        e = frexp(v)[1]
+        lo, hi = ldexp(0.5, e), ldexp(1.0, e)
+        u = ulp(lo)
+        step = nxt - v
+        if not lo <= nxt < hi or abs(d - step) * 2 == u:
+            v = nxt
+            n -= 1
+            continue
+        units, du = v / u, step / u
+        if du > 0:
+            run = int((hi / u - 1 - units) // du)
+        else:
+            run = int((units - lo / u - 1) // -du)  # landing exactly on lo, the true sum is below it
+        if run < 1:
+            v = nxt
+            n -= 1
+            continue
+        run = min(run, n)
+        v = (units + run * du) * u
+        n -= run
+    return v
+
+
+def wall_hit(y):
+    """Ball.move's wall test."""
+    return y - BALL_RADIUS <= 0 or y + BALL_RADIUS >= HEIGHT
+
+
+def next_bounce(y, dy, limit):
+    """(frame, y after it) of the first Ball.move in 1..limit that flips dy, or None."""
+    after = y + dy
+    if wall_hit(after):
+        return 1, after
+    if dy == 0:
+        return None
+    wall = HEIGHT - BALL_RADIUS if dy > 0 else BALL_RADIUS
+    frame = max(2, math.ceil((wall - y) / dy))  # rounding drift moves this by a frame at most
+    if frame > limit + 1:
+        return None
+    before = repeat_add(after, dy, frame - 2)
+    while frame > 2 and wall_hit(before):
+        frame -= 1
+        before = repeat_add(after, dy, frame - 2)
+    after = before + dy
+    while not wall_hit(after):
+        frame += 1
+        after += dy
+    return (frame, after) if frame <= limit else None
+
+
+def fly(x, y, dx, dy, frames):
+    """(x, y, dy) after `frames` Ball.move calls with only the walls in the way."""
+    x = repeat_add(x, dx, frames)
+    while frames > 0:
+        bounce = next_bounce(y, dy, frames)
+        if bounce is None:
+            return x, repeat_add(y, dy, frames), dy
+        frame, y = bounce
+        dy = -dy
+        frames -= frame
+    return x, y, dy
+
+
+def frames_within(x, dx, edge):
+    """Frames x can keep adding dx without passing edge (landing on it is fine)."""
+    if dx == 0:
+        return sys.maxsize
+    frames = max(0, int((edge - x) // dx))
+    while frames and (repeat_add(x, dx, frames) - edge) * dx > 0:
+        frames -= 1  # float drift
+    return frames
+
+
+def paddle_step(speed, up):
+    """Pixels Paddle.move shifts a paddle per frame away from the edges (pygame rounds float speeds)."""
+    probe = pygame.Rect(0, HEIGHT // 2, 1, 1)
+    probe.y -= speed if up else -speed
+    return probe.y - HEIGHT // 2
+
+
+# ---------------------- Engine ----------------------
+class EventEngine:
+    """Advances a Match like Match.step would, jumping over the frames where nothing happens."""
+
+    def __init__(self, match):
+        if match.mode not in MODES:
+            raise ValueError(f"EventEngine runs {MODES} matches, not {match.mode!r}")
+        self.match = match
+        # ball centre x ranges where its box (plus int() truncation) can touch each paddle
+        self.columns = [(p.rect.left - BALL_RADIUS - 1, p.rect.right + BALL_RADIUS + 1) for p in match.paddles]
+        self.x_target = match.right_paddle.rect.left - BALL_RADIUS  # where the AI predicts (ai_move)
+        self.queue = []  # (last quiet frame, seq, ball)
+        self.seq = 0
+        self.keys = Inputs()  # the inputs the queue was built for
+        self.stepped = 0
+        self.jumped = 0
+        self._rebuild()
+
+    # ----- Scheduling -----
+    def _rebuild(self):
+        self.queue = []
+        self.synced = self.match.state.frame  # the queue holds for this frame (jumps keep it in step)
+        self.reach = self._paddle_reach()
+        for ball in self.match.balls:
+            self._schedule(ball)
+
+    def _reschedule_due(self):
+        """Schedule again the balls stepped past their last quiet frame."""
+        queue, frame = self.queue, self.match.state.frame
+        while queue and queue[0][0] < frame:
+            self._schedule(heapq.heappop(queue)[2])
+
+    def _schedule(self, ball):
+        self.seq += 1
+        heapq.heappush(self.queue, (self.match.state.frame + self._horizon(ball), self.seq, ball))
+
+    def _paddle_reach(self):
+        """
+        Most pixels each paddle can move per frame until the next rebuild:
+        nothing for a key paddle with no direction held, the AI's top speed
+        for the AI. Key changes, boosts and speed-ups all rebuild.
+        """
+        match, keys = self.match, self.keys
+        reach = []
+        for side, speed in (("left", match.left_speed), ("right", match.right_speed)):
+            if side == "right" and match.mode != "pvp":
+                if match.mode == "campaign":
+                    profile = match.ai_profile or CAMPAIGN_AI
+                else:
+                    profile, speed = match.ai_profile or AI_PROFILES.get(match.difficulty, AI_PROFILES["Medium"]), PADDLE_SPEED
+                reach.append(math.ceil(max(speed + profile["speed_offset"], 1)) + 1)
+            elif getattr(keys, side + "_up") or getattr(keys, side + "_down"):
+                reach.append(math.ceil(speed) + 1)
+            else:
+                reach.append(0)
+        return reach
+
+    def _horizon(self, ball):
+        """Frames `ball` can fly with nothing but the walls in reach (0: step the next one)."""
+        dx, dy = ball.dx, ball.dy
+        if abs(dx) > SUBSTEP_THRESHOLD or abs(dy) > SUBSTEP_THRESHOLD:
+            return 0  # fast balls are sub-stepped against paddles and bricks
+        x, y = ball.x, ball.y
+        reach = BALL_RADIUS + 1  # the box, plus int() truncation
+        frames = frames_within(x, dx, WIDTH if dx > 0 else 0)  # until the goal
+        for paddle, (lo, hi), paddle_reach in zip(self.match.paddles, self.columns, self.reach):
+            # safe until the ball enters the paddle's column, or while neither can close the vertical gap
+            if lo < x < hi:
+                across = 0
+            elif dx > 0 and x <= lo:
+                across = frames_within(x, dx, lo)
+            elif dx < 0 and x >= hi:
+                across = frames_within(x, dx, hi)
+            else:
+                continue  # moving away from it
+            if across < frames:
+                rect = paddle.rect
+                gap = max(rect.top - (y + reach), y - reach - rect.bottom)
+                closing = abs(dy) + paddle_reach
+                if gap <= 0:
+                    apart = 0
+                else:
+                    apart = int((gap - EPSILON) // closing) if closing else sys.maxsize
+                frames = min(frames, max(across, apart))
+        if self.match.bricks is not None:
+            frames = min(frames, self._brick_horizon(ball))
+        return max(0, frames)
+
+    def _brick_horizon(self, ball):
+        """Frames until the ball's box could reach any alive brick, moving at most max(|dx|, |dy|) per axis."""
+        bricks = self.match.bricks
+        reach = BALL_RADIUS + 1
+        x, y = ball.x, ball.y
+        gap = BRICK_LOOKAHEAD
+        r = reach + BRICK_LOOKAHEAD
+        for i in bricks.query(int(x - r), int(y - r), int(x + r) + 1, int(y + r) + 1):
+            bx, by = bricks.x[i], bricks.y[i]
+            gap = min(gap, max(bx - (x + reach), x - reach - (bx + bricks.w[i]),
+                               by - (y + reach), y - reach - (by + bricks.h[i])))
+        if gap <= 0:
+            return 0
+        speed = max(abs(ball.dx), abs(ball.dy))
+        return int((gap - EPSILON) // speed) if speed else sys.maxsize
+
+    # ----- Steady checks -----
+    def _steady(self, inputs):
+        """True if the coming frames can be jumped as far as the balls allow."""
+        match = self.match
+        if inputs.left_boost or (inputs.left_up and inputs.left_down):
+            return False
+        if match.ball_collider is not None and len(match.balls) > 1:
+            return False  # ball-ball contacts aren't scheduled: step every frame
+        if match.mode == "pvp":
+            if inputs.right_boost or (inputs.right_up and inputs.right_down):
+                return False
+        elif not self._ai_settled():
+            return False
+        return not (match.left_paddle.full_height_active or match.right_paddle.full_height_active)
+
+    def _ai_settled(self):
+        """At most one incoming ball and its intercept already cached: the AI's target can't change."""
+        incoming = None
+        for ball in self.match.balls:
+            if ball.dx > 0:
+                if incoming is not None:
+                    return False
+                incoming = ball
+        return incoming is None or cached(incoming, self.x_target) is not None
+
+    # ----- Advancing -----
+    def advance(self, inputs, frames, on_step=None):
+        """
+        Run `frames` frames with these inputs. on_step(match) is called after
+        every frame handed to Match.step; jumped frames have no events.
+
+        Quiet spells of MIN_JUMP frames or more are jumped; shorter ones are
+        stepped through the next contact (STEP_RUN frames at least). Then only the
+        balls whose spell ran out are scheduled again: every other entry
+        still holds, since nothing but a contact changes a ball's course.
+        Goals, spawns and resets change more than that and rebuild the queue.
+        """
+        match = self.match
+        state = match.state
+        if inputs.to_bits() != self.keys.to_bits():
+            self.keys.set_bits(inputs.to_bits())
+            self.synced = None
+        while frames > 0 and not state.done:
+            if not self._steady(inputs):
+                self.synced = None  # boosts and crowds: step, and rebuild once things calm down
+                frames -= self._step(inputs, min(frames, STEP_RUN), on_step)
+                continue
+            if self.synced != state.frame:
+                self._rebuild()  # stepped by the caller, or after something the queue can't follow
+            quiet = min(frames, self.queue[0][0] - state.frame) if self.queue else frames
+            if quiet >= MIN_JUMP:
+                self._jump(inputs, quiet)
+                frames -= quiet
+                continue
+            frames -= self._step(inputs, min(frames, max(quiet + 1, STEP_RUN)), on_step)
+            if self.synced is not None:
+                self.synced = state.frame
+                self._reschedule_due()
+        return state
+
+    def _step(self, inputs, frames, on_step):
+        """
+        Match.step up to `frames` frames and return how many ran. Stops early
+        at the end of the game, or (dropping the queue) on anything but a hit.
+        """
+        match = self.match
+        state = match.state
+        for n in range(1, frames + 1):
+            match.step(inputs)
+            self.stepped += 1
+            if on_step is not None:
+                on_step(match)
+            events = state.events
+            if events and (len(events) > 1 or events[0] != "hit"):
+                self.synced = None  # a new or reset ball, new speeds, a new stage or the end
+                return n
+        return frames
+
+    def run(self, runs, on_step=None):
+        """Play (Inputs bits, frames) runs, e.g. a replay's key log."""
+        inputs = Inputs()
+        for bits, length in runs:
+            self.advance(inputs.set_bits(bits), length, on_step)
+        return self.match.state
+
+    def _jump(self, inputs, frames):
+        match = self.match
+        match.state.events.clear()
+        match.state.frame += frames
+        self.synced = match.state.frame
+        self.jumped += frames
+
+        self._slide(match.left_paddle, inputs.left_up, inputs.left_down, match.left_speed, frames)
+        if match.mode == "pvp":
+            self._slide(match.right_paddle, inputs.right_up, inputs.right_down, match.right_speed, frames)
+        else:
+            self._follow_ai(frames)
+        for paddle in match.paddles:
+            for _ in range(frames):  # boost cooldown, at most FPS * 1.6 frames
+                if paddle.cooldown_timer <= 0:
+                    break
+                paddle.update(match.dt)
+
+        for ball in match.balls:
+            x, y, dy = fly(ball.x, ball.y, ball.dx, ball.dy, frames - 1)
+            ball.prev_x, ball.prev_y = x, y
+            ball.x, ball.y = x + ball.dx, y + dy  # the last frame as Ball.move does it
+            ball.dy = -dy if wall_hit(ball.y) else dy
+            ball.recent_hit_frames = max(0, ball.recent_hit_frames - frames)
+
+    def _slide(self, paddle, up, down, speed, frames):
+        """Key-driven paddle after `frames` frames: a constant step, clamped to the screen."""
+        rect = paddle.rect
+        paddle.prev_height = rect.height
+        if up == down:
+            paddle.prev_y = rect.y
+            return
+        step = paddle_step(speed, up)
+        bottom = HEIGHT - rect.height
+        paddle.prev_y = max(0, min(bottom, rect.y + step * (frames - 1)))
+        rect.y = max(0, min(bottom, rect.y + step * frames))
+
+    def _follow_ai(self, frames):
+        """Run the AI frame by frame until the paddle stops; with a fixed target it then stays put."""
+        paddle = self.match.right_paddle
+        paddle.prev_height = paddle.rect.height
+        for _ in range(frames):
+            paddle.prev_y = paddle.rect.y
+            self.match.move_ai()
+            if paddle.rect.y == paddle.prev_y:
+                break
+
+
+# ---------------------- Checks ----------------------
+def random_runs(rng, ticks, mode):
+    """Plausible key runs: mostly held directions and idle spells, some boosts and double presses."""
+    choices = [0, 0, 1, 2, 1, 2, 4, 3, 5, 6]
+    if mode == "pvp":
+        choices += [8, 16, 9, 10, 17, 18, 32, 24]
+    runs = []
+    while ticks > 0:
+        length = min(ticks, rng.choice((1, 2, 5, 20, 60, 120, 240, 600)))
+        runs.append((rng.choice(choices), length))
+        ticks -= length
+    return runs
+
+
+def check(seeds, ticks):
+    """Play random runs through Match.step and EventEngine side by side; True if they never differ."""
+    import random
+    from replay import state_hash
+    ok = True
+    for mode in MODES:
+        for seed in range(seeds):
+            runs = random_runs(random.Random(seed), ticks, mode)
+            reference, fast = Match(mode, seed=seed), Match(mode, seed=seed)
+            engine = EventEngine(fast)
+            expected, got = [], []
+            engine_log = lambda m: got.append((m.state.frame, tuple(m.state.events))) if m.state.events else None
+            inputs = Inputs()
+            for n, (bits, length) in enumerate(runs):
+                inputs.set_bits(bits)
+                for _ in range(length):
+                    state = reference.step(inputs)
+                    if state.events:
+                        expected.append((state.frame, tuple(state.events)))
+                engine.advance(inputs, length, engine_log)
+                if state_hash(reference) != state_hash(fast) or expected != got:
+                    print(f"{mode} seed {seed}: differs after run {n} (frame {reference.state.frame})")
+                    ok = False
+                    break
+            else:
+                total = engine.stepped + engine.jumped
+                print(f"{mode:8} seed {seed}: {total} frames match, {engine.stepped / max(1, total):.1%} stepped")
+            reference.close()
+            fast.close()
+    return ok
+
+
+def speed(mode, ticks):
+    """Played ticks per second of Match.step vs EventEngine, idle left player, back-to-back matches."""
+    idle = Inputs()
+    start = time.perf_counter()
+    played = seed = 0
+    while played < ticks:
+        match = Match(mode, seed=seed)
+        while not match.state.done and played < ticks:
+            match.step(idle)
+            played += 1
+        seed += 1
+    frame_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    played = seed = stepped = 0
+    while played < ticks:
+        engine = EventEngine(Match(mode, seed=seed))
+        state = engine.advance(idle, ticks - played)
+        played += state.frame
+        stepped += engine.stepped
+        seed += 1
+    event_time = time.perf_counter() - start
+    print(f"{mode}: {ticks} ticks over {seed} matches, Match.step {ticks / frame_time:,.0f} ticks/s, "
+          f"EventEngine {ticks / event_time:,.0f} ticks/s ({frame_time / event_time:.1f}x, "
+          f"{stepped / ticks:.1%} of frames stepped)")
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Check or time the event-driven engine against Match.step.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    chk = sub.add_parser("check", help="compare state hashes and events with Match.step on random input")
+    chk.add_argument("--seeds", type=int, default=5)
+    chk.add_argument("--ticks", type=int, default=20000)
+    spd = sub.add_parser("speed", help="ticks per second with idle players")
+    spd.add_argument("--mode", default="pvp", choices=MODES)
+    spd.add_argument("--ticks", type=int, default=360000)
+    args = parser.parse_args(argv)
+
+    if args.command == "check":
+        return 0 if check(args.seeds, args.ticks) else 1
+    speed(args.mode, args.ticks)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
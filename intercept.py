@@ -0,0 +1,113 @@
+"""
+Bounce-aware intercept prediction and target planning for the AI paddles.
+
+Between paddle contacts a ball moves in straight legs between the top and
+bottom walls, so where it crosses the paddle's x is closed-form per leg,
+with no frame-by-frame stepping. The prediction (plus the difficulty's
+random miss) is cached on the ball and reused until the game clears it on
+a paddle contact, brick bounce or reset. Per frame the AI only does an
+O(1) cache check per ball; the real work happens once per ball event.
+
+plan_target() looks at every incoming ball by arrival time: it defends the
+first one it can still reach, and while doing so leans toward where the
+next one will arrive.
+
+The module has no game imports; callers pass the play-field bounds.
+"""
+
+from math import ceil
+
+LEAN = 0.5  # share of the paddle half-height the AI may offset to prepare for the next ball
+
+
+def predict_y(x, y, dx, dy, x_target, top, bottom):
+    """
+    Ball centre y when it reaches x_target; y itself if it never will.
+
+    Follows Ball.move's wall rule: dy flips on the first frame the ball is
+    at or past a wall, from wherever it is then. Each leg between walls is
+    closed-form, so the cost is one step per bounce (a handful at most)
+    and the result matches the frame-by-frame simulation, including a ball
+    pushed so deep into a wall that it stays stuck there.
+    """
+    if dx == 0 or (x_target - x) * dx < 0:
+        return y
+    frames = (x_target - x) / dx
+    while dy:
+        behind = top if dy > 0 else bottom
+        if (behind - y - dy) * dy >= 0:
+            return y  # still past the wall next frame: it flips every frame and slides along it
+        wall = bottom if dy > 0 else top
+        to_wall = max(1, ceil((wall - y) / dy))  # frames until the flip
+        if to_wall > frames:
+            break
+        y += dy * to_wall
+        frames -= to_wall
+        dy = -dy
+    return y + dy * frames
+
+
+def cached(ball, x_target):
+    """The cached intercept of `ball` at x_target, or None if it needs a new prediction."""
+    entry = getattr(ball, "intercept", None)
+    if entry is not None and entry[0] == x_target:
+        return entry[1]
+    return None
+
+
+def intercept(ball, x_target, top, bottom, rng, error):
+    """
+    Intercept y at x_target plus the sampled miss, cached on the ball as
+    ball.intercept = (x_target, y). Wall bounces are part of the
+    prediction; anything else that moves or deflects a ball (paddle
+    contact, brick bounce, reset) sets ball.intercept back to None.
+    """
+    y = cached(ball, x_target)
+    if y is not None:
+        return y
+    y = predict_y(ball.x, ball.y, ball.dx, ball.dy, x_target, top, bottom)
+    if error:
+        y += rng.randint(-error, error)
+    try:
+        ball.intercept = (x_target, y)
+    except AttributeError:
+        pass  # read-only views (BallArray.ai_view) are simply recomputed
+    return y
+
+
+def plan_target(paddle, balls, speed, x_target, top, bottom, rng, error=0):
+    """
+    Where the paddle centre should head, or None with nothing incoming.
+
+    Incoming balls are ranked by frames until they reach x_target. The
+    earliest one the paddle can still get to at `speed` is the target (or
+    simply the earliest, if none can be saved); the one after it pulls the
+    aim up to LEAN of the half-height toward its own intercept.
+    """
+    centre = paddle.rect.centery
+    reach = paddle.rect.height / 2
+    inf = float("inf")
+    first_t = second_t = miss_t = inf  # arrival frames: best two reachable balls, best unreachable one
+    first_y = second_y = miss_y = None
+    for ball in balls:
+        dx = ball.dx
+        if dx <= 0:
+            continue
+        frames = (x_target - ball.x) / dx
+        if frames < 0:
+            frames = 0.0
+        y = intercept(ball, x_target, top, bottom, rng, error)
+        if abs(y - centre) - reach > speed * frames:
+            if frames < miss_t:
+                miss_t, miss_y = frames, y
+        elif frames < first_t:
+            second_t, second_y = first_t, first_y
+            first_t, first_y = frames, y
+        elif frames < second_t:
+            second_t, second_y = frames, y
+    if first_y is None:
+        return miss_y
+    if second_y is None:
+        return first_y
+    lean = reach * LEAN
+    return max(first_y - lean, min(first_y + lean, second_y))
@@ -1,6 +1,9 @@
 import pygame
-from pong_game import start_game, start_game1
-from campaign import run_campaign, load_highscore, save_highscore   
+from pong_game import start_game, start_game1, start_chaos
+from campaign import run_campaign, load_highscore
+from text_cache import get_font, render_text
+from session import get_screen, close
+from menu import choose, show_screen, centered, menu_font
 
 
 
@@ -8,51 +11,22 @@ from campaign import run_campaign, load_highscore, save_highscore
 WIDTH, HEIGHT = 800, 600
 WHITE, BLACK = (255, 255, 255), (0, 0, 0)
 FPS = 60
+MENU_TOP, MENU_SPACING = 160, 60  # main menu layout: 7 lines must fit in 600px
 
-pygame.init()
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Pong Menu")
-clock = pygame.time.Clock()
-font = pygame.font.SysFont("Arial", 50)
-
-# ---------------------- Game Over Screen ----------------------
 
 # ---------------------- Difficulty Menu ----------------------
 def difficulty_menu(current):
-    selected = ["Easy", "Medium", "Hard"].index(current)
-    running = True
-    while running:
-        screen.fill(BLACK)
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    selected = (selected - 1) % 3
-                elif event.key == pygame.K_DOWN:
-                    selected = (selected + 1) % 3
-                elif event.key == pygame.K_RETURN:
-                    return ["Easy", "Medium", "Hard"][selected]
-                elif event.key == pygame.K_ESCAPE:
-                    return current
-
-        for i, level in enumerate(["Easy", "Medium", "Hard"]):
-            color = WHITE if i == selected else (150, 150, 150)
-            text = font.render(level, True, color)
-            screen.blit(text, (WIDTH//2 - text.get_width()//2, 200 + i*70))
-
-        pygame.display.flip()
-        clock.tick(FPS)
+    levels = ["Easy", "Medium", "Hard"]
+    choice = choose(levels, levels.index(current))
+    return current if choice is None else levels[choice]
 
 # ---------------------- Campaign Start Wrapper ----------------------
 def show_rules():
     """
     Displays the rules/mechanics of the game.
     """
-    running = True
-    font_title = pygame.font.SysFont("Arial", 48)
-    font_text = pygame.font.SysFont("Arial", 28)
+    font_title = get_font("Arial", 48)
+    font_text = get_font("Arial", 28)
 
     rules_lines = [
         "Player 1 (Left Paddle): W = Up, S = Down, SPACE = Full-height boost",
@@ -61,81 +35,66 @@ def show_rules():
         "Score 15 points to win a round",
         "First player to win 3 rounds wins the game",
         "Bricks Mode: Break all bricks to advance levels",
+        "Chaos Mode: 10,000 balls at once, endless (needs numpy)",
         "Press ESC to return to Main Menu"
     ]
 
-    while running:
-        screen.fill(BLACK)
-        title_surf = font_title.render("Rules & Mechanics", True, (255, 255, 255))
-        screen.blit(title_surf, (WIDTH // 2 - title_surf.get_width() // 2, 50))
-
-        # Draw rules lines
-        for i, line in enumerate(rules_lines):
-            line_surf = font_text.render(line, True, (200, 200, 200))
-            screen.blit(line_surf, (50, 150 + i * 40))
-
-        pygame.display.flip()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                return
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    running = False  # return to main menu
+    # rendered once; the screen is drawn once and redrawn only if the window is exposed
+    blits = [centered(render_text(font_title, "Rules & Mechanics", (255, 255, 255)), 50)]
+    blits += [(render_text(font_text, line, (200, 200, 200)), (50, 150 + i * 40)) for i, line in enumerate(rules_lines)]
+    show_screen(blits, {pygame.K_ESCAPE: None})  # back to main menu
 
 # ---------------------- Main Menu ----------------------
 def main_menu():
+    """Owns the display session: opens the window and closes it on the way out."""
+    get_screen("Pong Menu")
+    font = menu_font()
     selected = 0
-    options = ["Start Game", "Player vs Player", "Bricks Endless", "Rules", "Difficulty", "Quit"]
+    options = ["Start Game", "Player vs Player", "Bricks Endless", "Chaos", "Rules", "Difficulty", "Quit"]
     difficulty = "Medium"
-    running = True
 
     # Load highscore once at menu startup
     highscore = load_highscore()
 
-    while running:
-        screen.fill(BLACK)
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    selected = (selected - 1) % len(options)
-                elif event.key == pygame.K_DOWN:
-                    selected = (selected + 1) % len(options)
-                elif event.key == pygame.K_RETURN:
-                    if options[selected] == "Start Game":
-                        start_game(difficulty)
-                    elif options[selected] == "Bricks Endless":
-                        run_campaign()
-                        # refresh highscore after playing campaign
-                        highscore = load_highscore()
-                    elif options[selected] == "Player vs Player":
-                        start_game1()                          # uses wrapper
-                    elif options[selected] == "Difficulty":
-                        difficulty = difficulty_menu(difficulty)
-                    elif options[selected] == "Rules":
-                        show_rules()    
-                    elif options[selected] == "Quit":
-                        running = False
-
-        # --- Draw menu options ---
-        for i, option in enumerate(options):
-            color = WHITE if i == selected else (150, 150, 150)
-            text = font.render(option, True, color)
-            screen.blit(text, (WIDTH//2 - text.get_width()//2, 200 + i*70))
-
+    def highscore_text():
         # --- Draw Highscore at top-right ---
-        hs_text = font.render(f"Highscore: Stage {highscore}", True, WHITE)
-        screen.blit(hs_text, (WIDTH - hs_text.get_width() - 20, 20))
-
-        pygame.display.flip()
-        clock.tick(FPS)
-
-    pygame.quit()
+        hs_text = render_text(font, f"Highscore: Stage {highscore}", WHITE)
+        return [(hs_text, (WIDTH - hs_text.get_width() - 20, 20))]
+
+    def refresh_highscore():
+        # the leaderboard may finish loading after the menu first drew
+        nonlocal highscore
+        old, highscore = highscore, load_highscore()
+        return highscore != old
+
+    while True:
+        choice = choose(options, selected, MENU_TOP, MENU_SPACING, caption="Pong Menu", escape=False,
+                        decorations=highscore_text, refresh=refresh_highscore)
+        if choice is None or options[choice] == "Quit":
+            break
+        selected = choice
+        if options[selected] == "Start Game":
+            start_game(difficulty)
+        elif options[selected] == "Bricks Endless":
+            run_campaign()
+            # refresh highscore after playing campaign
+            highscore = load_highscore()
+        elif options[selected] == "Player vs Player":
+            start_game1()                          # uses wrapper
+        elif options[selected] == "Chaos":
+            start_chaos(difficulty)
+        elif options[selected] == "Difficulty":
+            difficulty = difficulty_menu(difficulty)
+        elif options[selected] == "Rules":
+            show_rules()
+
+    close()
 
 
 # ---------------------- Entry Point ----------------------
 if __name__ == "__main__":
+    import sys
+    if "--ball-collisions" in sys.argv[1:]:
+        import simulation
+        simulation.BALL_COLLISIONS = True  # every mode but chaos: balls bounce off each other
     main_menu()
@@ -0,0 +1,234 @@
+"""
+Local campaign leaderboard: every run's stage, time, goals and seed in SQLite.
+
+The game thread never touches the disk. record() updates the in-memory
+cache (top runs, personal bests) and queues the row. A background writer
+thread owns the connection: it loads the cache once at startup, then
+writes queued runs in batches, one transaction per batch, in WAL mode so
+readers such as `python leaderboard.py top` never block it. Queries for
+the menu are served from the cache; the table is indexed for the same
+top-N and per-player lookups when the cache is (re)loaded.
+
+On first use an existing highscore.txt is imported as a legacy run, so the
+old best stage carries over.
+
+    python leaderboard.py top -n 20
+    python leaderboard.py best
+"""
+import atexit
+import getpass
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+DB_PATH = "leaderboard.db"
+LEGACY_HIGHSCORE = "highscore.txt"
+TOP_N = 10            # runs kept in the cache for the menu
+BATCH_SECONDS = 0.5   # the writer gathers runs this long before committing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id       INTEGER PRIMARY KEY,
+    player   TEXT    NOT NULL,
+    stage    INTEGER NOT NULL,
+    seconds  REAL    NOT NULL,
+    goals    INTEGER NOT NULL,
+    seed     INTEGER,
+    played   REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_top ON runs (stage DESC, seconds ASC);
+CREATE INDEX IF NOT EXISTS runs_player ON runs (player, stage DESC, seconds ASC);
+"""
+COLUMNS = ("player", "stage", "seconds", "goals", "seed", "played")
+INSERT = f"INSERT INTO runs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+
+def default_player():
+    try:
+        return getpass.getuser()
+    except Exception:
+        return "player"
+
+
+class Run:
+    __slots__ = COLUMNS
+
+    def __init__(self, player, stage, seconds, goals, seed=None, played=None):
+        self.player = player
+        self.stage = stage
+        self.seconds = seconds
+        self.goals = goals
+        self.seed = seed
+        self.played = played if played is not None else time.time()
+
+    def key(self):
+        """Sort key: higher stage first, then the faster run."""
+        return -self.stage, self.seconds
+
+    def row(self):
+        return tuple(getattr(self, name) for name in COLUMNS)
+
+
+class Leaderboard:
+    def __init__(self, path=DB_PATH, player=None, keep=TOP_N):
+        self.path = path
+        self.player = player or default_player()
+        self.keep = keep
+        self.top_runs = []   # best `keep` runs, best first
+        self.bests = {}      # player -> best Run
+        self.lock = threading.Lock()
+        self.loaded = threading.Event()
+        self.pending = queue.Queue()
+        self.writer = threading.Thread(target=self._write_loop, name="leaderboard", daemon=True)
+        self.writer.start()
+
+    # ----- Game thread -----
+    def record(self, stage, seconds, goals, seed=None, player=None):
+        """Add a finished run. Never blocks on I/O: the writer thread stores it."""
+        run = Run(player or self.player, stage, seconds, goals, seed)
+        self._remember(run)
+        self.pending.put(run)
+        return run
+
+    def top(self, n=TOP_N):
+        """Best runs, best first (from the cache, so at most `keep` of them). Empty until `loaded`."""
+        with self.lock:
+            return self.top_runs[:n]
+
+    def personal_best(self, player=None):
+        """The player's best Run, or None. Never waits for the startup load."""
+        with self.lock:
+            return self.bests.get(player or self.player)
+
+    def best_stage(self, player=None):
+        best = self.personal_best(player)
+        return best.stage if best is not None else 0
+
+    def close(self):
+        """Write whatever is queued and stop the writer."""
+        if self.writer.is_alive():
+            self.pending.put(None)
+            self.writer.join()
+
+    def _remember(self, run):
+        with self.lock:
+            best = self.bests.get(run.player)
+            if best is None or run.key() < best.key():
+                self.bests[run.player] = run
+            self._merge_top(run)
+
+    # ----- Writer thread -----
+    def _connect(self):
+        fresh = not os.path.exists(self.path)
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")  # WAL keeps this crash-safe; a lost last run is acceptable
+        db.executescript(SCHEMA)
+        if fresh:
+            self._import_legacy(db)
+        return db
+
+    def _import_legacy(self, db):
+        try:
+            with open(LEGACY_HIGHSCORE) as f:
+                stage = int(f.read().strip())
+        except (OSError, ValueError):
+            return
+        if stage > 0:
+            with db:
+                db.execute(INSERT, Run(self.player, stage, 0.0, stage - 1, None,
+                                       os.path.getmtime(LEGACY_HIGHSCORE)).row())
+
+    def _load(self, db):
+        columns = ", ".join(COLUMNS)
+        top = [Run(*row) for row in db.execute(
+            f"SELECT {columns} FROM runs ORDER BY stage DESC, seconds ASC LIMIT ?", (self.keep,))]
+        bests = {}
+        for (player,) in db.execute("SELECT DISTINCT player FROM runs").fetchall():
+            row = db.execute(f"SELECT {columns} FROM runs WHERE player = ? ORDER BY stage DESC, seconds ASC LIMIT 1",
+                             (player,)).fetchone()
+            bests[player] = Run(*row)
+        with self.lock:
+            # runs recorded before the load finished are already in the cache
+            for run in top:
+                self._merge_top(run)
+            for player, run in bests.items():
+                best = self.bests.get(player)
+                if best is None or run.key() < best.key():
+                    self.bests[player] = run
+
+    def _merge_top(self, run):
+        top = self.top_runs
+        if len(top) < self.keep or run.key() < top[-1].key():
+            top.append(run)
+            top.sort(key=Run.key)
+            del top[self.keep:]
+
+    def _write_loop(self):
+        try:
+            db = self._connect()
+            self._load(db)
+        except sqlite3.Error as e:
+            print(f"leaderboard unavailable: {e}")
+            db = None
+        finally:
+            self.loaded.set()
+        running = True
+        while running:
+            batch = [self.pending.get()]
+            deadline = time.monotonic() + BATCH_SECONDS
+            while batch[-1] is not None:
+                try:
+                    batch.append(self.pending.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                running = False
+                batch.pop()
+            if batch and db is not None:
+                try:
+                    with db:
+                        db.executemany(INSERT, [run.row() for run in batch])
+                except sqlite3.Error as e:
+                    print(f"leaderboard write failed: {e}")
+        if db is not None:
+            db.close()
+
+
+_leaderboard = None
+
+
+def get_leaderboard():
+    """The session's leaderboard, opened on first use and flushed at exit."""
+    global _leaderboard
+    if _leaderboard is None:
+        _leaderboard = Leaderboard()
+        atexit.register(_leaderboard.close)
+    return _leaderboard
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Show the campaign leaderboard.")
+    parser.add_argument("command", choices=("top", "best"))
+    parser.add_argument("-n", type=int, default=TOP_N)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--player")
+    args = parser.parse_args(argv)
+    board = Leaderboard(args.db, keep=args.n)
+    board.loaded.wait()  # the queries never wait, but this is all the CLI does
+    try:
+        runs = board.top(args.n) if args.command == "top" else [board.personal_best(args.player)]
+        for rank, run in enumerate((r for r in runs if r is not None), 1):
+            print(f"{rank:3}. {run.player:16} stage {run.stage:3}  {run.seconds:7.1f} s  goals {run.goals:3}  "
+                  f"seed {run.seed if run.seed is not None else '-'}  {time.strftime('%Y-%m-%d', time.localtime(run.played))}")
+    finally:
+        board.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
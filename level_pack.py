@@ -0,0 +1,157 @@
+"""
+Binary level packs: many stages in one file, decoded only when played.
+
+Layout (little-endian):
+
+    header   "PGLP", version u16, brick width u16, brick height u16, level count u32
+    offsets  (count + 1) x u32, first record of each level; the last entry is the total
+    records  x i16, y i16, hits u8, flags u8 per brick (flags bit 0: indestructible)
+
+LevelPack memory-maps the file and only reads the header up front; load(i)
+unpacks one level's records into a fresh BrickField. Opening a pack of
+thousands of stages costs a few hundred bytes of Python objects.
+
+    python level_pack.py generate stages.pack --count 1000 --seed 7
+    python level_pack.py presets presets.pack
+    python level_pack.py info stages.pack
+"""
+import mmap
+import os
+import struct
+
+from brick_field import BrickField
+
+MAGIC = b"PGLP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHI")
+OFFSET = struct.Struct("<I")
+RECORD = struct.Struct("<hhBB")
+FLAG_INDESTRUCTIBLE = 1
+
+
+class LevelPackError(ValueError):
+    pass
+
+
+# ---------------------- Writing ----------------------
+def level_records(level):
+    """(x, y, hits, indestructible) tuples for a BrickField or an iterable of such tuples."""
+    if isinstance(level, BrickField):
+        return [(level.x[i], level.y[i], level.hits[i], bool(level.indestructible[i])) for i in level.indices()]
+    return list(level)
+
+
+def write_pack(path, levels, brick_width=None, brick_height=None):
+    """Write `levels` (BrickFields or record lists) to path. Returns the level count."""
+    from campaign import BRICK_WIDTH, BRICK_HEIGHT
+    brick_width = BRICK_WIDTH if brick_width is None else brick_width
+    brick_height = BRICK_HEIGHT if brick_height is None else brick_height
+
+    offsets = [0]
+    body = bytearray()
+    for level in levels:
+        records = level_records(level)
+        for x, y, hits, indestructible in records:
+            body += RECORD.pack(x, y, hits, FLAG_INDESTRUCTIBLE if indestructible else 0)
+        offsets.append(offsets[-1] + len(records))
+
+    count = len(offsets) - 1
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, brick_width, brick_height, count))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.write(body)
+    return count
+
+
+# ---------------------- Reading ----------------------
+class LevelPack:
+    def __init__(self, path):
+        self.path = path
+        self._map = None
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:  # an empty file can't even be mapped
+                raise LevelPackError(f"{path}: too short for a level pack")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise LevelPackError(f"{path}: too short for a level pack")
+        magic, version, self.brick_width, self.brick_height, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise LevelPackError(f"{path}: not a level pack")
+        if version != VERSION:
+            self.close()
+            raise LevelPackError(f"{path}: unsupported level pack version {version}")
+        self._records_start = HEADER.size + OFFSET.size * (self.count + 1)
+        if len(self._map) < self._records_start:
+            self.close()
+            raise LevelPackError(f"{path}: truncated offset table ({self.count} levels claimed)")
+        total = OFFSET.unpack_from(self._map, HEADER.size + OFFSET.size * self.count)[0]
+        if len(self._map) < self._records_start + total * RECORD.size:
+            self.close()
+            raise LevelPackError(f"{path}: truncated")
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def records(self, index):
+        """(x, y, hits, indestructible) tuples of level `index` (0-based)."""
+        if not 0 <= index < self.count:
+            raise IndexError(f"level {index} out of range for a pack of {self.count}")
+        first, end = struct.unpack_from("<2I", self._map, HEADER.size + OFFSET.size * index)
+        data = self._map[self._records_start + first * RECORD.size:self._records_start + end * RECORD.size]
+        return [(x, y, hits, bool(flags & FLAG_INDESTRUCTIBLE)) for x, y, hits, flags in RECORD.iter_unpack(data)]
+
+    def load(self, index):
+        """Level `index` (0-based) as a new BrickField, ready to play."""
+        field = BrickField()
+        w, h = self.brick_width, self.brick_height
+        for x, y, hits, indestructible in self.records(index):
+            field.add(x, y, w, h, hits, indestructible)
+        return field
+
+
+# ---------------------- CLI ----------------------
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Write and inspect binary level packs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="pre-generate campaign stages 1..count")
+    gen.add_argument("path")
+    gen.add_argument("--count", type=int, default=100)
+    gen.add_argument("--seed", type=int, default=0)
+    presets = sub.add_parser("presets", help="write the ten preset layouts from bricks.py")
+    presets.add_argument("path")
+    info = sub.add_parser("info", help="print level and brick counts")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        from campaign import build_stage
+        count = write_pack(args.path, (build_stage(args.seed, stage) for stage in range(1, args.count + 1)))
+        print(f"wrote {count} stages to {args.path}")
+    elif args.command == "presets":
+        import bricks
+        levels = [[(x, y, 1, False) for x, y in bricks.level_layout(n)] for n in range(1, bricks.PRESET_COUNT + 1)]
+        count = write_pack(args.path, levels, bricks.BRICK_WIDTH, bricks.BRICK_HEIGHT)
+        print(f"wrote {count} preset levels to {args.path}")
+    else:
+        with LevelPack(args.path) as pack:
+            sizes = [len(pack.records(i)) for i in range(len(pack))]
+            print(f"{args.path}: {len(pack)} levels, {sum(sizes)} bricks "
+                  f"({pack.brick_width}x{pack.brick_height}), largest level {max(sizes, default=0)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Event-driven menus and static screens.
+
+Nothing here runs a frame loop. Every loop blocks in wait_event, so a
+menu left on screen sleeps instead of redrawing 60 times a second.
+(pygame 2's own event.wait wakes every millisecond to poll, which costs
+more than the old 60 FPS loop; wait_event sleeps POLL_MS between polls
+instead.) Drawing happens only when something
+changes: the whole screen on entry or when the window is exposed, and
+the two lines whose highlight moved on a selection change. Text comes
+from text_cache, so a static line is rendered once, not once per frame.
+
+The wait has a timeout so a menu can pick up state that changes without
+input (the main menu's highscore arrives from the leaderboard thread).
+
+A window close is never swallowed: it's handed back to the session owner
+with session.request_quit(), like the game modes do.
+"""
+import pygame
+
+from session import SIZE, get_screen, request_quit
+from text_cache import get_font, render_text
+
+WIDTH, HEIGHT = SIZE
+WHITE, BLACK, GREY = (255, 255, 255), (0, 0, 0), (150, 150, 150)
+IDLE_MS = 1000  # longest a menu sleeps before calling its refresh hook
+POLL_MS = 25    # sleep between event polls: well under what a key press can notice
+EXPOSED = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED)  # the window needs repainting
+
+
+def menu_font():
+    return get_font("Arial", 50)
+
+
+def centered(surface, y):
+    """(surface, pos) blit pair for a surface centred horizontally at y."""
+    return surface, (WIDTH // 2 - surface.get_width() // 2, y)
+
+
+def wait_event(timeout=None):
+    """pygame.event.wait(timeout) that sleeps between polls; NOEVENT on timeout."""
+    deadline = None if timeout is None else pygame.time.get_ticks() + timeout
+    while True:
+        event = pygame.event.poll()
+        if event.type != pygame.NOEVENT or (deadline is not None and pygame.time.get_ticks() >= deadline):
+            return event
+        pygame.time.wait(POLL_MS)
+
+
+# ---------------------- Menu Lines ----------------------
+def draw_option(label, i, is_selected, top=200, spacing=70):
+    """
+    Draw one menu line over a freshly cleared band and return the band, so a
+    selection change only has to push two small rects to the display.
+    """
+    screen = get_screen()
+    band = pygame.Rect(0, top + i*spacing, WIDTH, spacing)
+    screen.fill(BLACK, band)
+    color = WHITE if is_selected else GREY
+    text = render_text(menu_font(), label, color)
+    screen.blit(text, (WIDTH//2 - text.get_width()//2, band.y))
+    return band
+
+
+# ---------------------- Option Menu ----------------------
+def choose(options, selected=0, top=200, spacing=70, caption=None, escape=True, decorations=None, refresh=None):
+    """
+    Let the player pick one of `options` with Up/Down and Enter, and return
+    its index. On Esc (if `escape`) or a window close, return None.
+
+    `decorations()` returns extra (surface, pos) blits for full redraws
+    (e.g. the highscore). `refresh()` is called when the wait times out and
+    returns True if the screen should be redrawn in full.
+    """
+    screen = get_screen()
+    drawn = None  # selection currently on screen; None forces a full redraw
+    while True:
+        if drawn is None:
+            get_screen(caption)  # games leave their own caption behind
+            screen.fill(BLACK)
+            for i, option in enumerate(options):
+                draw_option(option, i, i == selected, top, spacing)
+            if decorations is not None:
+                screen.blits(decorations())
+            pygame.display.flip()
+        elif drawn != selected:
+            pygame.display.update([draw_option(options[drawn], drawn, False, top, spacing),
+                                   draw_option(options[selected], selected, True, top, spacing)])
+        drawn = selected
+
+        event = wait_event(IDLE_MS)
+        if event.type == pygame.NOEVENT:
+            if refresh is not None and refresh():
+                drawn = None
+        elif event.type == pygame.QUIT:
+            request_quit()
+            return None
+        elif event.type in EXPOSED:
+            drawn = None
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_UP:
+                selected = (selected - 1) % len(options)
+            elif event.key == pygame.K_DOWN:
+                selected = (selected + 1) % len(options)
+            elif event.key == pygame.K_RETURN:
+                return selected
+            elif event.key == pygame.K_ESCAPE and escape:
+                return None
+
+
+# ---------------------- Static Screens ----------------------
+def show_screen(blits, keys, on_quit=None):
+    """
+    Draw `blits` ((surface, pos) pairs) on a black screen and wait for one
+    of `keys` (a key -> result dict); returns that result, or `on_quit`
+    when the window is closed.
+    """
+    screen = get_screen()
+    dirty = True
+    while True:
+        if dirty:
+            screen.fill(BLACK)
+            screen.blits(blits)
+            pygame.display.flip()
+            dirty = False
+        event = wait_event()
+        if event.type == pygame.QUIT:
+            request_quit()
+            return on_quit
+        if event.type in EXPOSED:
+            dirty = True
+        elif event.type == pygame.KEYDOWN and event.key in keys:
+            return keys[event.key]
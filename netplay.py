@@ -0,0 +1,644 @@
+"""
+Networked PvP over UDP: an authoritative host and predicting clients.
+
+The host owns the only real simulation.Match("pvp"). Each client sends its
+paddle keys for every tick it plays, and the last INPUT_REDUNDANCY of them
+ride along in every packet, so a lost datagram costs nothing. The host
+applies one input per client per tick and, every SNAPSHOT_TICKS ticks,
+sends each client a snapshot of scores, paddles and balls:
+
+- quantized: positions in 1/8 px and speeds in 1/64 px per frame, as ints;
+- delta-compressed against the last snapshot that client acknowledged
+  (a bit mask of changed fields plus zigzag varint differences), or a full
+  keyframe when that one is gone from the history.
+
+Ten balls cost about 65 bytes per snapshot, roughly 2 KB/s.
+
+Clients hide latency. Their own paddle is predicted from local keys, and on
+each snapshot it is reset to the host's position and the inputs the host
+has not applied yet are replayed (reconciliation). Balls are extrapolated
+forward by the same number of ticks, stopping short of the paddle columns;
+contacts and scoring always come from the host.
+
+LossyLink sits under both ends and can add latency, jitter and packet loss,
+so all of it can be tried over loopback:
+
+    python netplay.py host --port 5555                # left paddle: W/S/SPACE
+    python netplay.py join 127.0.0.1 --port 5555      # right paddle: arrows (or W/S)
+    python netplay.py selftest --rtt 100 --loss 0.05  # headless bots, prints bandwidth and errors
+
+Packets (little-endian):
+    HELLO    "H", protocol u8
+    WELCOME  "W", side u8 (0 left, 1 right)
+    FULL     "F"
+    INPUT    "I", acked snapshot tick u32, newest input seq u32, count u8, key bits u8 x count
+    SNAP     "S", tick u32, base tick u32 (0: keyframe), last applied input seq u32,
+             field count u8, change mask, zigzag varint differences
+"""
+import asyncio
+import math
+import os
+import random
+import struct
+import sys
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from pong_game import Ball, Paddle, WIDTH, HEIGHT, BALL_RADIUS, PADDLE_WIDTH, PADDLE_HEIGHT, FPS, RENDER_FPS
+from simulation import Match, MatchState, Inputs, FixedTimestep
+
+PROTOCOL = 1
+PORT = 5555
+SNAPSHOT_TICKS = 2        # a snapshot every other tick: 30 per second
+HISTORY = 64              # snapshots kept as delta baselines (~2 s)
+INPUT_REDUNDANCY = 16     # newest inputs repeated in every INPUT packet
+INPUT_BUFFER = 6          # queued inputs beyond this are dropped to keep input lag bounded
+HELLO_RETRY = 0.25        # s between HELLOs while joining
+JOIN_TIMEOUT = 5.0
+PEER_TIMEOUT = 5.0        # s of silence before the host frees a slot
+POS_SCALE = 8             # 1/8 px
+SPEED_SCALE = 64          # 1/64 px per frame
+WINNERS = (None, "Left Player", "Right Player")
+BANDWIDTH_BUDGET = 4096   # bytes/s per client the selftest accepts for snapshots
+
+INPUT = struct.Struct("<cIIB")
+SNAP = struct.Struct("<cIII")
+
+
+class NetError(RuntimeError):
+    pass
+
+
+# ---------------------- Snapshots ----------------------
+# A snapshot is a flat list of ints: HEADER_FIELDS, then x, y, dx, dy per ball.
+HEADER_FIELDS = ("left_score", "right_score", "current_round", "round_wins_left", "round_wins_right", "winner",
+                 "left_y", "left_height", "left_speed", "right_y", "right_height", "right_speed")
+BALL_FIELDS = 4
+
+
+def snapshot_ints(match):
+    state = match.state
+    left, right = match.left_paddle.rect, match.right_paddle.rect
+    ints = [state.left_score, state.right_score, state.current_round, state.round_wins_left, state.round_wins_right,
+            WINNERS.index(state.winner) if state.done else -1,
+            left.y, left.height, round(match.left_speed * SPEED_SCALE),
+            right.y, right.height, round(match.right_speed * SPEED_SCALE)]
+    for ball in match.balls:
+        ints += (round(ball.x * POS_SCALE), round(ball.y * POS_SCALE),
+                 round(ball.dx * SPEED_SCALE), round(ball.dy * SPEED_SCALE))
+    return ints
+
+
+def put_varint(out, value):
+    value = value << 1 if value >= 0 else (~value << 1) | 1  # zigzag: small magnitudes stay small
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def get_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    return (value >> 1) ^ -(value & 1), pos
+
+
+def encode_delta(ints, base=()):
+    """Change mask plus varint differences of `ints` against `base` (missing fields count as 0)."""
+    n = len(ints)
+    mask = bytearray((n + 7) // 8)
+    values = bytearray()
+    for i, value in enumerate(ints):
+        old = base[i] if i < len(base) else 0
+        if value != old:
+            mask[i >> 3] |= 1 << (i & 7)
+            put_varint(values, value - old)
+    return bytes((n,)) + bytes(mask) + bytes(values)
+
+
+def decode_delta(data, pos, base=()):
+    """(ints, end position) from encode_delta output at data[pos:]."""
+    n = data[pos]
+    pos += 1
+    mask = data[pos:pos + (n + 7) // 8]
+    pos += len(mask)
+    ints = []
+    for i in range(n):
+        value = base[i] if i < len(base) else 0
+        if mask[i >> 3] >> (i & 7) & 1:
+            diff, pos = get_varint(data, pos)
+            value += diff
+        ints.append(value)
+    return ints, pos
+
+
+# ---------------------- Transport ----------------------
+class LossyLink:
+    """
+    sendto() for a datagram transport, optionally through a fake network:
+    each packet is delayed by latency +- jitter seconds, or dropped with
+    probability `loss`. Counts what actually went out.
+    """
+
+    def __init__(self, transport, latency=0.0, jitter=0.0, loss=0.0, rng=None):
+        self.transport = transport
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = rng or random.Random()
+        self.bytes_sent = 0
+        self.packets_sent = 0
+
+    def sendto(self, data, addr=None):
+        self.bytes_sent += len(data)
+        self.packets_sent += 1
+        if self.loss and self.rng.random() < self.loss:
+            return
+        delay = self.latency + (self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if delay <= 0:
+            self.transport.sendto(data, addr)
+        else:
+            asyncio.get_running_loop().call_later(delay, self._send, data, addr)
+
+    def _send(self, data, addr):
+        if not self.transport.is_closing():
+            self.transport.sendto(data, addr)
+
+
+class Endpoint(asyncio.DatagramProtocol):
+    """Hands datagrams to owner.received(data, addr)."""
+
+    def __init__(self, owner):
+        self.owner = owner
+
+    def datagram_received(self, data, addr):
+        try:
+            self.owner.received(data, addr)
+        except (struct.error, IndexError, ValueError):
+            pass  # truncated or foreign packet
+
+
+def side_bits(keys):
+    """A player's (up, down, boost) bits from the key state; both key sets work on either side."""
+    up = keys[pygame.K_w] or keys[pygame.K_UP]
+    down = keys[pygame.K_s] or keys[pygame.K_DOWN]
+    boost = keys[pygame.K_SPACE] or keys[pygame.K_LEFT]
+    return up | down << 1 | boost << 2
+
+
+def move_paddle(paddle, bits, speed):
+    """What Match._step_pong does to a paddle for one player's key bits (boost aside)."""
+    if bits & 2:
+        paddle.move(-speed)
+    if bits & 1:
+        paddle.move(speed)
+
+
+# ---------------------- Host ----------------------
+class Peer:
+    def __init__(self, addr, side, now):
+        self.addr = addr
+        self.side = side
+        self.inputs = {}       # seq -> key bits, not applied yet
+        self.next_seq = 1
+        self.applied_seq = 0   # newest input applied to the match
+        self.bits = 0          # repeated while no new input has arrived
+        self.acked = 0         # newest snapshot tick the client has
+        self.last_heard = now
+
+
+class NetHost:
+    """
+    Runs the authoritative Match. local_side is the side played from this
+    machine (0 left, 1 right) or None for a dedicated host; remote clients
+    take the free sides in join order.
+    """
+
+    def __init__(self, match=None, local_side=0):
+        self.match = match or Match("pvp")
+        self.local_side = local_side
+        self.peers = {}     # addr -> Peer
+        self.history = {}   # snapshot tick -> ints
+        self.link = None
+        self.transport = None
+        self.keyframes = 0
+        self.snapshot_bytes = 0
+        self.snapshots = 0
+
+    async def start(self, host="0.0.0.0", port=PORT, latency=0.0, jitter=0.0, loss=0.0, rng=None):
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(lambda: Endpoint(self), local_addr=(host, port))
+        self.link = LossyLink(self.transport, latency, jitter, loss, rng)
+        return self.transport.get_extra_info("sockname")[1]
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+
+    def free_side(self):
+        taken = {peer.side for peer in self.peers.values()}
+        taken.add(self.local_side)
+        return next((side for side in (0, 1) if side not in taken), None)
+
+    def received(self, data, addr):
+        now = time.monotonic()
+        kind = data[:1]
+        peer = self.peers.get(addr)
+        if kind == b"H":
+            if data[1] != PROTOCOL:
+                return
+            if peer is None:
+                side = self.free_side()
+                if side is None:
+                    self.link.sendto(b"F", addr)
+                    return
+                peer = self.peers[addr] = Peer(addr, side, now)
+            self.link.sendto(b"W" + bytes((peer.side,)), addr)
+        elif kind == b"I" and peer is not None:
+            _, acked, seq, count = INPUT.unpack_from(data)
+            peer.last_heard = now
+            if acked > peer.acked:
+                peer.acked = acked
+            bits = data[INPUT.size:INPUT.size + count]
+            for i, b in enumerate(bits):
+                s = seq - count + 1 + i
+                if s >= peer.next_seq:
+                    peer.inputs[s] = b
+
+    def next_input(self, peer):
+        """The peer's key bits for this tick: its next input in order, or the last one again."""
+        inputs = peer.inputs
+        if peer.next_seq not in inputs and inputs:
+            peer.next_seq = min(inputs)  # every copy of that one was lost: skip it
+        while len(inputs) > INPUT_BUFFER:
+            inputs.pop(peer.next_seq, None)  # the client runs ahead: drop the oldest
+            peer.next_seq = min(inputs)
+        bits = inputs.pop(peer.next_seq, None)
+        if bits is not None:
+            peer.bits = bits
+            peer.applied_seq = peer.next_seq
+            peer.next_seq += 1
+        return peer.bits
+
+    def tick(self, local_bits=0):
+        """Step the match one frame with the local player's key bits and send snapshots when due."""
+        now = time.monotonic()
+        for addr in [a for a, p in self.peers.items() if now - p.last_heard > PEER_TIMEOUT]:
+            del self.peers[addr]
+        if not self.peers:
+            return self.match.state  # nobody to play against yet
+        bits = [0, 0]
+        if self.local_side is not None:
+            bits[self.local_side] = local_bits
+        for peer in self.peers.values():
+            bits[peer.side] = self.next_input(peer)
+        state = self.match.step(Inputs().set_bits(bits[0] | bits[1] << 3))
+        if state.frame % SNAPSHOT_TICKS == 0 or state.done:
+            self.send_snapshots()
+        return state
+
+    def send_snapshots(self):
+        tick = self.match.state.frame
+        ints = self.history[tick] = snapshot_ints(self.match)
+        self.history.pop(tick - HISTORY * SNAPSHOT_TICKS, None)
+        for peer in self.peers.values():
+            base = self.history.get(peer.acked)
+            if base is None or peer.acked == tick:
+                self.keyframes += 1
+                packet = SNAP.pack(b"S", tick, 0, peer.applied_seq) + encode_delta(ints)
+            else:
+                packet = SNAP.pack(b"S", tick, peer.acked, peer.applied_seq) + encode_delta(ints, base)
+            self.snapshots += 1
+            self.snapshot_bytes += len(packet)
+            self.link.sendto(packet, peer.addr)
+
+
+# ---------------------- Client ----------------------
+class NetView:
+    """Just enough of a Match for pong_game.draw_match, filled from snapshots."""
+
+    def __init__(self):
+        self.mode = "pvp"
+        self.state = MatchState()
+        self.left_paddle = Paddle(50, HEIGHT // 2 - PADDLE_HEIGHT // 2)
+        self.right_paddle = Paddle(WIDTH - 50 - PADDLE_WIDTH, HEIGHT // 2 - PADDLE_HEIGHT // 2)
+        self.speeds = [0.0, 0.0]
+        self.balls = []
+        self.spare = []  # Ball objects kept for when the count goes back up
+
+    @property
+    def paddles(self):
+        return self.left_paddle, self.right_paddle
+
+    def apply(self, ints):
+        state = self.state
+        (state.left_score, state.right_score, state.current_round, state.round_wins_left, state.round_wins_right,
+         winner) = ints[:6]
+        state.done = winner >= 0
+        state.winner = WINNERS[winner] if state.done else None
+        for i, paddle in enumerate(self.paddles):
+            y, height, speed = ints[6 + 3 * i:9 + 3 * i]
+            paddle.prev_y = paddle.rect.y
+            paddle.rect.height = paddle.prev_height = height
+            paddle.rect.y = y
+            self.speeds[i] = speed / SPEED_SCALE
+        count = (len(ints) - len(HEADER_FIELDS)) // BALL_FIELDS
+        balls = self.balls
+        while len(balls) > count:
+            self.spare.append(balls.pop())
+        while len(balls) < count:
+            balls.append(self.spare.pop() if self.spare else Ball(random))
+        for i, ball in enumerate(balls):
+            x, y, dx, dy = ints[len(HEADER_FIELDS) + BALL_FIELDS * i:len(HEADER_FIELDS) + BALL_FIELDS * (i + 1)]
+            ball.x, ball.y = x / POS_SCALE, y / POS_SCALE
+            ball.dx, ball.dy = dx / SPEED_SCALE, dy / SPEED_SCALE
+
+    def extrapolate(self, ball):
+        """One frame of flight with wall bounces, unless that reaches a paddle column (the host decides contacts)."""
+        x = ball.x + ball.dx
+        if x - BALL_RADIUS <= self.left_paddle.rect.right or x + BALL_RADIUS >= self.right_paddle.rect.left:
+            ball.prev_x, ball.prev_y = ball.x, ball.y
+            return
+        ball.move()
+
+
+class NetClient:
+    """Joins a NetHost, sends this player's keys every tick and predicts from snapshots."""
+
+    def __init__(self):
+        self.view = NetView()
+        self.side = None
+        self.seq = 0
+        self.pending = []     # (seq, bits) the host has not applied yet
+        self.predicted = {}   # seq -> own paddle y after that input
+        self.snapshots = {}   # tick -> ints, delta baselines
+        self.tick_received = 0
+        self.lead = 0         # ticks the view runs ahead of the newest snapshot
+        self.link = None
+        self.transport = None
+        self.welcome = None
+        self.full = False
+        # stats for the selftest
+        self.prediction_errors = []
+        self.ball_corrections = []
+        self.decoded = {}
+
+    async def join(self, host, port=PORT, latency=0.0, jitter=0.0, loss=0.0, rng=None):
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(lambda: Endpoint(self), remote_addr=(host, port))
+        self.link = LossyLink(self.transport, latency, jitter, loss, rng)
+        self.welcome = loop.create_future()
+        deadline = loop.time() + JOIN_TIMEOUT
+        while not self.welcome.done():
+            if self.full:
+                raise NetError("the match is full")
+            if loop.time() > deadline:
+                raise NetError(f"no answer from {host}:{port}")
+            self.link.sendto(bytes((ord("H"), PROTOCOL)))
+            await asyncio.wait({self.welcome}, timeout=HELLO_RETRY)
+        self.side = self.welcome.result()
+        return self.side
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+
+    @property
+    def paddle(self):
+        return self.view.paddles[self.side]
+
+    def received(self, data, addr):
+        kind = data[:1]
+        if kind == b"W":
+            if not self.welcome.done():
+                self.welcome.set_result(data[1])
+        elif kind == b"F":
+            self.full = True
+        elif kind == b"S" and self.side is not None:
+            _, tick, base_tick, applied = SNAP.unpack_from(data)
+            if tick <= self.tick_received:
+                return  # late or duplicate
+            base = ()
+            if base_tick:
+                base = self.snapshots.get(base_tick)
+                if base is None:
+                    return  # baseline already dropped; the host sends a keyframe once acks catch up
+            ints, _ = decode_delta(data, SNAP.size, base)
+            self.snapshots[tick] = ints
+            for old in [t for t in self.snapshots if t <= tick - HISTORY * SNAPSHOT_TICKS * 2]:
+                del self.snapshots[old]
+            self.tick_received = tick
+            self.decoded[tick] = ints
+            self.reconcile(ints, applied)
+
+    def reconcile(self, ints, applied):
+        """Take the host's state, then replay the inputs it has not seen yet."""
+        view = self.view
+        before = [(b.x, b.y) for b in view.balls]
+        predicted = self.predicted.pop(applied, None)
+        for seq in [s for s in self.predicted if s < applied]:
+            del self.predicted[seq]
+        view.apply(ints)
+        paddle = self.paddle
+        if predicted is not None:
+            self.prediction_errors.append(abs(predicted - paddle.rect.y))
+        self.pending = [(seq, bits) for seq, bits in self.pending if seq > applied]
+        speed = view.speeds[self.side]
+        for _, bits in self.pending:
+            move_paddle(paddle, bits, speed)
+        # the view runs as far ahead of the snapshot as our own unapplied inputs
+        self.lead = len(self.pending)
+        for ball in view.balls:
+            for _ in range(self.lead):
+                view.extrapolate(ball)
+            ball.prev_x, ball.prev_y = ball.x, ball.y
+        if len(before) == len(view.balls):
+            self.ball_corrections += [math.hypot(b.x - x, b.y - y) for b, (x, y) in zip(view.balls, before)]
+
+    def tick(self, bits):
+        """Send this tick's keys and advance the predicted view by one frame."""
+        self.seq += 1
+        self.pending.append((self.seq, bits))
+        recent = self.pending[-INPUT_REDUNDANCY:]
+        packet = INPUT.pack(b"I", self.tick_received, self.seq, len(recent)) + bytes(b for _, b in recent)
+        self.link.sendto(packet)
+        view = self.view
+        paddle = self.paddle
+        paddle.prev_y = paddle.rect.y
+        move_paddle(paddle, bits, view.speeds[self.side])
+        self.predicted[self.seq] = paddle.rect.y
+        for ball in view.balls:
+            view.extrapolate(ball)
+
+
+# ---------------------- Front-ends ----------------------
+async def play(node, view, caption):
+    """Window loop shared by host and client: local keys in, fixed ticks, interpolated draw."""
+    from pong_game import draw_match
+    from render import Renderer
+    from text_cache import get_font
+    import session
+
+    screen = session.get_screen(caption)
+    font = get_font(None, 36)
+    renderer = Renderer(screen)
+    timestep = FixedTimestep()
+    loop = asyncio.get_running_loop()
+    frame = 1 / RENDER_FPS if RENDER_FPS else 0
+    last = loop.time()
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                session.request_quit()
+                running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                running = False
+        bits = side_bits(pygame.key.get_pressed())
+        now = loop.time()
+        for _ in range(timestep.advance(now - last)):
+            node.tick(bits)
+        last = now
+        draw_match(renderer, view, font, timestep.alpha)
+        renderer.present()
+        if view.state.done:
+            print(f"{view.state.winner} wins the game!")
+            running = False
+        await asyncio.sleep(max(0.0, last + frame - loop.time()))  # lets the network callbacks run
+
+
+def host_game(port=PORT, latency=0.0, loss=0.0):
+    """Host a match and play the left paddle from this keyboard."""
+    async def main():
+        host = NetHost(Match("pvp"), local_side=0)
+        bound = await host.start(port=port, latency=latency / 2, loss=loss)
+        print(f"hosting on UDP port {bound}, waiting for a player to join")
+        try:
+            await play(host, host.match, f"Pong PvP - hosting on {bound}")
+        finally:
+            host.close()
+    asyncio.run(main())
+
+
+def join_game(address, port=PORT, latency=0.0, loss=0.0):
+    """Join a hosted match and play whichever side is free."""
+    async def main():
+        client = NetClient()
+        try:
+            side = await client.join(address, port, latency=latency / 2, loss=loss)
+            await play(client, client.view, f"Pong PvP - {'left' if side == 0 else 'right'} paddle")
+        finally:
+            client.close()
+    asyncio.run(main())
+
+
+# ---------------------- Selftest ----------------------
+def bot_bits(view, side):
+    """Tracking bot for either side: follow the nearest incoming ball."""
+    paddle = view.paddles[side]
+    target = HEIGHT / 2
+    nearest = None
+    for ball in view.balls:
+        incoming = ball.dx < 0 if side == 0 else ball.dx > 0
+        if incoming and (nearest is None or abs(ball.x - paddle.rect.centerx) < abs(nearest.x - paddle.rect.centerx)):
+            nearest = ball
+    if nearest is not None:
+        target = nearest.y
+    return (paddle.rect.centery > target + 10) | (paddle.rect.centery < target - 10) << 1
+
+
+async def loopback(seconds, rtt, jitter, loss, balls, seed):
+    rng = random.Random(seed)
+    match = Match("pvp", seed=seed)
+    while len(match.balls) < balls:
+        match.balls.append(Ball(match.ball_rng))
+    host = NetHost(match, local_side=0)
+    port = await host.start("127.0.0.1", 0, rtt / 2, jitter, loss, rng)
+    client = NetClient()
+    await client.join("127.0.0.1", port, rtt / 2, jitter, loss, rng)
+    loop = asyncio.get_running_loop()
+    next_tick = loop.time()
+    ticks = int(seconds * FPS)
+    for _ in range(ticks):
+        host.tick(bot_bits(match, 0))
+        client.tick(bot_bits(client.view, 1))
+        next_tick += 1 / FPS
+        await asyncio.sleep(max(0.0, next_tick - loop.time()))
+    await asyncio.sleep(rtt + 2 * jitter + 0.05)  # let the last snapshots land
+    host.close()
+    client.close()
+    return host, client, ticks
+
+
+def selftest(seconds=5.0, rtt=0.1, jitter=0.01, loss=0.05, balls=10, seed=1):
+    """Host plus one client over loopback through LossyLink; True if everything checks out."""
+    host, client, ticks = asyncio.run(loopback(seconds, rtt, jitter, loss, balls, seed))
+    elapsed = ticks / FPS
+    decoded = client.decoded
+    wrong = [tick for tick, ints in decoded.items() if host.history.get(tick, ints) != ints]
+    down = host.link.bytes_sent / elapsed
+    up = client.link.bytes_sent / elapsed
+    errors = client.prediction_errors
+    corrections = client.ball_corrections
+    print(f"{ticks} ticks, rtt {rtt * 1000:.0f} ms +- {jitter * 1000:.0f}, loss {loss:.0%}, {balls} balls")
+    print(f"down {down:.0f} B/s ({host.snapshot_bytes / max(1, host.snapshots):.1f} B per snapshot, "
+          f"{host.keyframes} keyframes), up {up:.0f} B/s")
+    print(f"snapshots received {len(decoded)} of {host.snapshots}, decoded wrong {len(wrong)}")
+    if errors:
+        print(f"own paddle misprediction: mean {sum(errors) / len(errors):.2f} px, max {max(errors)} px")
+    if corrections:
+        corrections.sort()
+        print(f"ball correction per snapshot: median {corrections[len(corrections) // 2]:.2f} px, "
+              f"p95 {corrections[len(corrections) * 95 // 100]:.1f} px")
+    ok = bool(decoded) and not wrong and down <= BANDWIDTH_BUDGET
+    print("ok" if ok else "FAILED")
+    return ok
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Networked PvP: host, join, or test over loopback.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    host = sub.add_parser("host", help="host a match and play the left paddle")
+    join = sub.add_parser("join", help="join a hosted match")
+    join.add_argument("address")
+    for p in (host, join):
+        p.add_argument("--port", type=int, default=PORT)
+        p.add_argument("--rtt", type=float, default=0.0, help="extra round trip in ms (testing)")
+        p.add_argument("--loss", type=float, default=0.0, help="outgoing packet loss, 0-1 (testing)")
+    test = sub.add_parser("selftest", help="headless host and client bots over loopback")
+    test.add_argument("--seconds", type=float, default=5.0)
+    test.add_argument("--rtt", type=float, default=100.0, help="ms")
+    test.add_argument("--jitter", type=float, default=10.0, help="ms")
+    test.add_argument("--loss", type=float, default=0.05)
+    test.add_argument("--balls", type=int, default=10)
+    test.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.command == "selftest":
+        return 0 if selftest(args.seconds, args.rtt / 1000, args.jitter / 1000, args.loss, args.balls, args.seed) else 1
+    import session
+    try:
+        if args.command == "host":
+            host_game(args.port, args.rtt / 1000, args.loss)
+        else:
+            join_game(args.address, args.port, args.rtt / 1000, args.loss)
+    except NetError as e:
+        print(e)
+        return 1
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
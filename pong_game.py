@@ -1,6 +1,9 @@
 import pygame
 import random
 
+from text_cache import get_font, get_atlas, render_text
+from intercept import plan_target
+
 # ----- SETTINGS -----
 WIDTH, HEIGHT = 800, 600
 WHITE, BLACK = (255, 255, 255), (0, 0, 0)
@@ -8,11 +11,27 @@ PADDLE_WIDTH, PADDLE_HEIGHT = 20, 100
 BALL_RADIUS = 15
 PADDLE_SPEED = 7
 BALL_SPEED = 5
-FPS = 60
+FPS = 60         # simulation ticks per second; gameplay is defined at this rate
+RENDER_FPS = 60  # frames drawn per second: 30, 60, 144 or 0 for uncapped
 MAX_BALLS = 16  # Prevent too many balls
+DIRECTIONS = (-1, 1)  # rng.choice draws; a tuple constant instead of a new list per serve
+SERVE_X, SERVE_Y = 50, HEIGHT // 2  # computed once: a serve stores these int objects, never new ones
 GLOBAL_HIT_COUNTER = 0
+
+# AI tuning per difficulty (measured with tournament.py):
+#   error        - max random miss in px added to the predicted intercept (drawn once per prediction)
+#   smoothing    - weight of the paddle's current position vs the prediction
+#   speed_offset - added to the base paddle speed (never below 1)
+AI_PROFILES = {
+    "Easy": {"error": 95, "smoothing": 4, "speed_offset": -3},
+    "Medium": {"error": 25, "smoothing": 3, "speed_offset": 0},
+    "Hard": {"error": 10, "smoothing": 2, "speed_offset": 3},
+}
 # ----- CLASSES -----
 class Paddle:
+    __slots__ = ("rect", "base_height", "full_height_active", "full_height_duration", "full_height_cooldown",
+                 "full_height_timer", "cooldown_timer", "saved_rect", "prev_y", "prev_height")
+
     def __init__(self, x, y):
         self.rect = pygame.Rect(x, y, PADDLE_WIDTH, PADDLE_HEIGHT)
         self.base_height = PADDLE_HEIGHT
@@ -24,6 +43,9 @@ class Paddle:
         self.full_height_timer = 0
         self.cooldown_timer = 0
         self.saved_rect = self.rect.copy()  # store original position and height
+        # rect at the start of the last tick, for render interpolation
+        self.prev_y = y
+        self.prev_height = PADDLE_HEIGHT
 
     def move(self, speed, up=True):
         if up:
@@ -36,8 +58,8 @@ class Paddle:
         if self.full_height_active:
             self.full_height_timer -= dt
             if self.full_height_timer <= 0:
-                # shrink back to original size and position
-                self.rect = self.saved_rect.copy()
+                # shrink back to original size and position (in place: no new Rect)
+                self.rect.update(self.saved_rect)
                 self.full_height_active = False
                 self.cooldown_timer = self.full_height_cooldown
         elif self.cooldown_timer > 0:
@@ -47,7 +69,7 @@ class Paddle:
         if not self.full_height_active and self.cooldown_timer <= 0:
             self.full_height_active = True
             # save original rect
-            self.saved_rect = self.rect.copy()
+            self.saved_rect.update(self.rect)
             # expand both upward and downward to cover full screen
             center_y = self.rect.centery
             self.rect.height = HEIGHT
@@ -59,32 +81,54 @@ class Paddle:
                 self.rect.bottom = HEIGHT
             self.full_height_timer = self.full_height_duration
 
-    def draw(self, screen):
-        pygame.draw.rect(screen, WHITE, self.rect)
+    def draw_rect(self, alpha=1.0):
+        """(x, y, w, h) to draw at, interpolated between the last two ticks."""
+        rect = self.rect
+        if alpha < 1.0 and rect.height == self.prev_height:
+            y = int(self.prev_y + (rect.y - self.prev_y) * alpha)
+            return rect.x, y, rect.width, rect.height
+        return rect.x, rect.y, rect.width, rect.height
+
+    def draw(self, screen, alpha=1.0):
+        return pygame.draw.rect(screen, WHITE, self.draw_rect(alpha))
 
 
 
 
 class Ball:
-    def __init__(self):
-        self.x = 50
-        self.y = HEIGHT // 2
+    __slots__ = ("rng", "x", "y", "dx", "dy", "recent_hit_frames", "prev_x", "prev_y", "intercept",
+                 "hit_counter", "just_split")
+
+    def __init__(self, rng=random):
+        self.rng = rng  # any object with random's API; Match passes a seeded one
+        self.serve()
+
+    def serve(self):
+        """Back to the state (and rng draw) of a brand-new Ball, so pooled balls replay identically."""
+        self.x = SERVE_X
+        self.y = SERVE_Y
         self.dx = BALL_SPEED
-        self.dy = random.choice([-1, 1]) * BALL_SPEED
+        self.dy = self.rng.choice(DIRECTIONS) * BALL_SPEED
         self.recent_hit_frames = 0  # debounce to prevent multi-count
         self.prev_x = self.x
         self.prev_y = self.y
+        self.intercept = None  # AI prediction cache, see intercept.py
+        self.hit_counter = 0
+        self.just_split = False
+        return self
 
     def reset(self):
-        self.x = 50
-        self.y = HEIGHT // 2
-        self.dx = random.choice([-1, 1]) * BALL_SPEED
-        self.dy = random.choice([-1, 1]) * BALL_SPEED
+        self.x = SERVE_X
+        self.y = SERVE_Y
+        self.dx = self.rng.choice(DIRECTIONS) * BALL_SPEED
+        self.dy = self.rng.choice(DIRECTIONS) * BALL_SPEED
+        self.prev_x, self.prev_y = self.x, self.y  # teleport: don't interpolate across the reset
+        self.intercept = None
         self.hit_counter = 0
         self.just_split = False
 
     def move(self):
-        # store previous pos (useful if you later want swept-collision)
+        # store previous pos (the swept-collision sub-steps start from here)
         self.prev_x, self.prev_y = self.x, self.y
 
         self.x += self.dx
@@ -98,6 +142,14 @@ class Ball:
         if self.recent_hit_frames > 0:
             self.recent_hit_frames -= 1
 
+    def advance(self, fraction):
+        """Move part of a frame (one sub-step) with wall bounce; no debounce decay."""
+        self.x += self.dx * fraction
+        self.y += self.dy * fraction
+
+        if self.y - BALL_RADIUS <= 0 or self.y + BALL_RADIUS >= HEIGHT:
+            self.dy *= -1
+
     def check_collision(self, paddle, is_left_paddle: bool) -> bool:
         """
         Returns True exactly once per legitimate contact.
@@ -105,11 +157,14 @@ class Ball:
         - Snaps ball outside the paddle to avoid re-collisions.
         - Uses a small cooldown to debounce.
         """
-        # quick circle-rect overlap via ball's AABB
-        ball_rect = pygame.Rect(int(self.x - BALL_RADIUS), int(self.y - BALL_RADIUS),
-                                BALL_RADIUS * 2, BALL_RADIUS * 2)
-        if not ball_rect.colliderect(paddle.rect):
+        # quick circle-rect overlap via ball's AABB (Rect.colliderect's test, without building a Rect)
+        left = int(self.x - BALL_RADIUS)
+        top = int(self.y - BALL_RADIUS)
+        r = paddle.rect
+        if not (left < r.right and left + BALL_RADIUS * 2 > r.x and top < r.bottom and top + BALL_RADIUS * 2 > r.y) \
+                or not r.width or not r.height:
             return False
+        self.intercept = None  # any contact may move or deflect the ball: drop the AI's cached prediction
 
         # must be moving toward this paddle to count
         moving_toward = (self.dx < 0 and is_left_paddle) or (self.dx > 0 and not is_left_paddle)
@@ -155,51 +210,74 @@ class Ball:
         return True
 
 
-    def draw(self, screen):
-        pygame.draw.circle(screen, WHITE, (int(self.x), int(self.y)), BALL_RADIUS)
+    def draw_pos(self, alpha=1.0):
+        """Top-left of the ball's sprite, interpolated between the last two ticks."""
+        x, y = self.x, self.y
+        if alpha < 1.0:
+            x = self.prev_x + (x - self.prev_x) * alpha
+            y = self.prev_y + (y - self.prev_y) * alpha
+        return int(x) - BALL_RADIUS, int(y) - BALL_RADIUS
+
+    def draw(self, screen, alpha=1.0):
+        x, y = self.draw_pos(alpha)
+        return pygame.draw.circle(screen, WHITE, (x + BALL_RADIUS, y + BALL_RADIUS), BALL_RADIUS)
+
+
+class BallPool:
+    """
+    Free list of Ball objects for one rng. acquire() hands back a served
+    ball, drawing from the rng exactly like Ball(rng), so pooling never
+    changes a seeded match; release() returns balls that left play.
+    """
+    __slots__ = ("rng", "free")
+
+    def __init__(self, rng=random):
+        self.rng = rng
+        self.free = []
+
+    def acquire(self):
+        free = self.free
+        if free:
+            return free.pop().serve()
+        return Ball(self.rng)
+
+    def release(self, ball):
+        self.free.append(ball)
+
+    def release_all(self, balls):
+        """Return every ball in the list and empty it (the list itself is kept)."""
+        self.free.extend(balls)
+        del balls[:]
 
 
 # ----- AI FUNCTION -----
-def ai_move(paddle, balls, speed, difficulty="Medium"):
+def ai_move(paddle, balls, speed, difficulty="Medium", rng=random, profile=None):
     """
     AI paddle movement with difficulty levels.
-    Predicts the ball's Y position but reacts with smoothing and random error.
+    Plans on the bounce-aware intercepts of all incoming balls (intercept.py),
+    with a random miss of up to profile["error"] px drawn once per prediction,
+    and reacts with smoothing. `profile` overrides the AI_PROFILES entry for
+    `difficulty`.
     """
-    # Balls moving toward AI (right paddle)
-    incoming_balls = [ball for ball in balls if ball.dx > 0]
-    if not incoming_balls:
-        return  # no threat
+    if profile is None:
+        profile = AI_PROFILES.get(difficulty, AI_PROFILES["Medium"])
 
-    # Choose closest incoming ball
-    target = min(incoming_balls, key=lambda b: WIDTH - b.x)
-
-    # Predict Y position at paddle's x
-    if target.dx != 0:
-        frames_to_reach = (paddle.rect.left - target.x) / target.dx
-        predicted_y = target.y + target.dy * frames_to_reach
-    else:
-        predicted_y = target.y
+    # AI difficulty speed adjustment
+    ai_speed = max(speed + profile["speed_offset"], 1)
 
-    # Add random prediction error based on difficulty
-    error_map = {"Easy": 50, "Medium": 25, "Hard": 10}
-    predicted_y += random.randint(-error_map.get(difficulty, 25), error_map.get(difficulty, 25))
+    # Where to be when the next catchable ball arrives
+    predicted_y = plan_target(paddle, balls, ai_speed, paddle.rect.left - BALL_RADIUS,
+                              BALL_RADIUS, HEIGHT - BALL_RADIUS, rng, profile["error"])
+    if predicted_y is None:
+        return  # no threat
 
     # Clamp inside screen
     predicted_y = max(0, min(HEIGHT, predicted_y))
 
     # Weighted smoothing
-    smoothing_map = {"Easy": 4, "Medium": 3, "Hard": 2}
-    weight = smoothing_map.get(difficulty, 3)
+    weight = profile["smoothing"]
     target_y = (paddle.rect.centery * weight + predicted_y) / (weight + 1)
 
-    # AI difficulty speed adjustment
-    if difficulty == "Easy":
-        ai_speed = max(speed - 3, 1)
-    elif difficulty == "Medium":
-        ai_speed = speed
-    else:  # Hard
-        ai_speed = speed + 3
-
     # Move toward target
     if paddle.rect.centery < target_y - 5:
         paddle.rect.y += ai_speed
@@ -235,266 +313,111 @@ def spawn_ball(balls):
 
 
 
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-# ----- GAME LOOP FUNCTION -----
-def start_game(difficulty):
-    import pygame, random
-    pygame.init()
-
-    # --- Screen setup ---
-    WIDTH, HEIGHT = 800, 600
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Pong AI")
-    clock = pygame.time.Clock()
-    font = pygame.font.Font(None, 36)
-
-    # --- Constants ---
-    MAX_BALLS = 10
-    PADDLE_SPEED = 7
-    POINTS_TO_WIN_ROUND = 15
-    ROUNDS_TO_WIN_GAME = 3
-
-    # --- Initialize paddles and balls ---
-    left_paddle = Paddle(50, HEIGHT // 2 - PADDLE_HEIGHT // 2)
-    right_paddle = Paddle(WIDTH - 50 - PADDLE_WIDTH, HEIGHT // 2 - PADDLE_HEIGHT // 2)
-    balls = [Ball()]
-
-    left_speed = PADDLE_SPEED
-    right_speed = PADDLE_SPEED
-    hit_counter = 0
-
-    # --- Scores & rounds ---
-    left_score = 0
-    right_score = 0
-    current_round = 1
-    round_wins_left = 0
-    round_wins_right = 0
 
-    running = True
-    while running:
-        dt = clock.get_time() / 1000  # seconds        
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    running = False
+# ----- RENDERING -----
+def draw_match(renderer, match, font, alpha=1.0):
+    """
+    Draw a pong Match through a render.Renderer: balls, paddles, score and
+    round. `alpha` in [0, 1] interpolates positions between the previous
+    and the current tick.
+    """
+    from sprites import ball_batch, ball_array_batch, paddle_batch, blit_batch
+    screen = renderer.screen
+    track = renderer.track
+    renderer.begin()
+    if match.mode == "chaos":
+        batch = ball_array_batch(match.balls, alpha)
+    else:
+        batch = ball_batch(match.balls, alpha)
+    batch += paddle_batch(match.paddles, alpha)
+    renderer.track_all(blit_batch(screen, batch, renderer.dirty))
 
-        keys = pygame.key.get_pressed()
-        # --- Player movement ---
-        if keys[pygame.K_s]:
-            left_paddle.move(-left_speed)
-        if keys[pygame.K_w]:
-            left_paddle.move(left_speed)
-        if keys[pygame.K_SPACE]:
-            left_paddle.activate_full_height()
-        # --- Update paddle timers ---
-        left_paddle.update(dt)               
-        # --- AI movement ---
-        ai_move(right_paddle, balls, speed=PADDLE_SPEED, difficulty="Medium")
-
-        # --- Draw background ---
-        screen.fill((0, 0, 0))
-
-        frame_had_hit = False
-
-        for ball in balls[:]:
-            ball.move()
-            ball.draw(screen)
-
-            if ball.check_collision(left_paddle, is_left_paddle=True):
-                frame_had_hit = True
-            if ball.check_collision(right_paddle, is_left_paddle=False):
-                frame_had_hit = True
-
-            # scoring
-            if ball.x < 0:
-                right_score += 1
-                balls.remove(ball)
-                balls.append(Ball())
-                continue
-            elif ball.x > WIDTH:
-                left_score += 1
-                balls.remove(ball)
-                balls.append(Ball())
-                continue
-
-        # global 4-hit spawn (only increment once per frame)
-        if frame_had_hit and len(balls) < MAX_BALLS:
-            hit_counter += 1
-            if hit_counter >= 4:
-                hit_counter = 0
-                nb = Ball()
-                nb.x, nb.y = WIDTH // 2, HEIGHT // 2
-                balls.append(nb)
-                left_speed = min(left_speed * 1.2, PADDLE_SPEED * 3)
-                right_speed = min(right_speed * 1.2, PADDLE_SPEED * 3)
-
-        # --- Draw paddles ---
-        left_paddle.draw(screen)
-        right_paddle.draw(screen)
-
-        # --- Draw scores and round ---
-        score_text = font.render(f"{left_score} - {right_score}", True, (255, 255, 255))
-        round_text = font.render(f"Round {current_round}", True, (255, 255, 255))
-        screen.blit(score_text, (WIDTH // 2 - 50, 20))
-        screen.blit(round_text, (WIDTH // 2 - 50, 50))
-
-        # --- Check round win ---
-        if left_score >= POINTS_TO_WIN_ROUND:
-            round_wins_left += 1
-            left_score = 0
-            right_score = 0
-            balls = [Ball()]
-            current_round += 1
-        elif right_score >= POINTS_TO_WIN_ROUND:
-            round_wins_right += 1
-            left_score = 0
-            right_score = 0
-            balls = [Ball()]
-            current_round += 1
-
-        # --- Check game win ---
-        if round_wins_left == ROUNDS_TO_WIN_GAME or round_wins_right == ROUNDS_TO_WIN_GAME:
-            winner = "Left Player" if round_wins_left == ROUNDS_TO_WIN_GAME else "Right Player"
-            print(f"{winner} wins the game!")
-            running = False
+    state = match.state
+    digits = get_atlas(font, WHITE)
+    track(digits.blit(screen, f"{state.left_score} - {state.right_score}", (WIDTH // 2 - 50, 20)))
+    round_text = render_text(font, f"Round {state.current_round}", WHITE)
+    track(screen.blit(round_text, (WIDTH // 2 - 50, 50)))
 
-        # --- Refresh display ---
-        pygame.display.flip()
-        clock.tick(60)
 
-# ----- GAME LOOP FUNCTION -----
-def start_game1():
-    import pygame, random
-    pygame.init()
-
-    # --- Screen setup ---
-    WIDTH, HEIGHT = 800, 600
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Pong PvP")
-    clock = pygame.time.Clock()
-    font = pygame.font.Font(None, 36)
-
-    # --- Constants ---
-    MAX_BALLS = 10
-    PADDLE_SPEED = 7
-    POINTS_TO_WIN_ROUND = 15
-    ROUNDS_TO_WIN_GAME = 3
-
-    # --- Initialize paddles and balls ---
-    left_paddle = Paddle(50, HEIGHT // 2 - PADDLE_HEIGHT // 2)
-    right_paddle = Paddle(WIDTH - 50 - PADDLE_WIDTH, HEIGHT // 2 - PADDLE_HEIGHT // 2)
-    balls = [Ball()]
-
-    left_speed = PADDLE_SPEED
-    right_speed = PADDLE_SPEED
-    hit_counter = 0
-
-    # --- Scores & rounds ---
-    left_score = 0
-    right_score = 0
-    current_round = 1
-    round_wins_left = 0
-    round_wins_right = 0
+def run_match(match, caption):
+    """
+    Thin pygame front-end over a simulation.Match: polls input, runs as many
+    fixed simulation ticks as the elapsed time calls for and renders an
+    interpolated frame at RENDER_FPS.
+    """
+    from simulation import Inputs, FixedTimestep
+    from render import Renderer
+    from profiler import get_profiler
+    from replay import ReplayRecorder
+    from spectator import get_broadcaster
+    import session
+
+    screen = session.get_screen(caption)
+    clock = session.get_clock()
+    font = get_font(None, 36)
+    renderer = Renderer(screen)
+    inputs = Inputs()
+    timestep = FixedTimestep()
+    profiler = match.profiler = get_profiler()
+    recorder = ReplayRecorder(match)
+    broadcaster = get_broadcaster()  # None unless spectators were asked for
+    state = match.state
 
     running = True
     while running:
-        dt = clock.get_time() / 1000  # seconds           
+        profiler.begin_frame()
+        frame_time = clock.tick(RENDER_FPS) / 1000
+        profiler.mark("tick")
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                session.request_quit()
                 running = False
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     running = False
-
-        keys = pygame.key.get_pressed()
-
-        # --- Player 1 movement (W/S/SPACE) ---
-        if keys[pygame.K_s]:
-            left_paddle.move(-left_speed)
-        if keys[pygame.K_w]:
-            left_paddle.move(left_speed)
-        if keys[pygame.K_SPACE]:
-            left_paddle.activate_full_height()
-
-        # --- Player 2 movement (UP/DOWN/LEFT) ---
-        if keys[pygame.K_DOWN]:
-            right_paddle.move(-right_speed)
-        if keys[pygame.K_UP]:
-            right_paddle.move(right_speed)
-        if keys[pygame.K_LEFT]:
-            right_paddle.activate_full_height()
-        # --- Update paddle timers ---
-        left_paddle.update(dt)   
-        right_paddle.update(dt)
-        # --- Draw background ---
-        screen.fill((0, 0, 0))
-
-        frame_had_hit = False
-
-        for ball in balls[:]:
-            ball.move()
-            ball.draw(screen)
-
-            if ball.check_collision(left_paddle, is_left_paddle=True):
-                frame_had_hit = True
-            if ball.check_collision(right_paddle, is_left_paddle=False):
-                frame_had_hit = True
-
-            # scoring
-            if ball.x < 0:
-                right_score += 1
-                balls.remove(ball)
-                balls.append(Ball())
-                continue
-            elif ball.x > WIDTH:
-                left_score += 1
-                balls.remove(ball)
-                balls.append(Ball())
-                continue
-
-        # global 4-hit spawn (only increment once per frame)
-        if frame_had_hit and len(balls) < MAX_BALLS:
-            hit_counter += 1
-            if hit_counter >= 4:
-                hit_counter = 0
-                nb = Ball()
-                nb.x, nb.y = WIDTH // 2, HEIGHT // 2
-                balls.append(nb)
-                left_speed = min(left_speed * 1.2, PADDLE_SPEED * 3)
-                right_speed = min(right_speed * 1.2, PADDLE_SPEED * 3)
-
-        # --- Draw paddles ---
-        left_paddle.draw(screen)
-        right_paddle.draw(screen)
-
-        # --- Draw scores and round ---
-        score_text = font.render(f"{left_score} - {right_score}", True, (255, 255, 255))
-        round_text = font.render(f"Round {current_round}", True, (255, 255, 255))
-        screen.blit(score_text, (WIDTH // 2 - 50, 20))
-        screen.blit(round_text, (WIDTH // 2 - 50, 50))
-
-        # --- Check round win ---
-        if left_score >= POINTS_TO_WIN_ROUND:
-            round_wins_left += 1
-            left_score = 0
-            right_score = 0
-            balls = [Ball()]
-            current_round += 1
-        elif right_score >= POINTS_TO_WIN_ROUND:
-            round_wins_right += 1
-            left_score = 0
-            right_score = 0
-            balls = [Ball()]
-            current_round += 1
-
-        # --- Check game win ---
-        if round_wins_left == ROUNDS_TO_WIN_GAME or round_wins_right == ROUNDS_TO_WIN_GAME:
-            winner = "Left Player" if round_wins_left == ROUNDS_TO_WIN_GAME else "Right Player"
-            print(f"{winner} wins the game!")
+                else:
+                    profiler.handle_key(event.key)
+
+        inputs.read_keys(pygame.key.get_pressed())
+        profiler.mark("events")
+        for _ in range(timestep.advance(frame_time)):
+            state = recorder.step(inputs)
+            if broadcaster is not None:
+                broadcaster.publish(match)
+
+        draw_match(renderer, match, font, timestep.alpha)
+        overlay = profiler.draw_overlay(screen)
+        if overlay is not None:
+            renderer.track(overlay)
+        profiler.mark("draw")
+
+        if state.done:
+            print(f"{state.winner} wins the game!")
             running = False
 
-        # --- Refresh display ---
-        pygame.display.flip()
-        clock.tick(60)
+        renderer.present()
+        profiler.mark("flip")
+        profiler.end_frame(len(match.balls))
+
+    recorder.save()  # last_replay.pgr: replay.py verify / bug reports
+
+
+# ----- GAME LOOP FUNCTION -----
+def start_game(difficulty):
+    from simulation import Match
+    run_match(Match("ai", difficulty=difficulty), "Pong AI")
+
+# ----- GAME LOOP FUNCTION -----
+def start_game1():
+    from simulation import Match
+    run_match(Match("pvp"), "Pong PvP")
+
+# ----- GAME LOOP FUNCTION -----
+def start_chaos(difficulty):
+    from simulation import Match
+    try:
+        match = Match("chaos", difficulty=difficulty)
+    except ImportError as e:
+        print(f"Chaos mode unavailable: {e}")
+        return
+    run_match(match, "Pong Chaos")
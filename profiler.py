@@ -0,0 +1,173 @@
+"""
+Per-frame phase timing for the game loops.
+
+The loop calls begin_frame() / end_frame() around each rendered frame and
+mark(phase) after each stage of it: the time since the previous mark is
+booked to that phase. A mark is one perf_counter() call, so the timers
+stay compiled in. Match.step marks its own ai / balls / bricks phases when
+a profiler is attached (match.profiler).
+
+The last HISTORY_FRAMES frames are kept. F3 toggles an overlay with
+per-phase averages, frame-time percentiles and ball/brick counts; F4
+writes the history as Chrome trace JSON (chrome://tracing, Perfetto and
+speedscope all open it).
+"""
+import json
+import time
+from collections import deque
+
+import pygame
+
+from text_cache import get_font, render_text
+
+HISTORY_FRAMES = 600   # ~10 s at 60 fps
+OVERLAY_REFRESH = 30   # frames between overlay text updates (keeps the text cache quiet)
+PHASES = ("tick", "events", "ai", "balls", "bricks", "draw", "flip")  # "ai" includes player paddles
+
+TOGGLE_KEY = pygame.K_F3
+EXPORT_KEY = pygame.K_F4
+
+
+class FrameRecord:
+    __slots__ = ("start", "end", "spans", "balls", "bricks")
+
+    def __init__(self, start):
+        self.start = start
+        self.end = start
+        self.spans = []  # [phase, t0, t1]; consecutive marks of one phase are merged
+        self.balls = 0
+        self.bricks = 0
+
+    def phase_times(self):
+        totals = dict.fromkeys(PHASES, 0.0)
+        for phase, t0, t1 in self.spans:
+            totals[phase] = totals.get(phase, 0.0) + (t1 - t0)
+        return totals
+
+
+class FrameProfiler:
+    def __init__(self, history=HISTORY_FRAMES):
+        self.frames = deque(maxlen=history)
+        self.current = None
+        self.last = 0.0
+        self.overlay = False
+        self.overlay_lines = []
+        self.frames_since_refresh = OVERLAY_REFRESH
+
+    # ----- Recording -----
+    def begin_frame(self):
+        now = time.perf_counter()
+        self.current = FrameRecord(now)
+        self.last = now
+
+    def mark(self, phase):
+        """Book the time since the previous mark to `phase`."""
+        frame = self.current
+        if frame is None:
+            return
+        now = time.perf_counter()
+        spans = frame.spans
+        if spans and spans[-1][0] == phase:
+            spans[-1][2] = now
+        else:
+            spans.append([phase, self.last, now])
+        self.last = now
+
+    def end_frame(self, balls=0, bricks=0):
+        frame = self.current
+        if frame is None:
+            return
+        frame.end = time.perf_counter()
+        frame.balls = balls
+        frame.bricks = bricks
+        self.frames.append(frame)
+        self.current = None
+
+    # ----- Stats -----
+    def percentiles(self, points=(50, 95, 99)):
+        """Frame time in ms at each percentile over the history."""
+        times = sorted(f.end - f.start for f in self.frames)
+        if not times:
+            return {p: 0.0 for p in points}
+        return {p: times[min(len(times) - 1, len(times) * p // 100)] * 1000 for p in points}
+
+    def phase_means(self):
+        """Average ms per frame spent in each phase over the history."""
+        totals = dict.fromkeys(PHASES, 0.0)
+        for frame in self.frames:
+            for phase, seconds in frame.phase_times().items():
+                totals[phase] = totals.get(phase, 0.0) + seconds
+        n = max(1, len(self.frames))
+        return {phase: seconds * 1000 / n for phase, seconds in totals.items()}
+
+    def summary_lines(self):
+        pct = self.percentiles()
+        last = self.frames[-1] if self.frames else None
+        mean_frame = sum(f.end - f.start for f in self.frames) / max(1, len(self.frames))
+        fps = 1 / mean_frame if mean_frame else 0.0
+        return [
+            f"frame p50 {pct[50]:.1f}  p95 {pct[95]:.1f}  p99 {pct[99]:.1f} ms  ({fps:.0f} fps)",
+            "  ".join(f"{phase} {ms:.2f}" for phase, ms in self.phase_means().items()),
+            f"balls {last.balls if last else 0}  bricks {last.bricks if last else 0}",
+        ]
+
+    # ----- Hotkeys -----
+    def handle_key(self, key):
+        """F3 / F4 handling for a KEYDOWN; returns True if the key was ours."""
+        if key == TOGGLE_KEY:
+            self.overlay = not self.overlay
+            self.frames_since_refresh = OVERLAY_REFRESH
+            return True
+        if key == EXPORT_KEY:
+            path = time.strftime("frame_trace_%Y%m%d_%H%M%S.json")
+            self.export_trace(path)
+            print(f"Frame trace written to {path}")
+            return True
+        return False
+
+    # ----- Overlay -----
+    def draw_overlay(self, screen):
+        """Draw the stats box (if toggled on) and return its rect, or None."""
+        if not self.overlay:
+            return None
+        self.frames_since_refresh += 1
+        if self.frames_since_refresh >= OVERLAY_REFRESH:
+            self.frames_since_refresh = 0
+            self.overlay_lines = self.summary_lines()
+        font = get_font(None, 22)
+        surfaces = [render_text(font, line, (255, 255, 0)) for line in self.overlay_lines]
+        line_height = font.get_linesize()
+        box = pygame.Rect(0, 0, max((s.get_width() for s in surfaces), default=0) + 12,
+                          line_height * len(surfaces) + 8)
+        box.bottomleft = (0, screen.get_height())
+        screen.fill((0, 0, 0), box)
+        screen.blits([(s, (box.x + 6, box.y + 4 + i * line_height)) for i, s in enumerate(surfaces)], doreturn=False)
+        return box
+
+    # ----- Export -----
+    def trace_events(self):
+        """The history as Chrome trace events (µs timestamps)."""
+        events = []
+        for n, frame in enumerate(self.frames):
+            events.append({"name": "frame", "ph": "X", "pid": 1, "tid": 1, "ts": frame.start * 1e6,
+                           "dur": (frame.end - frame.start) * 1e6, "args": {"frame": n}})
+            for phase, t0, t1 in frame.spans:
+                events.append({"name": phase, "ph": "X", "pid": 1, "tid": 1, "ts": t0 * 1e6, "dur": (t1 - t0) * 1e6})
+            events.append({"name": "objects", "ph": "C", "pid": 1, "tid": 1, "ts": frame.start * 1e6,
+                           "args": {"balls": frame.balls, "bricks": frame.bricks}})
+        return events
+
+    def export_trace(self, path):
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
+
+
+_profiler = None
+
+
+def get_profiler():
+    """The session's profiler, shared by every mode so F3 stays on between games."""
+    global _profiler
+    if _profiler is None:
+        _profiler = FrameProfiler()
+    return _profiler
@@ -0,0 +1,84 @@
+"""
+Frame presentation for the game loops.
+
+In full mode every frame is cleared, redrawn and flipped. In dirty-rect mode
+the Renderer remembers where moving things were drawn last frame, erases
+only those rects, and pushes the old and new rects through
+pygame.display.update(rects). When the dirty area grows past
+FULL_FLIP_FRACTION of the screen (lots of balls) it falls back to a full
+redraw and flip, which is cheaper at that point.
+
+Static scenery lives on a background surface; erasing is a blit from it.
+"""
+import pygame
+
+BLACK = (0, 0, 0)
+DIRTY_RECTS = True          # set False to always clear + flip
+FULL_FLIP_FRACTION = 0.35   # dirty area (share of screen) above which a full flip is cheaper
+
+
+class Renderer:
+    def __init__(self, screen, dirty=DIRTY_RECTS):
+        self.screen = screen
+        self.dirty = dirty
+        self.screen_area = screen.get_width() * screen.get_height()
+        self.background = None  # screen-sized surface of static scenery (e.g. BrickField.layer())
+        self.full_redraw = True  # first frame is always complete
+        self.prev_rects = []
+        self.prev_area = 0
+        self.rects = []
+
+    def invalidate(self):
+        """Force the next frame to be a full redraw (e.g. after a menu drew over us)."""
+        self.full_redraw = True
+
+    def set_background(self, surface):
+        """Use `surface` as the static backdrop; a new one forces a full redraw."""
+        if surface is not self.background:
+            self.background = surface
+            self.full_redraw = True
+
+    def paint_background(self, rect=None):
+        background = self.background
+        if background is None:
+            self.screen.fill(BLACK, rect)
+        elif rect is None:
+            self.screen.blit(background, (0, 0))
+        else:
+            self.screen.blit(background, rect, rect)
+
+    def begin(self):
+        """Start a frame: repaint the whole background, or only last frame's rects."""
+        self.rects = []
+        if not self.dirty or self.full_redraw:
+            self.paint_background()
+        else:
+            for rect in self.prev_rects:
+                self.paint_background(rect)
+
+    def track(self, rect):
+        """Record a rect drawn this frame (the return value of pygame.draw.* / blit)."""
+        self.rects.append(rect)
+        return rect
+
+    def track_all(self, rects):
+        self.rects.extend(rects)
+
+    def erase(self, rect):
+        """Repaint the background under a rect that changed, e.g. a destroyed brick."""
+        if self.dirty and not self.full_redraw:
+            self.paint_background(rect)
+            self.rects.append(rect)
+
+    def present(self):
+        rects = self.rects
+        area = sum(r.width * r.height for r in rects)
+        limit = self.screen_area * FULL_FLIP_FRACTION
+        if not self.dirty or self.full_redraw or area + self.prev_area > limit:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.prev_rects + rects)
+        self.prev_rects = rects
+        self.prev_area = area
+        # while the moving set alone is that big, partial erasing doesn't pay either
+        self.full_redraw = self.dirty and area > limit
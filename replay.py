@@ -0,0 +1,280 @@
+"""
+Deterministic replays: the match setup plus one key byte per tick.
+
+A Match is fully determined by its seed, settings and the Inputs fed to
+each step(), so that is all a replay stores. Key states are run-length
+encoded (they change rarely) and the payload is zlib-compressed: ten
+minutes of play is a few KB. Every CHECKPOINT_TICKS the recorder also
+stores a short hash of the simulation state, and verification re-runs the
+match headlessly at full speed and reports the first checkpoint that
+differs.
+
+File layout: "PGRP", version u16, then zlib of
+    meta length u32, meta JSON (mode, seed, difficulty, stage, ..., checkpoints),
+    runs of (key bits u8, length u16)
+
+    python replay.py verify last_replay.pgr
+    python replay.py verify last_replay.pgr --fast   # event-driven, see event_engine.py
+    python replay.py info last_replay.pgr
+    python replay.py record bot.pgr --mode campaign --ticks 36000 --seed 3
+"""
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from simulation import Match, Inputs
+
+MAGIC = b"PGRP"
+VERSION = 1
+CHECKPOINT_TICKS = 600  # state hash every 10 s of play
+LAST_REPLAY = "last_replay.pgr"  # the game loops save every match here
+RUN = struct.Struct("<BH")
+MAX_RUN = 0xFFFF
+
+
+class ReplayError(ValueError):
+    pass
+
+
+# ---------------------- State Hash ----------------------
+def state_hash(match):
+    """Short hex digest of everything that decides how the match continues."""
+    h = hashlib.blake2b(digest_size=8)
+    s = match.state
+    h.update(repr((s.frame, s.left_score, s.right_score, s.round_wins_left, s.round_wins_right,
+                   s.current_round, s.done, s.winner, s.stage, s.lives, s.goals,
+                   match.hit_counter, match.left_speed, match.right_speed)).encode())
+    for p in match.paddles:
+        h.update(repr((tuple(p.rect), p.full_height_active, p.full_height_timer, p.cooldown_timer)).encode())
+    balls = match.balls
+    if match.mode == "chaos":
+        n = balls.count
+        for array in (balls.x, balls.y, balls.dx, balls.dy, balls.debounce):
+            h.update(array[:n].tobytes())
+    else:
+        for b in balls:
+            h.update(struct.pack("<4di", b.x, b.y, b.dx, b.dy, b.recent_hit_frames))
+    if match.bricks is not None:
+        h.update(match.bricks.alive.to_bytes((len(match.bricks.x) + 7) // 8 or 1, "little"))
+        h.update(match.bricks.hits.tobytes())
+    return h.hexdigest()
+
+
+# ---------------------- Recording ----------------------
+class ReplayRecorder:
+    """Wraps a Match: step() logs the inputs, steps, and hashes at checkpoints."""
+
+    def __init__(self, match, level_pack_path=None):
+        self.match = match
+        self.meta = {
+            "mode": match.mode,
+            "seed": match.seed,
+            "difficulty": match.difficulty,
+            "stage": match.state.stage,
+            "ai_profile": match.ai_profile,
+            "brick_tuning": match.brick_tuning,
+            "level_pack": level_pack_path,
+            "ball_collisions": match.ball_collisions,
+        }
+        self.keys = bytearray()
+        self.checkpoints = []  # [tick, hash]
+
+    def step(self, inputs):
+        self.keys.append(inputs.to_bits())
+        state = self.match.step(inputs)
+        if len(self.keys) % CHECKPOINT_TICKS == 0:
+            self.checkpoints.append([len(self.keys), state_hash(self.match)])
+        return state
+
+    def finish(self):
+        """Close the log with a final checkpoint; returns the replay bytes."""
+        if self.keys and (not self.checkpoints or self.checkpoints[-1][0] != len(self.keys)):
+            self.checkpoints.append([len(self.keys), state_hash(self.match)])
+        meta = dict(self.meta, ticks=len(self.keys), checkpoints=self.checkpoints)
+        return encode(meta, self.keys)
+
+    def save(self, path=LAST_REPLAY):
+        data = self.finish()
+        with open(path, "wb") as f:
+            f.write(data)
+        return len(data)
+
+
+# ---------------------- Encoding ----------------------
+def key_runs(keys, limit=None):
+    """(bits, length) for each run of equal key bytes, split at `limit` ticks."""
+    i, n = 0, len(keys)
+    while i < n:
+        bits = keys[i]
+        j = i + 1
+        while j < n and keys[j] == bits and (limit is None or j - i < limit):
+            j += 1
+        yield bits, j - i
+        i = j
+
+
+def encode_runs(keys):
+    return b"".join(RUN.pack(bits, length) for bits, length in key_runs(keys, MAX_RUN))
+
+
+def decode_runs(data):
+    keys = bytearray()
+    for bits, length in RUN.iter_unpack(data):
+        keys += bytes((bits,)) * length
+    return keys
+
+
+def encode(meta, keys):
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode()
+    payload = struct.pack("<I", len(meta_bytes)) + meta_bytes + encode_runs(keys)
+    return MAGIC + struct.pack("<H", VERSION) + zlib.compress(payload, 9)
+
+
+def decode(data):
+    """(meta, key bytes) from replay file contents."""
+    if data[:4] != MAGIC:
+        raise ReplayError("not a replay file")
+    (version,) = struct.unpack_from("<H", data, 4)
+    if version != VERSION:
+        raise ReplayError(f"unsupported replay version {version}")
+    try:
+        payload = zlib.decompress(data[6:])
+    except zlib.error as e:
+        raise ReplayError(f"corrupt replay: {e}") from None
+    (meta_len,) = struct.unpack_from("<I", payload, 0)
+    meta = json.loads(payload[4:4 + meta_len])
+    keys = decode_runs(payload[4 + meta_len:])
+    if len(keys) != meta["ticks"]:
+        raise ReplayError(f"replay has {len(keys)} ticks of input, header says {meta['ticks']}")
+    return meta, keys
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return decode(f.read())
+
+
+# ---------------------- Playback ----------------------
+def match_from_meta(meta):
+    pack = None
+    if meta.get("level_pack"):
+        from level_pack import LevelPack
+        pack = LevelPack(meta["level_pack"])
+    return Match(meta["mode"], seed=meta["seed"], difficulty=meta["difficulty"], stage=meta["stage"],
+                 ai_profile=meta["ai_profile"], brick_tuning=meta["brick_tuning"], level_pack=pack,
+                 ball_collisions=meta.get("ball_collisions", False))
+
+
+def playback(meta, keys, on_tick=None, fast=False):
+    """
+    Re-simulate a replay headlessly, as fast as possible. Returns
+    (match, first mismatching checkpoint tick or None). on_tick(match) runs
+    after every step, e.g. to render or profile a repro.
+
+    fast=True plays the key runs through event_engine.EventEngine, which
+    jumps over quiet frames and needs no per-tick callback. It only does so
+    in the modes where that is quicker (event_engine.PAYS_OFF); the others
+    are stepped as usual.
+    """
+    match = match_from_meta(meta)
+    checkpoints = dict((tick, digest) for tick, digest in meta["checkpoints"])
+    inputs = Inputs()
+    mismatch = None
+    if fast and on_tick is None:
+        from event_engine import EventEngine, PAYS_OFF
+        fast = match.mode in PAYS_OFF
+    else:
+        fast = False
+    if fast:
+        engine = EventEngine(match)
+        stops = sorted(checkpoints) + [len(keys)]
+        tick = stop = 0
+        for bits, length in key_runs(keys):
+            while length:
+                while stops[stop] <= tick:
+                    stop += 1
+                chunk = min(length, stops[stop] - tick)  # pause at each checkpoint to compare the hash
+                engine.advance(inputs.set_bits(bits), chunk)
+                tick += chunk
+                length -= chunk
+                expected = checkpoints.get(tick)
+                if expected is not None and state_hash(match) != expected and mismatch is None:
+                    mismatch = tick
+        return match, mismatch
+    for tick, bits in enumerate(keys, 1):
+        match.step(inputs.set_bits(bits))
+        if on_tick is not None:
+            on_tick(match)
+        expected = checkpoints.get(tick)
+        if expected is not None and state_hash(match) != expected and mismatch is None:
+            mismatch = tick
+    return match, mismatch
+
+
+def verify(path, fast=False):
+    """Replay `path`; True if every checkpoint hash matched."""
+    meta, keys = load(path)
+    start = time.perf_counter()
+    match, mismatch = playback(meta, keys, fast=fast)
+    elapsed = time.perf_counter() - start
+    rate = len(keys) / elapsed if elapsed else float("inf")
+    print(f"{path}: {len(keys)} ticks ({len(keys) / 60:.0f} s of play) replayed in {elapsed:.2f} s "
+          f"({rate:.0f} ticks/s), {len(meta['checkpoints'])} checkpoints")
+    if mismatch is not None:
+        print(f"DESYNC: state differs from the recording at tick {mismatch}")
+        return False
+    print("all checkpoints match")
+    return True
+
+
+# ---------------------- CLI ----------------------
+def record_bot(path, mode, ticks, seed, difficulty="Medium", stage=1, ball_collisions=False):
+    """Record the tournament tracking bot playing `ticks` ticks (for perf repros and checks)."""
+    from tournament import tracking_bot
+    match = Match(mode, seed=seed, difficulty=difficulty, stage=stage, ball_collisions=ball_collisions)
+    recorder = ReplayRecorder(match)
+    inputs = Inputs()
+    for _ in range(ticks):
+        recorder.step(tracking_bot(match, inputs))
+    size = recorder.save(path)
+    print(f"recorded {ticks} ticks of {mode} to {path} ({size} bytes)")
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Verify, inspect and record match replays.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ver = sub.add_parser("verify", help="re-simulate and check every state hash")
+    ver.add_argument("path")
+    ver.add_argument("--fast", action="store_true", help="jump over quiet frames with the event engine (pvp / ai)")
+    sub.add_parser("info", help="print the replay header").add_argument("path")
+    rec = sub.add_parser("record", help="record the tracking bot (left paddle) for a number of ticks")
+    rec.add_argument("path")
+    rec.add_argument("--mode", default="ai", choices=("ai", "pvp", "campaign"))  # the bot can't read a BallArray
+    rec.add_argument("--ticks", type=int, default=36000)
+    rec.add_argument("--seed", type=int, default=0)
+    rec.add_argument("--difficulty", default="Medium")
+    rec.add_argument("--stage", type=int, default=1)
+    rec.add_argument("--ball-collisions", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "verify":
+        return 0 if verify(args.path, args.fast) else 1
+    if args.command == "info":
+        meta, keys = load(args.path)
+        checkpoints = meta.pop("checkpoints")
+        print(json.dumps(meta, indent=2))
+        print(f"{len(checkpoints)} checkpoints, {len(encode_runs(keys)) // RUN.size} key runs")
+        return 0
+    record_bot(args.path, args.mode, args.ticks, args.seed, args.difficulty, args.stage, args.ball_collisions)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
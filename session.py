@@ -0,0 +1,46 @@
+"""
+The game's single display session.
+
+Nothing here runs at import: pygame is initialised and the window created
+by the first get_screen() call, and after that the menus and every mode
+draw into that same window instead of calling set_mode again. Only the
+owner of the session (interface.main_menu, or whoever called a mode
+directly) shuts it down; a mode that sees the window being closed calls
+request_quit() so the QUIT reaches the owner.
+"""
+import pygame
+
+SIZE = (800, 600)
+
+_screen = None
+_clock = None
+
+
+def get_screen(caption=None):
+    """The shared window surface, opened on first use."""
+    global _screen
+    if _screen is None or pygame.display.get_surface() is None:
+        pygame.init()
+        _screen = pygame.display.set_mode(SIZE)
+    if caption is not None:
+        pygame.display.set_caption(caption)
+    return _screen
+
+
+def get_clock():
+    global _clock
+    if _clock is None:
+        _clock = pygame.time.Clock()
+    return _clock
+
+
+def request_quit():
+    """Hand a window close back to the session owner's event loop."""
+    pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+
+def close():
+    global _screen, _clock
+    _screen = None
+    _clock = None
+    pygame.quit()
@@ -0,0 +1,495 @@
+"""
+Headless simulation core shared by every game mode.
+
+A Match owns the paddles, balls, bricks and scores of one game and advances
+them one frame per step(). It never touches the display, the clock or the
+event queue, so it can be stepped in a tight loop by bots, tests and
+analytics; pong_game and campaign only feed it input and draw it.
+
+    match = Match("ai", seed=1234)
+    while not match.state.done:
+        state = match.step(Inputs(left_up=True))
+"""
+import random
+
+import pygame
+
+import campaign
+from collision import substeps_needed, SUBSTEP_THRESHOLD, BallCollider
+from pong_game import BallPool, Paddle, ai_move, WIDTH, HEIGHT, PADDLE_WIDTH, PADDLE_HEIGHT, PADDLE_SPEED, FPS
+
+# ---------------------- Rules ----------------------
+MODES = ("ai", "pvp", "campaign", "chaos")
+RNG_STREAMS = ("balls", "ai", "stages")  # one random.Random per purpose, all derived from the match seed
+
+PONG_MAX_BALLS = 10
+HITS_TO_SPAWN = 4
+POINTS_TO_WIN_ROUND = 15
+ROUNDS_TO_WIN_GAME = 3
+BALL_COLLISIONS = False  # default for Match(ball_collisions=None); `interface.py --ball-collisions` sets it
+
+# chaos: endless AI match on the NumPy ball store (ball_engine.BallArray)
+CHAOS_START_BALLS = 10000
+CHAOS_MAX_BALLS = 20000
+CHAOS_SPAWN_BURST = 250
+
+
+# ---------------------- Timing ----------------------
+MAX_CATCH_UP_TICKS = 5  # after a long hitch, drop time rather than spiral
+
+
+class FixedTimestep:
+    """
+    Accumulates real frame time and hands out whole simulation ticks of
+    1/FPS seconds, so gameplay runs at the same rate whatever the render
+    rate. `alpha` is how far the renderer is between the last two ticks.
+    """
+
+    def __init__(self, tick_rate=FPS, max_ticks=MAX_CATCH_UP_TICKS):
+        self.tick = 1 / tick_rate
+        self.max_ticks = max_ticks
+        self.accumulator = 0.0
+
+    def advance(self, frame_time):
+        """Add `frame_time` seconds and return how many ticks to simulate now."""
+        self.accumulator += frame_time
+        ticks = int(self.accumulator / self.tick)
+        if ticks > self.max_ticks:
+            # too far behind: run the cap and forget the rest of the backlog
+            ticks = self.max_ticks
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= ticks * self.tick
+        return ticks
+
+    @property
+    def alpha(self):
+        return min(self.accumulator / self.tick, 1.0)
+
+    def reset(self):
+        self.accumulator = 0.0
+
+
+# ---------------------- Inputs ----------------------
+class Inputs:
+    """Key state for one frame. Right-side keys are ignored unless mode is "pvp"."""
+
+    FIELDS = ("left_up", "left_down", "left_boost", "right_up", "right_down", "right_boost")
+
+    def __init__(self, left_up=False, left_down=False, left_boost=False,
+                 right_up=False, right_down=False, right_boost=False):
+        self.left_up = left_up
+        self.left_down = left_down
+        self.left_boost = left_boost
+        self.right_up = right_up
+        self.right_down = right_down
+        self.right_boost = right_boost
+
+    def read_keys(self, keys):
+        """Fill from pygame.key.get_pressed() using the game's bindings."""
+        self.left_up = keys[pygame.K_w]
+        self.left_down = keys[pygame.K_s]
+        self.left_boost = keys[pygame.K_SPACE]
+        self.right_up = keys[pygame.K_UP]
+        self.right_down = keys[pygame.K_DOWN]
+        self.right_boost = keys[pygame.K_LEFT]
+        return self
+
+    def to_bits(self):
+        """Pack the six keys into one int (bit i = FIELDS[i]), e.g. for replays."""
+        bits = 0
+        for i, name in enumerate(self.FIELDS):
+            if getattr(self, name):
+                bits |= 1 << i
+        return bits
+
+    def set_bits(self, bits):
+        for i, name in enumerate(self.FIELDS):
+            setattr(self, name, bool(bits >> i & 1))
+        return self
+
+
+# ---------------------- State ----------------------
+class MatchState:
+    """
+    Scalar state of a Match, updated in place by every step().
+    `events` lists what happened during the last step:
+    "hit", "spawn", "goal_left", "goal_right", "round_over", "life_lost",
+    "stage_clear", "game_over".
+    """
+
+    def __init__(self):
+        self.frame = 0
+        self.events = []
+        self.done = False
+        self.winner = None
+        # pong modes
+        self.left_score = 0
+        self.right_score = 0
+        self.current_round = 1
+        self.round_wins_left = 0
+        self.round_wins_right = 0
+        # campaign
+        self.stage = 1
+        self.lives = campaign.LIVES_PER_STAGE
+        self.goals = 0
+
+
+# ---------------------- Match ----------------------
+class Match:
+    def __init__(self, mode="ai", seed=None, difficulty="Medium", chaos_balls=CHAOS_START_BALLS,
+                 stage=1, ai_profile=None, brick_tuning=None, prefetch_stages=False,
+                 level_pack=None, ball_collisions=None):
+        if mode not in MODES:
+            raise ValueError(f"unknown mode {mode!r}, expected one of {MODES}")
+        self.mode = mode
+        # always known, so any match (seeded or not) can be written to a replay
+        self.seed = seed if seed is not None else random.randrange(1 << 63)
+        self.difficulty = difficulty
+        self.ai_profile = ai_profile      # overrides AI_PROFILES / CAMPAIGN_AI (tournament sweeps)
+        self.brick_tuning = brick_tuning  # overrides campaign.BRICK_TUNING
+        self.level_pack = level_pack      # level_pack.LevelPack supplying the first stages
+        # named streams: drawing more or fewer AI errors never changes how balls serve
+        self.rngs = {name: random.Random(f"{self.seed}:{name}") for name in RNG_STREAMS}
+        self.ball_rng = self.rngs["balls"]
+        self.ai_rng = self.rngs["ai"]
+        self.ball_pool = BallPool(self.ball_rng)  # goals, resets and stages recycle Ball objects
+        self.balls = []
+        self.dt = 1 / FPS  # paddle timers advance by one frame per step
+        self.state = MatchState()
+        self.hit_counter = 0
+        self.bricks = None
+        self.stages = None  # campaign.StagePrefetcher when upcoming stages are built in the background
+        self.profiler = None  # profiler.FrameProfiler; step() marks its ai / balls / bricks phases
+        # balls bounce off each other (ai / pvp / campaign; chaos balls live in a BallArray and pass through)
+        self.ball_collisions = BALL_COLLISIONS if ball_collisions is None else ball_collisions
+        self.ball_collider = BallCollider() if self.ball_collisions and mode != "chaos" else None
+
+        if mode == "campaign":
+            self.state.stage = stage
+            self.stage_seed = self.rngs["stages"].getrandbits(64)  # every stage layout derives from this
+            if prefetch_stages:
+                self.stages = campaign.StagePrefetcher(self.stage_seed, self.brick_tuning, pack=level_pack)
+                self.stages.prefetch(stage + 1)
+            self.left_paddle = Paddle(20, HEIGHT//2 - 50)
+            self.right_paddle = Paddle(WIDTH - 30, HEIGHT//2 - 50)
+            self.base_speed = PADDLE_SPEED
+            self._reset_stage()
+        else:
+            self.left_paddle = Paddle(50, HEIGHT // 2 - PADDLE_HEIGHT // 2)
+            self.right_paddle = Paddle(WIDTH - 50 - PADDLE_WIDTH, HEIGHT // 2 - PADDLE_HEIGHT // 2)
+            if mode == "chaos":
+                from ball_engine import BallArray
+                self.balls = BallArray(CHAOS_MAX_BALLS, self.ball_rng)
+                self.balls.spawn_burst(chaos_balls)
+            else:
+                self.balls.append(self.ball_pool.acquire())
+            self.left_speed = PADDLE_SPEED
+            self.right_speed = PADDLE_SPEED
+
+    def close(self):
+        """Stop background stage building, if any."""
+        if self.stages is not None:
+            self.stages.close()
+            self.stages = None
+
+    @property
+    def paddles(self):
+        return self.left_paddle, self.right_paddle
+
+    def move_ai(self):
+        """One frame of the right paddle's AI (ai and campaign modes)."""
+        if self.mode == "campaign":
+            campaign.ai_move(self.right_paddle, self.balls, self.right_speed, rng=self.ai_rng, profile=self.ai_profile)
+        else:
+            ai_move(self.right_paddle, self.balls, speed=PADDLE_SPEED, difficulty=self.difficulty, rng=self.ai_rng,
+                    profile=self.ai_profile)
+
+    def step(self, inputs):
+        """Advance the match by one frame and return its MatchState."""
+        state = self.state
+        state.events.clear()
+        if state.done:
+            return state
+        state.frame += 1
+        for paddle in self.paddles:
+            paddle.prev_y = paddle.rect.y
+            paddle.prev_height = paddle.rect.height
+        if self.mode == "campaign":
+            self._step_campaign(inputs)
+        elif self.mode == "chaos":
+            self._step_chaos(inputs)
+        else:
+            self._step_pong(inputs)
+        if self.profiler is not None:
+            self.profiler.mark("balls")
+        return state
+
+    # ----- Ball motion -----
+    def _move_ball(self, ball, collide):
+        """
+        ball.move(), split into sub-steps when a fast ball's swept path
+        crosses a paddle or brick so it cannot tunnel through them.
+        collide(ball) runs after every sub-step but the last; the caller's
+        own collision pass covers the last one. Returns True if any of
+        those intermediate collide() calls reported a paddle hit.
+        """
+        if abs(ball.dx) <= SUBSTEP_THRESHOLD and abs(ball.dy) <= SUBSTEP_THRESHOLD:
+            ball.move()
+            return False
+        steps = substeps_needed(ball, self.paddles, self.bricks)
+        if steps == 1:
+            ball.move()
+            return False
+
+        ball.prev_x, ball.prev_y = ball.x, ball.y
+        if ball.recent_hit_frames > 0:
+            ball.recent_hit_frames -= 1
+        fraction = 1 / steps
+        hit = False
+        for _ in range(steps - 1):
+            ball.advance(fraction)
+            if collide(ball):
+                hit = True
+        ball.advance(fraction)
+        return hit
+
+    def _collide_paddles(self, ball):
+        hit = ball.check_collision(self.left_paddle, is_left_paddle=True)
+        if ball.check_collision(self.right_paddle, is_left_paddle=False):
+            hit = True
+        return hit
+
+    def _collide_campaign(self, ball):
+        hit = ball.check_collision(self.left_paddle, True) or ball.check_collision(self.right_paddle, False)
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.mark("balls")
+            self.bricks.collide(ball)
+            profiler.mark("bricks")
+        else:
+            self.bricks.collide(ball)
+        return hit
+
+    # ----- Pong (start_game / start_game1) -----
+    def _step_pong(self, inputs):
+        state = self.state
+        events = state.events
+        left_paddle, right_paddle = self.left_paddle, self.right_paddle
+
+        # --- Player 1 movement (W/S/SPACE) ---
+        if inputs.left_down:
+            left_paddle.move(-self.left_speed)
+        if inputs.left_up:
+            left_paddle.move(self.left_speed)
+        if inputs.left_boost:
+            left_paddle.activate_full_height()
+
+        if self.mode == "pvp":
+            # --- Player 2 movement (UP/DOWN/LEFT) ---
+            if inputs.right_down:
+                right_paddle.move(-self.right_speed)
+            if inputs.right_up:
+                right_paddle.move(self.right_speed)
+            if inputs.right_boost:
+                right_paddle.activate_full_height()
+
+        # --- Update paddle timers ---
+        left_paddle.update(self.dt)
+        right_paddle.update(self.dt)
+
+        if self.mode == "ai":
+            self.move_ai()
+        if self.profiler is not None:
+            self.profiler.mark("ai")
+
+        frame_had_hit = False
+        balls = self.balls
+        pool = self.ball_pool
+        i = 0
+        end = len(balls)  # balls from `end` on were served this frame and wait for the next one
+        while i < end:
+            ball = balls[i]
+            if self._move_ball(ball, self._collide_paddles):
+                frame_had_hit = True
+
+            if self._collide_paddles(ball):
+                frame_had_hit = True
+
+            # scoring
+            if ball.x < 0:
+                state.right_score += 1
+                events.append("goal_right")
+            elif ball.x > WIDTH:
+                state.left_score += 1
+                events.append("goal_left")
+            else:
+                i += 1
+                continue
+            # swap-remove, O(1): the last ball still to move this frame takes the
+            # scored ball's slot and the fresh serve takes its place, past `end`
+            pool.release(ball)
+            end -= 1
+            balls[i] = balls[end]
+            balls[end] = pool.acquire()
+
+        if self.ball_collider is not None:
+            self.ball_collider.collide(balls)
+
+        if frame_had_hit:
+            events.append("hit")
+
+        # global 4-hit spawn (only increment once per frame)
+        if frame_had_hit and len(balls) < PONG_MAX_BALLS:
+            self.hit_counter += 1
+            if self.hit_counter >= HITS_TO_SPAWN:
+                self.hit_counter = 0
+                nb = pool.acquire()
+                nb.x, nb.y = WIDTH // 2, HEIGHT // 2
+                nb.prev_x, nb.prev_y = nb.x, nb.y
+                balls.append(nb)
+                events.append("spawn")
+                self.left_speed = min(self.left_speed * 1.2, PADDLE_SPEED * 3)
+                self.right_speed = min(self.right_speed * 1.2, PADDLE_SPEED * 3)
+
+        # --- Check round win ---
+        if state.left_score >= POINTS_TO_WIN_ROUND or state.right_score >= POINTS_TO_WIN_ROUND:
+            if state.left_score >= POINTS_TO_WIN_ROUND:
+                state.round_wins_left += 1
+            else:
+                state.round_wins_right += 1
+            state.left_score = 0
+            state.right_score = 0
+            pool.release_all(balls)
+            balls.append(pool.acquire())
+            state.current_round += 1
+            events.append("round_over")
+
+        # --- Check game win ---
+        if state.round_wins_left == ROUNDS_TO_WIN_GAME or state.round_wins_right == ROUNDS_TO_WIN_GAME:
+            state.winner = "Left Player" if state.round_wins_left == ROUNDS_TO_WIN_GAME else "Right Player"
+            state.done = True
+            events.append("game_over")
+
+    # ----- Chaos (batched pong on a BallArray) -----
+    def _step_chaos(self, inputs):
+        state = self.state
+        events = state.events
+        left_paddle, right_paddle = self.left_paddle, self.right_paddle
+
+        if inputs.left_down:
+            left_paddle.move(-self.left_speed)
+        if inputs.left_up:
+            left_paddle.move(self.left_speed)
+        if inputs.left_boost:
+            left_paddle.activate_full_height()
+        left_paddle.update(self.dt)
+
+        balls = self.balls
+        ai_move(right_paddle, balls.ai_view(), speed=self.right_speed, difficulty=self.difficulty, rng=self.ai_rng,
+                profile=self.ai_profile)
+        if self.profiler is not None:
+            self.profiler.mark("ai")
+
+        balls.move()
+        hits = balls.collide(left_paddle, is_left_paddle=True)
+        hits += balls.collide(right_paddle, is_left_paddle=False)
+        left_goals, right_goals = balls.score()
+        if left_goals:
+            state.left_score += left_goals
+            events.append("goal_left")
+        if right_goals:
+            state.right_score += right_goals
+            events.append("goal_right")
+
+        if hits:
+            events.append("hit")
+            self.hit_counter += 1
+            if self.hit_counter >= HITS_TO_SPAWN:
+                self.hit_counter = 0
+                if balls.spawn_burst(CHAOS_SPAWN_BURST):
+                    events.append("spawn")
+                self.left_speed = min(self.left_speed * 1.2, PADDLE_SPEED * 3)
+                self.right_speed = min(self.right_speed * 1.2, PADDLE_SPEED * 3)
+
+    # ----- Campaign (run_campaign) -----
+    def _reset_stage(self):
+        index = self.state.stage
+        if self.stages is not None:
+            bricks = self.stages.take(index)
+        else:
+            bricks = campaign.build_stage(self.stage_seed, index, self.brick_tuning, self.level_pack)
+        stage = campaign.reset_stage(index, rng=self.ball_rng, tuning=self.brick_tuning, bricks=bricks,
+                                     pool=self.ball_pool, balls=self.balls)
+        (self.balls, self.bricks, self.left_speed, self.right_speed, self.split_multiplier,
+         self.hits_since_last_split, self.state.lives) = stage
+
+    def _center_paddles(self):
+        for paddle in self.paddles:
+            paddle.rect.centery = HEIGHT//2
+            paddle.prev_y = paddle.rect.y  # teleport: don't interpolate
+
+    def _step_campaign(self, inputs):
+        state = self.state
+        events = state.events
+        left_paddle = self.left_paddle
+
+        # --- Player input ---
+        if inputs.left_down: left_paddle.move(-self.left_speed)
+        if inputs.left_up: left_paddle.move(self.left_speed)
+        if inputs.left_boost:
+            left_paddle.activate_full_height()
+        # --- Update paddle timers ---
+        left_paddle.update(self.dt)
+        # --- AI ---
+        self.move_ai()
+        if self.profiler is not None:
+            self.profiler.mark("ai")
+
+        # --- Ball update ---
+        for ball in self.balls:  # every change to the list below ends the walk with break/return
+            if self._move_ball(ball, self._collide_campaign):
+                self.hits_since_last_split += 1
+                events.append("hit")
+
+            # lose life if ball goes past left
+            if ball.x < 0:
+                state.lives -= 1
+                if state.lives > 0:
+                    events.append("life_lost")
+                    ball.reset()
+                    self._center_paddles()
+                else:
+                    state.done = True
+                    events.append("game_over")
+                    return
+                break
+
+            # win: score against right
+            if ball.x > WIDTH:
+                state.goals += 1
+                events.append("stage_clear")
+                state.stage += 1
+                self._reset_stage()
+                self._center_paddles()
+                state.goals = 0
+                break
+
+            # paddle and brick collisions
+            if self._collide_campaign(ball):
+                self.hits_since_last_split += 1
+                events.append("hit")
+
+        if self.ball_collider is not None:
+            self.ball_collider.collide(self.balls)
+
+        # --- Ball splitting ---
+        if self.hits_since_last_split >= campaign.HITS_TO_SPLIT:
+            self.hits_since_last_split = 0
+            if len(self.balls) < campaign.MAX_BALLS:
+                self.balls.append(self.ball_pool.acquire())
+                events.append("spawn")
+                if self.split_multiplier < 3.0:
+                    self.split_multiplier += 0.2
+                    self.left_speed = min(self.base_speed * self.split_multiplier, self.base_speed*3)
+                    self.right_speed = min(self.base_speed * self.split_multiplier, self.base_speed*3)
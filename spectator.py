@@ -0,0 +1,573 @@
+"""
+Live spectating: one encoded stream per match, fanned out to every viewer.
+
+The game loop hands each simulation tick to Broadcaster.publish(). The
+tick is encoded once, on the game thread, as a frame of the shared stream:
+
+- a keyframe every KEYFRAME_TICKS ticks and whenever the campaign stage
+  changes: mode, brick layout and the full state;
+- otherwise a delta against the previous tick: only the fields that
+  changed, as (index gap, difference) varint pairs. Still bricks and
+  unchanged scores cost nothing.
+
+A state is a flat list of ints: scores and stage, paddle rects, one hit
+count per brick (0 once destroyed), then x, y per ball in 1/8 px.
+
+The same bytes go to every subscriber, so encoding cost does not depend on
+the number of viewers. The asyncio server runs on its own thread and gives
+each subscriber a bounded queue. Viewers acknowledge the stream position
+they have shown every ACK_FRAMES frames; socket buffers can hide a stalled
+reader for a long time, acks can't. A viewer more than MAX_LAG frames
+behind, or with a full queue, is switched to frame skipping. Its queued
+frames are dropped and it only gets keyframes (deltas need the frame
+before them) until its acks catch up. One slow viewer never holds up the
+game or the other viewers.
+
+    python spectator.py host                   # play from the main menu; every match is broadcast
+    python spectator.py watch 127.0.0.1        # view it (add --headless for no window)
+    python spectator.py loadtest --viewers 300 # bot match, hundreds of local viewers, some slow
+
+Stream framing (server to viewer): length u32, then
+    KEY    "K", seq u32, tick u32, mode u8, brick count varint, x y w h indestructible varints per brick,
+           field count varint, field varints
+    DELTA  "D", seq u32, tick u32, field count varint, change count varint, (index gap, difference) varint pairs
+seq numbers the stream's frames; tick is the match frame. Viewers send back the
+last seq they applied as u32.
+"""
+import asyncio
+import os
+import struct
+import sys
+import threading
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from brick_field import BrickField
+from netplay import put_varint, get_varint, POS_SCALE, WINNERS
+from pong_game import Ball, Paddle, WIDTH, HEIGHT, PADDLE_WIDTH, PADDLE_HEIGHT, FPS, RENDER_FPS
+from simulation import MatchState
+
+PORT = 5556
+BROADCAST_PORT = None  # set (e.g. by `spectator.py host`) to broadcast every match played
+KEYFRAME_TICKS = FPS   # late joiners and skipping viewers wait at most a second
+QUEUE_FRAMES = 30      # frames queued per viewer before it skips to the next keyframe
+MAX_LAG = 2 * FPS      # frames a viewer's acks may trail the stream before it gets keyframes only
+ACK_FRAMES = 15        # viewers ack every this many frames
+STREAM_MODES = ("ai", "pvp", "campaign")  # chaos's 10,000 balls are not worth a stream
+FRAME = struct.Struct("<cII")
+LENGTH = struct.Struct("<I")
+ACK = struct.Struct("<I")
+
+# state layout: HEADER_FIELDS, one hit count per brick, x and y per ball
+HEADER_FIELDS = ("left_score", "right_score", "current_round", "round_wins_left", "round_wins_right", "winner",
+                 "stage", "lives", "goals",
+                 "left_x", "left_y", "left_height", "right_x", "right_y", "right_height")
+
+
+# ---------------------- Encoding ----------------------
+def state_ints(match):
+    state = match.state
+    ints = [state.left_score, state.right_score, state.current_round, state.round_wins_left, state.round_wins_right,
+            WINNERS.index(state.winner) if state.done else -1, state.stage, state.lives, state.goals]
+    for paddle in match.paddles:
+        ints += (paddle.rect.x, paddle.rect.y, paddle.rect.height)
+    bricks = match.bricks
+    if bricks is not None:
+        alive = bricks.alive
+        ints += [hits if alive >> i & 1 else 0 for i, hits in enumerate(bricks.hits)]
+    for ball in match.balls:
+        ints += (round(ball.x * POS_SCALE), round(ball.y * POS_SCALE))
+    return ints
+
+
+def encode_key(seq, tick, match, ints):
+    out = bytearray(FRAME.pack(b"K", seq, tick))
+    out.append(STREAM_MODES.index(match.mode))
+    bricks = match.bricks
+    put_varint(out, len(bricks.x) if bricks is not None else 0)
+    if bricks is not None:
+        for i in range(len(bricks.x)):
+            for value in (bricks.x[i], bricks.y[i], bricks.w[i], bricks.h[i], bricks.indestructible[i]):
+                put_varint(out, value)
+    put_varint(out, len(ints))
+    for value in ints:
+        put_varint(out, value)
+    return bytes(out)
+
+
+def encode_delta(seq, tick, ints, prev):
+    changes = bytearray()
+    count = 0
+    last = 0
+    for i, value in enumerate(ints):
+        old = prev[i] if i < len(prev) else 0
+        if value != old:
+            put_varint(changes, i - last)
+            put_varint(changes, value - old)
+            last = i
+            count += 1
+    out = bytearray(FRAME.pack(b"D", seq, tick))
+    put_varint(out, len(ints))
+    put_varint(out, count)
+    return bytes(out + changes)
+
+
+# ---------------------- Broadcasting ----------------------
+class Subscriber:
+    """One viewer: a bounded frame queue drained into its socket by _serve()."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.queue = asyncio.Queue(QUEUE_FRAMES)
+        self.acked = None    # last seq the viewer confirmed; None until its first frame is queued
+        self.waiting = True  # for a keyframe: new, or skipping after falling behind
+        self.skipped = 0
+        self.resyncs = 0
+
+    def offer(self, frame, key, seq):
+        queue = self.queue
+        if self.acked is None:
+            self.acked = seq
+        behind = queue.full() or seq - self.acked > MAX_LAG
+        if behind and not self.waiting:
+            self.waiting = True
+            self.resyncs += 1
+            while not queue.empty():
+                queue.get_nowait()
+                self.skipped += 1
+        if self.waiting and not key or behind and not queue.empty():
+            self.skipped += 1  # catching up: deltas are useless, and one keyframe in flight is enough
+            return
+        if not behind:
+            self.waiting = False
+        queue.put_nowait(frame)
+
+    def close(self):
+        """Drop the connection and let _serve() return."""
+        self.writer.transport.abort()
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class Broadcaster:
+    """Encodes each published tick once and fans it out from a background asyncio server."""
+
+    def __init__(self, host="0.0.0.0", port=PORT):
+        self.host = host
+        self.port = port
+        self.subscribers = set()
+        self.loop = None
+        self.thread = None
+        self.server = None
+        self.seq = 0           # frames published
+        self.prev = None       # ints of the last published tick
+        self.mode = None       # mode and field the last keyframe described
+        self.bricks = None
+        self.since_key = KEYFRAME_TICKS
+        self.frames = 0
+        self.keyframes = 0
+        self.bytes_encoded = 0
+        self.encode_time = 0.0
+        self.fan_out_time = 0.0
+
+    def start(self):
+        """Start serving; returns the bound port."""
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(ready,), name="spectator", daemon=True)
+        self.thread.start()
+        ready.wait()
+        return self.port
+
+    def _run(self, ready):
+        loop = self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.server = loop.run_until_complete(asyncio.start_server(self._serve, self.host, self.port))
+        self.port = self.server.sockets[0].getsockname()[1]
+        ready.set()
+        loop.run_forever()
+        self.server.close()
+        for subscriber in list(self.subscribers):
+            subscriber.close()
+        loop.run_until_complete(asyncio.gather(*asyncio.all_tasks(loop)))
+        loop.close()
+
+    async def _serve(self, reader, writer):
+        subscriber = Subscriber(writer)
+        self.subscribers.add(subscriber)
+        acks = asyncio.ensure_future(self._read_acks(reader, subscriber))
+        try:
+            while True:
+                frame = await subscriber.queue.get()
+                if frame is None:
+                    break
+                writer.write(frame)
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.subscribers.discard(subscriber)
+            acks.cancel()
+            writer.close()
+
+    async def _read_acks(self, reader, subscriber):
+        try:
+            while True:
+                (seq,) = ACK.unpack(await reader.readexactly(ACK.size))
+                if subscriber.acked is None or seq > subscriber.acked:
+                    subscriber.acked = seq
+        except (asyncio.IncompleteReadError, ConnectionError):
+            subscriber.close()
+
+    def close(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.loop = None
+
+    def publish(self, match):
+        """Encode this tick of `match` and queue it for every viewer. Call once per simulation step."""
+        if match.mode not in STREAM_MODES:
+            return
+        start = time.perf_counter()
+        self.seq += 1
+        tick = match.state.frame
+        ints = state_ints(match)
+        key = self.since_key >= KEYFRAME_TICKS or match.bricks is not self.bricks or match.mode != self.mode
+        if key:
+            body = encode_key(self.seq, tick, match, ints)
+            self.mode = match.mode
+            self.bricks = match.bricks
+            self.since_key = 0
+            self.keyframes += 1
+        else:
+            body = encode_delta(self.seq, tick, ints, self.prev)
+        self.since_key += 1
+        self.prev = ints
+        frame = LENGTH.pack(len(body)) + body
+        self.frames += 1
+        self.bytes_encoded += len(frame)
+        self.encode_time += time.perf_counter() - start
+        self.loop.call_soon_threadsafe(self._fan_out, frame, key, self.seq)
+
+    def _fan_out(self, frame, key, seq):
+        start = time.perf_counter()
+        for subscriber in self.subscribers:
+            subscriber.offer(frame, key, seq)
+        self.fan_out_time += time.perf_counter() - start
+
+
+_broadcaster = None
+
+
+def get_broadcaster():
+    """The session's broadcaster while BROADCAST_PORT is set, else None. The game loops publish to it."""
+    global _broadcaster
+    if BROADCAST_PORT is None:
+        return None
+    if _broadcaster is None:
+        _broadcaster = Broadcaster(port=BROADCAST_PORT)
+        _broadcaster.start()
+    return _broadcaster
+
+
+def close_broadcaster():
+    global _broadcaster
+    if _broadcaster is not None:
+        _broadcaster.close()
+        _broadcaster = None
+
+
+# ---------------------- Viewing ----------------------
+class StreamView:
+    """A Match look-alike rebuilt from the stream, for pong_game.draw_match / campaign.draw_campaign."""
+
+    def __init__(self):
+        self.mode = None
+        self.seq = 0
+        self.tick = 0
+        self.ints = None
+        self.state = MatchState()
+        self.left_paddle = Paddle(0, 0)
+        self.right_paddle = Paddle(0, 0)
+        self.bricks = None
+        self.balls = []
+        self.frames = 0
+        self.keyframes = 0
+        self.bytes = 0
+
+    @property
+    def paddles(self):
+        return self.left_paddle, self.right_paddle
+
+    def feed(self, data):
+        """Apply one stream frame (without its length prefix). False if it was a delta with no base."""
+        kind, seq, tick = FRAME.unpack_from(data)
+        pos = FRAME.size
+        if kind == b"K":
+            self.mode = STREAM_MODES[data[pos]]
+            pos += 1
+            count, pos = get_varint(data, pos)
+            bricks = None
+            if self.mode == "campaign":
+                bricks = BrickField()
+                for _ in range(count):
+                    values = []
+                    for _ in range(5):
+                        value, pos = get_varint(data, pos)
+                        values.append(value)
+                    x, y, w, h, indestructible = values
+                    bricks.add(x, y, w, h, 1, indestructible)
+            self.bricks = bricks
+            n, pos = get_varint(data, pos)
+            ints = []
+            for _ in range(n):
+                value, pos = get_varint(data, pos)
+                ints.append(value)
+            self.keyframes += 1
+        elif self.ints is None or seq != self.seq + 1:
+            return False  # a delta needs the frame right before it
+        else:
+            n, pos = get_varint(data, pos)
+            count, pos = get_varint(data, pos)
+            prev = self.ints
+            ints = prev[:n] + [0] * (n - len(prev))
+            i = 0
+            for _ in range(count):
+                gap, pos = get_varint(data, pos)
+                diff, pos = get_varint(data, pos)
+                i += gap
+                ints[i] += diff
+        self.seq = seq
+        self.tick = tick
+        self.ints = ints
+        self.frames += 1
+        self.bytes += len(data) + LENGTH.size
+        self.apply(ints)
+        return True
+
+    def apply(self, ints):
+        state = self.state
+        (state.left_score, state.right_score, state.current_round, state.round_wins_left, state.round_wins_right,
+         winner, state.stage, state.lives, state.goals) = ints[:9]
+        state.done = winner >= 0
+        state.winner = WINNERS[winner] if state.done else None
+        for i, paddle in enumerate(self.paddles):
+            x, y, height = ints[9 + 3 * i:12 + 3 * i]
+            paddle.rect.update(x, y, PADDLE_WIDTH, height)
+            paddle.prev_y, paddle.prev_height = y, height
+        pos = len(HEADER_FIELDS)
+        bricks = self.bricks
+        if bricks is not None:
+            for i in range(len(bricks.x)):
+                hits = ints[pos + i]
+                if bricks.indestructible[i] or hits == bricks.hits[i]:
+                    continue
+                bricks.hits[i] = hits
+                if hits <= 0 and bricks.is_alive(i):
+                    bricks.alive &= ~(1 << i)
+                    bricks.alive_count -= 1
+                bricks.changed.append(i)
+            pos += len(bricks.x)
+        balls = self.balls
+        count = (len(ints) - pos) // 2
+        del balls[count:]
+        while len(balls) < count:
+            balls.append(Ball())
+        for i, ball in enumerate(balls):
+            ball.x = ball.prev_x = ints[pos + 2 * i] / POS_SCALE
+            ball.y = ball.prev_y = ints[pos + 2 * i + 1] / POS_SCALE
+
+
+async def read_frames(reader, writer, view, on_frame=None, delay=0.0):
+    """
+    Feed length-prefixed frames from `reader` into `view` until the stream
+    ends, acking on `writer`. `delay` seconds of sleep per frame make a
+    deliberately slow viewer (loadtest).
+    """
+    acked = 0
+    try:
+        while True:
+            (length,) = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+            data = await reader.readexactly(length)
+            if view.feed(data):
+                if view.seq - acked >= ACK_FRAMES or delay:
+                    acked = view.seq
+                    writer.write(ACK.pack(acked))
+                if on_frame is not None:
+                    on_frame(view)
+            if delay:
+                await asyncio.sleep(delay)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+
+
+def watch(address, port=PORT, seconds=None):
+    """Connect to a broadcast and draw it until the window closes (or `seconds` pass)."""
+    from pong_game import draw_match
+    from campaign import draw_campaign
+    from render import Renderer
+    from text_cache import get_font
+    import session
+
+    screen = session.get_screen(f"Pong - watching {address}:{port}")
+    renderer = Renderer(screen)
+    font = get_font(None, 36)
+    view = StreamView()
+    drawn = [None, 0.0]  # bricks object on screen, last draw time
+
+    def draw(view):
+        now = time.perf_counter()
+        if RENDER_FPS and now - drawn[1] < 1 / RENDER_FPS:
+            return
+        drawn[1] = now
+        if view.bricks is not drawn[0]:
+            drawn[0] = view.bricks
+            if view.bricks is None:
+                renderer.set_background(None)
+            renderer.invalidate()
+        if view.mode == "campaign":
+            draw_campaign(renderer, view)
+        else:
+            draw_match(renderer, view, font)
+        renderer.present()
+
+    async def main():
+        reader, writer = await asyncio.open_connection(address, port)
+        stream = asyncio.ensure_future(read_frames(reader, writer, view, draw))
+        start = time.perf_counter()
+        while not stream.done():
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    stream.cancel()
+            if seconds is not None and time.perf_counter() - start > seconds:
+                stream.cancel()
+            await asyncio.sleep(0.05)
+        writer.close()
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(main())
+    print(f"watched {view.frames} frames ({view.keyframes} keyframes) in {elapsed:.1f} s, "
+          f"{view.bytes / max(elapsed, 1e-9):.0f} B/s, last tick {view.tick}")
+    return view
+
+
+# ---------------------- Load Test ----------------------
+async def open_viewer(port, slow):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    view = StreamView()
+    task = asyncio.ensure_future(read_frames(reader, writer, view, delay=1.0 if slow else 0.0))
+    return view, writer, task
+
+
+def loadtest(viewers=300, slow=30, seconds=5.0, mode="ai", balls=10, seed=1):
+    """
+    Broadcast a bot match with `balls` balls (pong modes) to `viewers` local
+    connections, `slow` of which read one frame a second.
+    """
+    from simulation import Match, Inputs
+    from tournament import tracking_bot
+
+    broadcaster = Broadcaster("127.0.0.1", 0)
+    port = broadcaster.start()
+    sent = {}  # tick -> ints, to check what the viewers decoded
+
+    def new_match(n):
+        match = Match(mode, seed=seed + n)
+        if mode != "campaign":
+            while len(match.balls) < balls:
+                match.balls.append(Ball(match.ball_rng))
+        return match
+
+    async def main():
+        clients = [await open_viewer(port, i < slow) for i in range(viewers)]
+        while len(broadcaster.subscribers) < viewers:
+            await asyncio.sleep(0.01)
+        subscribers = list(broadcaster.subscribers)
+        match = new_match(0)
+        inputs = Inputs()
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        for _ in range(int(seconds * FPS)):
+            if match.state.done:
+                match = new_match(match.state.frame)
+            match.step(tracking_bot(match, inputs))
+            broadcaster.publish(match)
+            sent[match.state.frame] = broadcaster.prev
+            next_tick += 1 / FPS
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+        await asyncio.sleep(0.5)  # let the fast viewers catch up
+        for _, writer, task in clients:
+            task.cancel()
+            writer.close()
+        return clients, subscribers
+
+    clients, subscribers = asyncio.run(main())
+    broadcaster.close()
+    fast = [view for view, _, _ in clients[slow:]]
+    crawling = [view for view, _, _ in clients[:slow]]
+    wrong = sum(1 for view, _, _ in clients if view.ints is not None and sent.get(view.tick) != view.ints)
+    frames = broadcaster.frames
+    print(f"{mode}: {frames} ticks to {viewers} viewers ({slow} slow), {broadcaster.keyframes} keyframes, "
+          f"{broadcaster.bytes_encoded / frames:.1f} B per tick encoded once")
+    print(f"encode {broadcaster.encode_time / frames * 1e6:.0f} us/tick, "
+          f"fan-out {broadcaster.fan_out_time / frames * 1e6:.0f} us/tick "
+          f"({broadcaster.fan_out_time / frames / viewers * 1e6:.2f} us per viewer)")
+    print(f"fast viewers: min {min(v.frames for v in fast)} / {frames} frames, "
+          f"slow viewers: mean {sum(v.frames for v in crawling) / max(1, slow):.0f} frames, "
+          f"{sum(s.resyncs for s in subscribers)} resyncs, {sum(s.skipped for s in subscribers)} frames skipped")
+    print(f"viewers whose last frame differs from the source: {wrong}")
+    ok = wrong == 0 and min(v.frames for v in fast) >= frames - KEYFRAME_TICKS
+    print("ok" if ok else "FAILED")
+    return ok
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Broadcast matches to spectators, or watch one.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    host = sub.add_parser("host", help="open the main menu and broadcast every match played")
+    host.add_argument("--port", type=int, default=PORT)
+    view = sub.add_parser("watch", help="watch a broadcast")
+    view.add_argument("address")
+    view.add_argument("--port", type=int, default=PORT)
+    view.add_argument("--headless", action="store_true", help="render off-screen (SDL dummy driver)")
+    view.add_argument("--seconds", type=float)
+    test = sub.add_parser("loadtest", help="bot match to many local viewers")
+    test.add_argument("--viewers", type=int, default=300)
+    test.add_argument("--slow", type=int, default=30, help="viewers that read one frame a second")
+    test.add_argument("--seconds", type=float, default=5.0)
+    test.add_argument("--mode", default="ai", choices=STREAM_MODES)
+    test.add_argument("--balls", type=int, default=10, help="balls kept in play (pong modes)")
+    args = parser.parse_args(argv)
+
+    if args.command == "loadtest":
+        return 0 if loadtest(args.viewers, args.slow, args.seconds, args.mode, args.balls) else 1
+    import session
+    if args.command == "host":
+        import interface
+        import spectator  # the module the game loops import, not this __main__ copy
+        spectator.BROADCAST_PORT = args.port
+        print(f"broadcasting matches on TCP port {args.port}")
+        try:
+            interface.main_menu()
+        finally:
+            spectator.close_broadcaster()
+        return 0
+    if args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+    try:
+        watch(args.address, args.port, args.seconds)
+    except OSError as e:
+        print(f"can't watch {args.address}:{args.port}: {e}")
+        return 1
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
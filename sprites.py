@@ -0,0 +1,82 @@
+"""
+Pre-rendered sprites and batched blitting for balls and paddles.
+
+pygame.draw.circle / draw.rect rasterize from scratch on every call, one
+Python call per object. Here the ball and each paddle size are rendered
+once, and a frame's balls and paddles go to the screen in a single
+Surface.blits() call (fblits where available), built straight from ball
+objects or from BallArray position arrays.
+"""
+import pygame
+
+from pong_game import WHITE, BALL_RADIUS
+
+_ball_sprite = None
+_paddle_sprites = {}
+
+
+def ball_sprite():
+    """The ball, drawn once: pixel-identical to draw.circle at the same centre."""
+    global _ball_sprite
+    if _ball_sprite is None:
+        size = BALL_RADIUS * 2
+        sprite = pygame.Surface((size, size))
+        sprite.fill((0, 0, 0))
+        pygame.draw.circle(sprite, WHITE, (BALL_RADIUS, BALL_RADIUS), BALL_RADIUS)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert()
+        # run-length encoded colorkey: roughly twice as fast to blit as a plain one
+        sprite.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        _ball_sprite = sprite
+    return _ball_sprite
+
+
+def paddle_sprite(width, height):
+    """Solid paddle of the given size; full-height boosts get their own entry."""
+    key = (width, height)
+    sprite = _paddle_sprites.get(key)
+    if sprite is None:
+        sprite = pygame.Surface(key)
+        sprite.fill(WHITE)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert()
+        sprite = _paddle_sprites[key] = sprite
+    return sprite
+
+
+def ball_batch(balls, alpha=1.0):
+    """(sprite, top-left) pairs for a list of Ball objects."""
+    sprite = ball_sprite()
+    return [(sprite, ball.draw_pos(alpha)) for ball in balls]
+
+
+def ball_array_batch(ball_array, alpha=1.0):
+    """(sprite, top-left) pairs straight from a BallArray's position arrays."""
+    sprite = ball_sprite()
+    xs, ys = ball_array.positions(alpha)
+    xs -= BALL_RADIUS
+    ys -= BALL_RADIUS
+    return [(sprite, pos) for pos in zip(xs.tolist(), ys.tolist())]
+
+
+def paddle_batch(paddles, alpha=1.0):
+    batch = []
+    for paddle in paddles:
+        x, y, w, h = paddle.draw_rect(alpha)
+        batch.append((paddle_sprite(w, h), (x, y)))
+    return batch
+
+
+def blit_batch(screen, batch, rects=True):
+    """
+    Draw every (surface, pos) pair in one call. Returns the drawn rects, or
+    [] when `rects` is False, which lets pygame-ce use the faster fblits.
+    """
+    if not rects:
+        fblits = getattr(screen, "fblits", None)
+        if fblits is not None:
+            fblits(batch)
+            return []
+        screen.blits(batch, doreturn=False)
+        return []
+    return screen.blits(batch)
@@ -0,0 +1,122 @@
+"""
+Cold-start report: where launch time goes before the first menu frame.
+
+Runs `python -X importtime -c "import interface"` and lists the slowest
+imports, then launches the menu in fresh interpreters and times
+process start -> first frame on screen (the first display flip), which
+is the number players feel.
+
+    python startup_report.py
+    python startup_report.py --runs 5 --max-ms 800 --json startup.json
+
+With --max-ms it exits non-zero when the median time to first frame is
+over budget. Set SDL_VIDEODRIVER=dummy to run it without a window.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Child process: open the menu, report the first flip, then close the window.
+FIRST_FRAME_PROBE = """
+import sys, time, pygame
+flip = pygame.display.flip
+def first_flip():
+    flip()
+    print("first_frame", time.perf_counter() - start, file=sys.stderr, flush=True)
+    pygame.display.flip = flip
+    pygame.event.post(pygame.event.Event(pygame.QUIT))
+start = time.perf_counter()
+pygame.display.flip = first_flip
+import interface
+print("imported", time.perf_counter() - start, file=sys.stderr, flush=True)
+interface.main_menu()
+"""
+
+
+def child_env():
+    env = dict(os.environ)
+    env.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    return env
+
+
+def import_times(module="interface"):
+    """[(name, self_us, cumulative_us, depth)] from -X importtime, in import order."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=HERE, env=child_env(), capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def first_frame(runs):
+    """Per run: (process launch -> first flip, time spent importing interface) in seconds."""
+    samples = []
+    for _ in range(runs):
+        launched = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, "-c", FIRST_FRAME_PROBE], cwd=HERE, env=child_env(),
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        imported = frame = None
+        for line in proc.stderr:
+            if line.startswith("imported"):
+                imported = float(line.split()[1])
+            elif line.startswith("first_frame"):
+                frame = time.perf_counter() - launched
+        proc.wait()
+        if frame is None:
+            raise RuntimeError("menu exited without drawing a frame")
+        samples.append((frame, imported))
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure import time and time to the first menu frame.")
+    parser.add_argument("--runs", type=int, default=3, help="cold launches to time")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--max-ms", type=float, help="fail if median time to first frame exceeds this")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    rows = import_times()
+    print(f"{'self ms':>9} {'total ms':>9}  module (slowest by cumulative time)")
+    for name, self_us, cumulative_us, _ in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {name}")
+    ours = {name: self_us for name, self_us, _, _ in rows
+            if os.path.exists(os.path.join(HERE, name + ".py"))}
+    print(f"game modules' own import time: {sum(ours.values()) / 1000:.1f} ms "
+          f"({', '.join(f'{n} {us / 1000:.1f}' for n, us in sorted(ours.items(), key=lambda kv: -kv[1]))})")
+
+    samples = first_frame(args.runs)
+    frame_ms = statistics.median(s[0] for s in samples) * 1000
+    import_ms = statistics.median(s[1] for s in samples) * 1000
+    print(f"time to first menu frame: {frame_ms:.0f} ms median of {args.runs} "
+          f"(import interface {import_ms:.0f} ms, rest is interpreter start, pygame, window and fonts)")
+
+    report = {
+        "first_frame_ms": frame_ms,
+        "import_ms": import_ms,
+        "runs": [{"first_frame_ms": f * 1000, "import_ms": i * 1000} for f, i in samples],
+        "game_module_self_us": ours,
+        "imports": [{"module": n, "self_us": s, "cumulative_us": c} for n, s, c, depth in rows if depth == 0],
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.max_ms is not None and frame_ms > args.max_ms:
+        print(f"over budget: {frame_ms:.0f} ms > {args.max_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
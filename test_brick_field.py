@@ -0,0 +1,97 @@
+"""
+BrickField contacts and bookkeeping.
+
+    python -m pytest -q test_brick_field.py
+"""
+import os
+import random
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from brick_field import BrickField
+from campaign import generate_brick_field
+from pong_game import Ball, BALL_RADIUS, BALL_SPEED, WIDTH, HEIGHT
+
+
+def ball_at(x, y, dx, dy):
+    ball = Ball(random.Random(0))
+    ball.x, ball.y, ball.dx, ball.dy = x, y, dx, dy
+    return ball
+
+
+def touching(field, ball):
+    """Alive bricks the ball's box overlaps, same box as BrickField.collide."""
+    left, top = int(ball.x - BALL_RADIUS), int(ball.y - BALL_RADIUS)
+    size = BALL_RADIUS * 2
+    return [i for i in field.indices()
+            if left < field.x[i] + field.w[i] and left + size > field.x[i]
+            and top < field.y[i] + field.h[i] and top + size > field.y[i]]
+
+
+def consistent(field):
+    alive = field.indices()
+    assert field.alive_count == len(field) == len(alive) == bin(field.alive).count("1")
+    for i in range(len(field.x)):
+        if field.indestructible[i]:
+            assert field.is_alive(i)
+        else:
+            assert field.is_alive(i) == (field.hits[i] > 0)
+
+
+def test_ball_across_a_column_seam_ends_clear():
+    field = BrickField()
+    field.add(400, 100, 20, 40, hits=2)
+    field.add(400, 140, 20, 40, hits=2)
+    ball = ball_at(390, 140, 5, 5)  # dead on the seam between the two bricks
+    assert touching(field, ball) == [0, 1]
+    assert field.collide(ball) == 1  # pushed out of the first, which clears the second too
+    assert touching(field, ball) == []
+    assert ball.dx < 0 and list(field.hits) == [1, 2]
+
+
+def test_ball_in_a_corner_hits_both_walls():
+    field = BrickField()
+    field.add(400, 100, 20, 80, indestructible=True)
+    field.add(340, 180, 80, 20, hits=1)
+    ball = ball_at(390, 170, 5, 5)
+    assert field.collide(ball) == 2
+    assert touching(field, ball) == []
+    assert ball.dx < 0 and ball.dy < 0
+    assert field.is_alive(0) and not field.is_alive(1)
+    assert field.take_changed() == [1] and field.take_changed() == []
+    consistent(field)
+
+
+def test_out_of_range_ball_touches_nothing():
+    field = BrickField()
+    field.add(400, 100, 20, 40)
+    ball = ball_at(100, 300, 5, 5)
+    assert field.collide(ball) == 0
+    assert (ball.x, ball.y, ball.dx, ball.dy) == (100, 300, 5, 5)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_counts_stay_consistent_under_play(seed):
+    rng = random.Random(seed)
+    field = generate_brick_field(6 + seed, rng=rng)
+    start_hits = list(field.hits)
+    consistent(field)
+    balls = [ball_at(rng.uniform(300, 600), rng.uniform(50, 550),
+                     rng.choice((-1, 1)) * BALL_SPEED, rng.uniform(-1, 1) * BALL_SPEED) for _ in range(4)]
+    contacts = damaged = 0
+    for _ in range(3000):
+        for ball in balls:
+            ball.x += ball.dx
+            ball.y += ball.dy
+            if not BALL_RADIUS <= ball.x <= WIDTH - BALL_RADIUS:
+                ball.dx = -ball.dx
+            if not BALL_RADIUS <= ball.y <= HEIGHT - BALL_RADIUS:
+                ball.dy = -ball.dy
+            contacts += field.collide(ball)
+        damaged += len(field.take_changed())
+        consistent(field)
+    assert 0 < damaged <= contacts  # contacts with walls do no damage
+    assert damaged == sum(start - left for start, left in zip(start_hits, field.hits))
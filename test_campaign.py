@@ -0,0 +1,48 @@
+"""
+Campaign stage prefetching.
+
+    python -m pytest -q test_campaign.py
+"""
+import os
+import threading
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import campaign
+from campaign import StagePrefetcher, build_stage
+
+
+def test_prefetched_stage_matches_a_direct_build():
+    stages = StagePrefetcher(7)
+    try:
+        stages.prefetch(3)
+        field = stages.take(3)
+    finally:
+        stages.close()
+    direct = build_stage(7, 3)
+    assert list(field.indices()) == list(direct.indices())
+    assert [(field.x[i], field.y[i], field.hits[i]) for i in field.indices()] == \
+           [(direct.x[i], direct.y[i], direct.hits[i]) for i in direct.indices()]
+
+
+def test_close_waits_for_the_running_build(monkeypatch):
+    started = threading.Event()
+    finished = []
+    real_build = campaign.build_stage
+
+    def slow_build(*args):
+        started.set()
+        time.sleep(0.05)  # still running when close() is called
+        finished.append(args[1])
+        return real_build(*args)
+
+    monkeypatch.setattr(campaign, "build_stage", slow_build)
+    stages = StagePrefetcher(1, ahead=3)
+    stages.prefetch(2)
+    futures = list(stages.pending.values())
+    assert started.wait(1)
+    stages.close()
+    assert all(future.done() for future in futures)  # nothing left running to read a closed pack
+    assert finished == [2]  # the queued builds were cancelled, not run
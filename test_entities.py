@@ -0,0 +1,82 @@
+"""
+Memory checks for the slotted entities and the ball pool.
+
+    python -m pytest -q test_entities.py
+"""
+import os
+import random
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import campaign
+from pong_game import Ball, BallPool, Paddle, WIDTH
+from simulation import Match, Inputs, PONG_MAX_BALLS
+from tournament import tracking_bot
+
+MAX_BYTES_PER_BALL = 200  # a slotted Ball measures ~160 B; a dict-backed one was ~240 B
+BALLS = 10000
+
+
+def traced_pong_game():
+    return tracemalloc.Filter(True, "*pong_game.py")
+
+
+def test_entities_have_no_dict():
+    for entity in (Ball(random.Random(1)), Paddle(0, 0), campaign.Brick(0, 0)):
+        assert not hasattr(entity, "__dict__"), type(entity).__name__
+
+
+def test_bytes_per_ball_bounded():
+    pool = BallPool(random.Random(1))
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces([traced_pong_game()])
+        balls = [pool.acquire() for _ in range(BALLS)]
+        after = tracemalloc.take_snapshot().filter_traces([traced_pong_game()])
+    finally:
+        tracemalloc.stop()
+    grown = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    assert len(balls) == BALLS
+    assert grown / BALLS < MAX_BYTES_PER_BALL
+
+
+def test_recycled_ball_allocates_nothing():
+    pool = BallPool(random.Random(1))
+    pool.release_all([pool.acquire() for _ in range(100)])
+    pool.release(pool.acquire())  # warm: the first serve of each ball may swap cached ints for new ones
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces([traced_pong_game()])
+        for _ in range(BALLS):
+            pool.release(pool.acquire())
+        after = tracemalloc.take_snapshot().filter_traces([traced_pong_game()])
+    finally:
+        tracemalloc.stop()
+    assert sum(stat.size_diff for stat in after.compare_to(before, "filename")) == 0
+
+
+def test_goals_and_rounds_reuse_balls():
+    match = Match("ai", seed=3, difficulty="Easy")
+    inputs = Inputs()
+    seen = set()
+    rounds = match.state.current_round
+    while not match.state.done and match.state.frame < 60000:
+        match.step(tracking_bot(match, inputs))
+        seen.update(map(id, match.balls))  # the pool keeps every ball alive, so ids are never reused
+    assert match.state.current_round > rounds  # goals, spawns and at least one round reset happened
+    assert len(seen) <= PONG_MAX_BALLS + 1
+
+
+def test_goal_swap_removes_the_scored_ball():
+    match = Match("pvp", seed=1)
+    pool = match.ball_pool
+    match.balls.extend(pool.acquire() for _ in range(4))
+    first, *middle, last = match.balls
+    first.x, first.dx = WIDTH + 1, 1  # scores this frame
+    match.step(Inputs())
+    assert match.balls[0] is last  # the last ball took its slot; nothing in between moved
+    assert match.balls[1:4] == middle
+    assert match.balls[4] is first  # recycled straight back as the fresh serve
+    assert match.state.left_score == 1
@@ -0,0 +1,76 @@
+"""
+The event-driven engine must end every run exactly where Match.step does.
+
+    python -m pytest -q test_event_engine.py
+"""
+import os
+import random
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from event_engine import EventEngine, MODES, fly, random_runs, repeat_add
+from pong_game import Ball
+from replay import state_hash
+from simulation import Match, Inputs
+
+FRAMES = 6000
+
+
+@pytest.mark.parametrize("v, d, n", [
+    (50.0, 5.0, 1000), (300.0, -3.7, 90), (0.1, 0.1, 10000), (-20.5, 0.3, 500), (1e15, 0.25, 64),
+])
+def test_repeat_add_rounds_like_a_loop(v, d, n):
+    expected = v
+    for _ in range(n):
+        expected += d
+    assert repeat_add(v, d, n) == expected
+
+
+def test_fly_matches_ball_move():
+    rng = random.Random(2)
+    for _ in range(50):
+        ball = Ball(rng)
+        ball.x, ball.y = rng.uniform(100, 700), rng.uniform(20, 580)
+        ball.dx, ball.dy = rng.uniform(-6, 6), rng.uniform(-9, 9)
+        frames = rng.randint(1, 400)
+        expected = fly(ball.x, ball.y, ball.dx, ball.dy, frames)
+        for _ in range(frames):
+            ball.move()
+        assert expected == (ball.x, ball.y, ball.dy)
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("seed", [1, 2])
+def test_same_state_as_stepping(mode, seed):
+    runs = random_runs(random.Random(seed), FRAMES, mode)
+    reference, fast = Match(mode, seed=seed), Match(mode, seed=seed)
+    engine = EventEngine(fast)
+    expected, got = [], []
+    inputs = Inputs()
+    for bits, length in runs:
+        inputs.set_bits(bits)
+        for _ in range(length):
+            state = reference.step(inputs)
+            if state.events:
+                expected.append((state.frame, tuple(state.events)))
+        engine.advance(inputs, length, lambda m: got.append((m.state.frame, tuple(m.state.events)))
+                       if m.state.events else None)
+        assert state_hash(fast) == state_hash(reference), f"differs at frame {reference.state.frame}"
+    assert got == expected
+    assert engine.jumped + engine.stepped == reference.state.frame
+    reference.close()
+    fast.close()
+
+
+def test_idle_pvp_jumps_most_frames():
+    engine = EventEngine(Match("pvp", seed=1))
+    engine.advance(Inputs(), FRAMES)
+    assert engine.jumped > engine.stepped  # open flight is jumped, contacts are stepped
+
+
+def test_chaos_is_refused():
+    with pytest.raises(ValueError):
+        EventEngine(Match("chaos", seed=1))
@@ -0,0 +1,94 @@
+"""
+Binary level packs: writing, reading and rejecting broken files.
+
+    python -m pytest -q test_level_pack.py
+"""
+import os
+import struct
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from campaign import build_stage
+from level_pack import HEADER, LevelPack, LevelPackError, write_pack
+
+LEVELS = [
+    [(100, 50, 1, False), (300, 120, 2, False), (500, 400, 1, True)],
+    [],
+    [(700, 10, 3, False)],
+]
+
+
+@pytest.fixture
+def pack_path(tmp_path):
+    path = str(tmp_path / "levels.pack")
+    assert write_pack(path, LEVELS, 20, 40) == len(LEVELS)
+    return path
+
+
+def test_round_trip(pack_path):
+    with LevelPack(pack_path) as pack:
+        assert len(pack) == 3
+        assert (pack.brick_width, pack.brick_height) == (20, 40)
+        assert [pack.records(i) for i in range(len(pack))] == LEVELS
+        field = pack.load(0)
+        assert len(field) == 3
+        assert field.rect(2).size == (20, 40) and field.indestructible[2]
+        with pytest.raises(IndexError):
+            pack.records(3)
+
+
+def test_generated_stage_round_trip(tmp_path):
+    path = str(tmp_path / "stages.pack")
+    stage = build_stage(7, 12)
+    write_pack(path, [stage])
+    with LevelPack(path) as pack:
+        loaded = pack.load(0)
+    fields = lambda f: [(f.x[i], f.y[i], f.w[i], f.h[i], f.hits[i], f.indestructible[i]) for i in f.indices()]
+    assert fields(loaded) == fields(stage)
+
+
+def rewrite(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("cut", [0, 1, 6, HEADER.size - 1])
+def test_short_header_rejected(pack_path, cut):
+    rewrite(pack_path, read(pack_path)[:cut])
+    with pytest.raises(LevelPackError, match="too short"):
+        LevelPack(pack_path)
+
+
+def test_truncated_records_rejected(pack_path):
+    rewrite(pack_path, read(pack_path)[:-1])
+    with pytest.raises(LevelPackError, match="truncated"):
+        LevelPack(pack_path)
+
+
+def test_bad_magic_rejected(pack_path):
+    rewrite(pack_path, b"NOPE" + read(pack_path)[4:])
+    with pytest.raises(LevelPackError, match="not a level pack"):
+        LevelPack(pack_path)
+
+
+def test_unknown_version_rejected(pack_path):
+    data = read(pack_path)
+    rewrite(pack_path, data[:4] + struct.pack("<H", 99) + data[6:])
+    with pytest.raises(LevelPackError, match="version"):
+        LevelPack(pack_path)
+
+
+def test_level_count_past_the_offsets_rejected(pack_path):
+    data = bytearray(read(pack_path))
+    struct.pack_into("<I", data, HEADER.size - 4, 1000)  # header claims far more levels than the file holds
+    rewrite(pack_path, bytes(data))
+    with pytest.raises(LevelPackError, match="truncated"):
+        LevelPack(pack_path)
@@ -0,0 +1,62 @@
+"""
+Replay encoding and verification.
+
+    python -m pytest -q test_replay.py
+"""
+import os
+import struct
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from replay import (MAGIC, MAX_RUN, ReplayError, decode, encode, load, playback, record_bot,
+                    verify, CHECKPOINT_TICKS)
+
+META = {"mode": "pvp", "seed": 5, "difficulty": "Medium", "stage": 1, "ai_profile": None,
+        "brick_tuning": None, "level_pack": None, "ball_collisions": False, "checkpoints": []}
+
+
+def test_encode_decode_round_trip():
+    keys = bytearray(b"\x00" * 10 + b"\x05" * 3 + b"\x02" + b"\x00" * (MAX_RUN + 7))  # one run longer than a u16
+    meta = dict(META, ticks=len(keys))
+    got_meta, got_keys = decode(encode(meta, keys))
+    assert got_meta == meta
+    assert got_keys == keys
+
+
+@pytest.mark.parametrize("mangle, message", [
+    (lambda data: b"XXXX" + data[4:], "not a replay"),
+    (lambda data: data[:4] + struct.pack("<H", 99) + data[6:], "version"),
+    (lambda data: data[:-8], "corrupt"),
+])
+def test_bad_files_are_rejected(mangle, message):
+    data = encode(dict(META, ticks=1), b"\x00")
+    assert data.startswith(MAGIC)
+    with pytest.raises(ReplayError, match=message):
+        decode(mangle(data))
+
+
+def test_tick_count_must_match_the_header():
+    with pytest.raises(ReplayError, match="ticks"):
+        decode(encode(dict(META, ticks=5), b"\x00" * 4))
+
+
+@pytest.mark.parametrize("mode", ["ai", "campaign"])
+def test_recorded_match_verifies(tmp_path, mode):
+    path = str(tmp_path / f"{mode}.pgr")
+    record_bot(path, mode, ticks=CHECKPOINT_TICKS * 3, seed=3)
+    meta, keys = load(path)
+    assert len(meta["checkpoints"]) == 3
+    assert verify(path)
+    assert verify(path, fast=True)
+
+
+def test_tampered_checkpoint_is_reported(tmp_path):
+    path = str(tmp_path / "ai.pgr")
+    record_bot(path, "ai", ticks=CHECKPOINT_TICKS * 2, seed=3)
+    meta, keys = load(path)
+    meta["checkpoints"][1][1] = "0" * 16
+    _, mismatch = playback(meta, keys)
+    assert mismatch == CHECKPOINT_TICKS * 2
@@ -0,0 +1,59 @@
+"""
+Tournament runner checks: sweep parsing, and the AI's calibrated save rates.
+
+    python -m pytest -q test_tournament.py
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import simulation
+from campaign import CAMPAIGN_AI, BRICK_TUNING
+from pong_game import AI_PROFILES
+from tournament import main, parse_sweep, play_pong, summarize
+
+# Easy's intended save rate against the tracking bot, as tuned with tournament.py.
+# With a single ball it was 82% before the AI cached its miss per prediction;
+# error=50 with the cache saves ~96% alone and ~62% in full multi-ball play.
+EASY_SINGLE_BALL = (0.76, 0.90)
+EASY_MULTI_BALL = (0.52, 0.60)
+
+
+def easy_save_rate(seeds):
+    results = [play_pong(seed, "Easy", AI_PROFILES["Easy"]) for seed in range(seeds)]
+    return summarize("pong", results)["ai_save_rate"]
+
+
+def test_sweep_values_take_the_defaults_type():
+    sweep = parse_sweep(["error=10,25", "smoothing=2"], AI_PROFILES["Medium"])
+    assert sweep == {"error": [10, 25], "smoothing": [2]}
+    assert all(type(v) is int for v in sweep["error"])
+    sweep = parse_sweep(["wall_step=0,0.04"], dict(CAMPAIGN_AI, **BRICK_TUNING))
+    assert sweep == {"wall_step": [0.0, 0.04]} and type(sweep["wall_step"][0]) is float
+
+
+@pytest.mark.parametrize("spec", ["error=12.5", "speed_offset=fast", "bogus=1", "error", "error="])
+def test_bad_sweeps_are_rejected(spec):
+    with pytest.raises(ValueError):
+        parse_sweep([spec], AI_PROFILES["Medium"])
+
+
+def test_cli_rejects_a_float_for_an_int_key(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(["pong", "--sweep", "error=12.5", "--matches", "1", "--workers", "1"])
+    assert exit_info.value.code == 2  # argparse usage error, before any worker starts
+    assert "error takes int values" in capsys.readouterr().err
+
+
+def test_easy_save_rate_single_ball(monkeypatch):
+    monkeypatch.setattr(simulation, "PONG_MAX_BALLS", 1)  # no spawns: every rally is one ball
+    low, high = EASY_SINGLE_BALL
+    assert low <= easy_save_rate(12) <= high
+
+
+def test_easy_save_rate_multi_ball():
+    low, high = EASY_MULTI_BALL
+    assert low <= easy_save_rate(12) <= high
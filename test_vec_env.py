@@ -0,0 +1,77 @@
+"""
+Rewards, auto-reset and seeding of the batched environment.
+
+    python -m pytest -q test_vec_env.py
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+np = pytest.importorskip("numpy")
+
+from pong_game import WIDTH
+from simulation import POINTS_TO_WIN_ROUND, ROUNDS_TO_WIN_GAME
+from vec_env import VecEnv, OBS_SIZE, UP
+
+
+def one_goal_from_the_end(env, i, agent_scores):
+    """Put instance i one goal away from the end of the game, with its ball about to cross a goal line."""
+    match = env.matches[i]
+    state = match.state
+    if agent_scores:
+        state.round_wins_left, state.left_score = ROUNDS_TO_WIN_GAME - 1, POINTS_TO_WIN_ROUND - 1
+    else:
+        state.round_wins_right, state.right_score = ROUNDS_TO_WIN_GAME - 1, POINTS_TO_WIN_ROUND - 1
+    ball = match.balls[0]
+    ball.x, ball.dx = (WIDTH + 1, 1) if agent_scores else (-1, -1)
+
+
+@pytest.mark.parametrize("agent_scores, reward", [(True, 2.0), (False, -2.0)])
+def test_final_reward_follows_the_winner(agent_scores, reward):
+    env = VecEnv(1, seed=3)
+    one_goal_from_the_end(env, 0, agent_scores)
+    _, rewards, dones = env.step(env.actions)
+    assert dones[0] and not env.truncated[0]
+    assert rewards[0] == reward  # the goal, then the win (or loss)
+    assert env.final_returns[0] == reward
+
+
+def test_finished_instance_resets_with_its_next_seed():
+    env = VecEnv(3, seed=10)
+    assert list(env.seeds) == [10, 11, 12]
+    one_goal_from_the_end(env, 1, agent_scores=True)
+    obs, _, dones = env.step(env.actions)
+    assert list(dones) == [False, True, False]
+    assert list(env.seeds) == [10, 11 + 3, 12]  # instance i's k-th episode plays seed + i + k * n
+    assert env.matches[1].state.frame == 0 and env.returns[1] == 0
+    assert not np.array_equal(env.final_obs[1], obs[1])  # the last frame of the old game
+
+
+def test_truncation_resets_without_a_terminal_reward():
+    env = VecEnv(2, seed=1, max_frames=5)
+    for _ in range(4):
+        env.step(env.actions)
+    _, rewards, dones = env.step(env.actions)
+    assert dones.all() and env.truncated.all()
+    assert (env.final_frames == 5).all()
+    assert (rewards == 0).all()
+
+
+def test_same_seed_same_trajectories():
+    actions = np.random.default_rng(0).integers(0, 8, size=(300, 4), dtype=np.int8)
+    runs = []
+    for _ in range(2):
+        env = VecEnv(4, seed=42, max_frames=120)
+        trace = [env.step(step)[0].copy() for step in actions]
+        runs.append(np.stack(trace))
+    assert runs[0].shape == (300, 4, OBS_SIZE)
+    assert np.array_equal(runs[0], runs[1])
+
+
+def test_step_writes_into_the_same_buffers():
+    env = VecEnv(2, seed=1)
+    obs, rewards, dones = env.step(np.full(2, UP, dtype=np.int8))
+    assert obs is env.obs and rewards is env.rewards and dones is env.dones
@@ -0,0 +1,96 @@
+"""
+Shared fonts and cached text rendering.
+
+Looking up a system font scans the installed fonts, and font.render
+rasterizes the whole string every call, so neither belongs in a frame loop.
+get_font() loads each (name, size, bold) once; render_text() keeps a bounded
+LRU of rendered surfaces keyed by (font, text, color); GlyphAtlas renders
+each digit once so a changing score is a handful of blits.
+"""
+from collections import OrderedDict
+
+import pygame
+
+TEXT_CACHE_SIZE = 256  # rendered strings kept; menus + HUD need a few dozen
+
+_fonts = {}
+_atlases = {}
+
+
+def get_font(name=None, size=36, bold=False):
+    """
+    Shared font. `name` None is pygame's default font (pygame.font.Font(None,
+    size)); anything else is looked up with SysFont, once.
+    """
+    key = (name, size, bold)
+    font = _fonts.get(key)
+    if font is None:
+        if name is None:
+            font = pygame.font.Font(None, size)
+            font.set_bold(bold)
+        else:
+            font = pygame.font.SysFont(name, size, bold=bold)
+        _fonts[key] = font
+    return font
+
+
+class TextCache:
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            return surface
+        surface = font.render(text, True, color)
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.entries.clear()
+
+
+_text_cache = TextCache()
+
+
+def render_text(font, text, color):
+    """font.render(text, True, color), served from the shared LRU cache."""
+    return _text_cache.render(font, text, color)
+
+
+class GlyphAtlas:
+    """Pre-rendered characters of one font and color, blitted side by side."""
+
+    def __init__(self, font, color, chars="0123456789 -:"):
+        self.glyphs = {ch: font.render(ch, True, color) for ch in chars}
+        self.height = font.get_height()
+
+    def width(self, text):
+        glyphs = self.glyphs
+        return sum(glyphs[ch].get_width() for ch in text)
+
+    def blit(self, screen, text, pos):
+        """Draw `text` (atlas characters only) at pos; returns the covered rect."""
+        x, y = pos
+        glyphs = self.glyphs
+        batch = []
+        for ch in text:
+            glyph = glyphs[ch]
+            batch.append((glyph, (x, y)))
+            x += glyph.get_width()
+        screen.blits(batch, doreturn=False)
+        return pygame.Rect(pos[0], y, x - pos[0], self.height)
+
+
+def get_atlas(font, color):
+    """Shared GlyphAtlas for a font/color pair."""
+    key = (font, color)
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = _atlases[key] = GlyphAtlas(font, color)
+    return atlas
@@ -0,0 +1,226 @@
+"""
+Headless tournament runner for AI and difficulty calibration.
+
+Plays thousands of seeded simulation.Match games across a process pool,
+sweeping the tuning tables (pong_game.AI_PROFILES, campaign.CAMPAIGN_AI,
+campaign.BRICK_TUNING) and reporting win rates, AI save rates, rally
+lengths, stage-clear times and throughput. The left paddle is driven by a
+simple tracking bot so every configuration faces the same opponent.
+
+    python tournament.py pong --matches 2000 --sweep error=10,25,50
+    python tournament.py campaign --stage 8 --matches 500 --sweep wall_step=0.01,0.02,0.04
+"""
+import argparse
+import itertools
+import json
+import os
+import statistics
+import time
+from multiprocessing import Pool
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from pong_game import AI_PROFILES, WIDTH, HEIGHT, FPS
+from campaign import CAMPAIGN_AI, BRICK_TUNING
+from simulation import Match, Inputs
+
+BOT_DEADZONE = 10            # px the tracking bot tolerates before moving
+MAX_FRAMES = FPS * 60 * 10   # give up on a match after 10 simulated minutes
+
+
+# ---------------------- Reference Bot ----------------------
+def tracking_bot(match, inputs):
+    """Left-paddle bot: follow the closest ball heading left, else re-centre."""
+    paddle = match.left_paddle
+    target_y = HEIGHT / 2
+    closest = None
+    for ball in match.balls:
+        if ball.dx < 0 and (closest is None or ball.x < closest.x):
+            closest = ball
+    if closest is not None:
+        target_y = closest.y
+    inputs.left_up = paddle.rect.centery > target_y + BOT_DEADZONE
+    inputs.left_down = paddle.rect.centery < target_y - BOT_DEADZONE
+    return inputs
+
+
+# ---------------------- Single Games ----------------------
+def play_pong(seed, difficulty, ai_profile, max_frames=MAX_FRAMES):
+    match = Match("ai", seed=seed, difficulty=difficulty, ai_profile=ai_profile)
+    inputs = Inputs()
+    rallies = []
+    hits = 0
+    incoming = set()  # ids of balls that were heading for the AI last frame
+    saves = conceded = 0
+    state = match.state
+    while not state.done and state.frame < max_frames:
+        state = match.step(tracking_bot(match, inputs))
+        for event in state.events:
+            if event == "hit":
+                hits += 1
+            elif event == "goal_left" or event == "goal_right":
+                rallies.append(hits)
+                hits = 0
+                conceded += event == "goal_left"
+        for ball in match.balls:
+            if ball.dx > 0:
+                incoming.add(id(ball))
+            elif id(ball) in incoming:
+                incoming.discard(id(ball))
+                saves += ball.x > WIDTH / 2  # turned back on the AI's side; a re-served ball starts on the left
+    return {
+        "ai_won": state.winner == "Right Player",
+        "finished": state.done,
+        "frames": state.frame,
+        "rallies": rallies,
+        "ai_saves": saves,
+        "ai_conceded": conceded,
+    }
+
+
+def play_campaign(seed, stage, ai_profile, brick_tuning, max_frames=MAX_FRAMES):
+    """Play one stage; it counts as cleared if the bot scores before losing every life."""
+    match = Match("campaign", seed=seed, stage=stage, ai_profile=ai_profile, brick_tuning=brick_tuning)
+    inputs = Inputs()
+    bricks_at_start = len(match.bricks)
+    state = match.state
+    cleared = False
+    lives = state.lives
+    while not state.done and state.frame < max_frames:
+        lives = state.lives  # clearing the stage resets lives for the next one
+        state = match.step(tracking_bot(match, inputs))
+        if "stage_clear" in state.events:
+            cleared = True
+            break
+    return {
+        "cleared": cleared,
+        "frames": state.frame,
+        "lives_left": lives if cleared else 0,
+        "bricks": bricks_at_start,
+    }
+
+
+def run_job(job):
+    kind, seed, params = job
+    if kind == "pong":
+        profile = dict(AI_PROFILES[params["difficulty"]])
+        profile.update({k: v for k, v in params.items() if k in profile})
+        return params, play_pong(seed, params["difficulty"], profile, params["max_frames"])
+    profile = dict(CAMPAIGN_AI)
+    profile.update({k: v for k, v in params.items() if k in profile})
+    tuning = dict(BRICK_TUNING)
+    tuning.update({k: v for k, v in params.items() if k in tuning})
+    return params, play_campaign(seed, params["stage"], profile, tuning, params["max_frames"])
+
+
+# ---------------------- Reporting ----------------------
+def summarize(kind, results):
+    if kind == "pong":
+        rallies = [r for res in results for r in res["rallies"]]
+        saves = sum(res["ai_saves"] for res in results)
+        conceded = sum(res["ai_conceded"] for res in results)
+        return {
+            "games": len(results),
+            "ai_win_rate": sum(res["ai_won"] for res in results) / len(results),
+            "unfinished": sum(not res["finished"] for res in results),
+            "ai_save_rate": saves / (saves + conceded) if saves + conceded else 0.0,
+            "mean_rally_hits": statistics.fmean(rallies) if rallies else 0.0,
+            "mean_match_s": statistics.fmean(res["frames"] for res in results) / FPS,
+        }
+    cleared = [res for res in results if res["cleared"]]
+    return {
+        "games": len(results),
+        "clear_rate": len(cleared) / len(results),
+        "mean_clear_s": statistics.fmean(res["frames"] for res in cleared) / FPS if cleared else None,
+        "mean_lives_left": statistics.fmean(res["lives_left"] for res in cleared) if cleared else None,
+        "mean_bricks": statistics.fmean(res["bricks"] for res in results),
+    }
+
+
+def parse_sweep(specs, defaults):
+    """
+    ["error=10,25", "smoothing=2,3"] -> {"error": [10, 25], "smoothing": [2, 3]}.
+    Each value takes the type of the key's default in `defaults` (the AI
+    profile ints can't be 12.5); a bad key or value raises ValueError.
+    """
+    sweep = {}
+    for spec in specs:
+        key, eq, values = spec.partition("=")
+        if not eq or not values:
+            raise ValueError(f"expected KEY=V1,V2,..., got {spec!r}")
+        if key not in defaults:
+            raise ValueError(f"unknown sweep key {key!r}; expected one of {sorted(defaults)}")
+        kind = type(defaults[key])
+        try:
+            sweep[key] = [kind(v) for v in values.split(",")]
+        except ValueError:
+            raise ValueError(f"{key} takes {kind.__name__} values, got {values!r}") from None
+    return sweep
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run seeded headless matches and sweep AI/stage tuning.")
+    parser.add_argument("kind", choices=("pong", "campaign"))
+    parser.add_argument("--matches", type=int, default=200, help="games per configuration")
+    parser.add_argument("--difficulty", default="Medium", choices=sorted(AI_PROFILES))
+    parser.add_argument("--stage", type=int, default=1, help="campaign stage to play")
+    parser.add_argument("--sweep", action="append", default=[], metavar="KEY=V1,V2",
+                        help="tuning key to sweep (AI profile or BRICK_TUNING key); repeatable")
+    parser.add_argument("--seed", type=int, default=0, help="first seed; game i uses seed + i")
+    parser.add_argument("--max-frames", type=int, default=MAX_FRAMES)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    base = {"max_frames": args.max_frames}
+    if args.kind == "pong":
+        base["difficulty"] = args.difficulty
+        defaults = AI_PROFILES[args.difficulty]
+    else:
+        base["stage"] = args.stage
+        defaults = dict(CAMPAIGN_AI, **BRICK_TUNING)
+    try:
+        sweep = parse_sweep(args.sweep, defaults)
+    except ValueError as e:
+        parser.error(str(e))  # before the pool starts: a bad value would kill every worker
+
+    keys = list(sweep)
+    configs = [dict(base, **dict(zip(keys, combo))) for combo in itertools.product(*sweep.values())]
+    jobs = [(args.kind, args.seed + i, config) for config in configs for i in range(args.matches)]
+
+    start = time.perf_counter()
+    grouped = {}
+    with Pool(args.workers) as pool:
+        for params, result in pool.imap_unordered(run_job, jobs, chunksize=max(1, len(jobs) // (args.workers * 8))):
+            grouped.setdefault(tuple(params[k] for k in keys), []).append(result)
+    elapsed = time.perf_counter() - start
+    cores = min(args.workers, os.cpu_count() or 1)
+
+    report = {"kind": args.kind, "base": base, "sweep_keys": keys, "configs": []}
+    for config in configs:
+        combo = tuple(config[k] for k in keys)
+        entry = dict(zip(keys, combo))
+        entry.update(summarize(args.kind, grouped[combo]))
+        report["configs"].append(entry)
+        print("  ".join(f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}" for k, v in entry.items()))
+
+    total_frames = sum(res["frames"] for results in grouped.values() for res in results)
+    report["throughput"] = {
+        "games": len(jobs),
+        "seconds": elapsed,
+        "workers": args.workers,
+        "cores": cores,
+        "games_per_sec_per_core": len(jobs) / elapsed / cores,
+        "frames_per_sec_per_core": total_frames / elapsed / cores,
+    }
+    t = report["throughput"]
+    print(f"{t['games']} games in {elapsed:.1f}s on {cores} cores: "
+          f"{t['games_per_sec_per_core']:.2f} games/s/core, {t['frames_per_sec_per_core']:.0f} frames/s/core")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Batched, headless environments for training and evaluating bots.
+
+VecEnv steps N independent simulation.Match instances in lockstep (the
+same Paddle / Ball / ai_move / brick rules the game plays by). The agent
+drives the left paddle; the right one is the built-in AI. Every step
+takes one action per instance and writes observations, rewards and done
+flags into arrays allocated once in __init__. step() returns those same
+arrays each time, so copy them if you need to keep them past the next
+step. Finished instances reset themselves with a fresh per-instance
+seed; the observation they ended on goes to final_obs.
+
+    env = VecEnv(64, mode="ai", seed=1)
+    obs = env.reset()
+    obs, rewards, dones = env.step(actions)   # actions: ints, see ACTIONS
+
+    python vec_env.py --envs 64 --steps 2000 --mode campaign
+
+Needs numpy, like chaos mode.
+"""
+import argparse
+import heapq
+import os
+import time
+from operator import attrgetter
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+try:
+    import numpy as np
+except ImportError:  # only the vector env needs it
+    np = None
+
+import campaign
+from pong_game import WIDTH, HEIGHT, BALL_SPEED, FPS, MAX_BALLS
+from simulation import Match, Inputs
+
+MODES = ("ai", "campaign")
+MAX_EPISODE_FRAMES = FPS * 60 * 5  # truncate an episode after 5 simulated minutes
+
+# action = bit mask of the left paddle's keys (same bits as Inputs.to_bits)
+UP, DOWN, BOOST = 1, 2, 4
+ACTIONS = 8
+
+# observation row: these fields, then OBS_BALLS balls nearest the agent's goal
+HEADER = ("left_y", "left_height", "right_y", "right_height", "boost_ready", "balls", "lives")
+BALL_FIELDS = ("x", "y", "dx", "dy")  # a missing ball is all zeros
+OBS_BALLS = 4
+OBS_SIZE = len(HEADER) + OBS_BALLS * len(BALL_FIELDS)
+
+REWARDS = {
+    "goal_left": 1.0,     # agent scored
+    "goal_right": -1.0,
+    "stage_clear": 1.0,
+    "life_lost": -1.0,
+}
+# on the final step, by state.winner: pong's "game_over" fires whoever won,
+# and a campaign only ends when the agent runs out of lives (winner None)
+WIN_REWARD = 1.0
+LOSS_REWARD = -1.0
+AGENT = "Left Player"
+
+ball_x = attrgetter("x")
+
+
+class VecEnv:
+    def __init__(self, n, mode="ai", seed=None, difficulty="Medium", stage=1, frame_skip=1,
+                 max_frames=MAX_EPISODE_FRAMES, ball_collisions=False):
+        if np is None:
+            raise ImportError("VecEnv needs numpy (pip install numpy)")
+        if mode not in MODES:
+            raise ValueError(f"unknown mode {mode!r}, expected one of {MODES}")
+        self.n = n
+        self.mode = mode
+        self.difficulty = difficulty
+        self.stage = stage
+        self.frame_skip = frame_skip
+        self.max_frames = max_frames
+        self.ball_collisions = ball_collisions
+        self.matches = [None] * n
+        self.inputs = [Inputs() for _ in range(n)]
+
+        # --- output buffers, reused by every step ---
+        self.actions = np.zeros(n, dtype=np.int8)
+        self.obs = np.zeros((n, OBS_SIZE), dtype=np.float32)
+        self.rewards = np.zeros(n, dtype=np.float32)
+        self.dones = np.zeros(n, dtype=np.bool_)
+        self.truncated = np.zeros(n, dtype=np.bool_)     # done because max_frames ran out, not the game
+        self.final_obs = np.zeros((n, OBS_SIZE), dtype=np.float32)  # valid where dones
+        self.returns = np.zeros(n, dtype=np.float32)     # running episode return
+        self.final_returns = np.zeros(n, dtype=np.float32)
+        self.final_frames = np.zeros(n, dtype=np.int32)
+        self.seeds = np.zeros(n, dtype=np.int64)         # seed of each instance's current episode
+        self.episodes = np.zeros(n, dtype=np.int64)
+        # flat memoryviews: scalar writes through them are much cheaper than numpy item assignment
+        self._actions = memoryview(self.actions)
+        self._obs = memoryview(self.obs).cast("B").cast("f")
+        self._final_obs = memoryview(self.final_obs).cast("B").cast("f")
+        self._rewards = memoryview(self.rewards)
+        self._dones = memoryview(self.dones).cast("B")
+        self._truncated = memoryview(self.truncated).cast("B")
+        self.base_seed = 0
+        self.reset(seed)
+
+    # ----- Episodes -----
+    def reset(self, seed=None):
+        """Start every instance over. Instance i's k-th episode plays seed + i + k * n."""
+        self.base_seed = seed if seed is not None else int.from_bytes(os.urandom(7), "little")
+        self.episodes[:] = 0
+        self.returns[:] = 0
+        for i in range(self.n):
+            self._reset_instance(i)
+            self._observe(i, self._obs)
+        return self.obs
+
+    def _reset_instance(self, i):
+        seed = self.base_seed + i + int(self.episodes[i]) * self.n
+        self.episodes[i] += 1
+        self.seeds[i] = seed
+        old = self.matches[i]
+        if old is not None:
+            old.close()
+        if self.mode == "campaign":
+            self.matches[i] = Match("campaign", seed=seed, stage=self.stage, ball_collisions=self.ball_collisions)
+        else:
+            self.matches[i] = Match("ai", seed=seed, difficulty=self.difficulty, ball_collisions=self.ball_collisions)
+
+    def close(self):
+        for match in self.matches:
+            if match is not None:
+                match.close()
+
+    # ----- Stepping -----
+    def step(self, actions):
+        """
+        Advance every instance by frame_skip frames with its action held,
+        and return (obs, rewards, dones). An instance that finishes is
+        reset right away: its row in obs is the new episode's first
+        observation, and final_obs / final_returns / final_frames /
+        truncated describe the one that just ended.
+        """
+        if actions is not self.actions:
+            self.actions[:] = actions
+        acts = self._actions
+        rewards = self._rewards
+        dones = self._dones
+        truncated = self._truncated
+        returns = self.returns
+        max_frames = self.max_frames
+        for i in range(self.n):
+            match = self.matches[i]
+            inputs = self.inputs[i]
+            bits = acts[i]
+            inputs.left_up = bits & UP
+            inputs.left_down = bits & DOWN
+            inputs.left_boost = bits & BOOST
+            reward = 0.0
+            for _ in range(self.frame_skip):
+                state = match.step(inputs)
+                for event in state.events:
+                    reward += REWARDS.get(event, 0.0)
+                if state.done:
+                    reward += WIN_REWARD if state.winner == AGENT else LOSS_REWARD
+                    break
+            rewards[i] = reward
+            returns[i] += reward
+            cut = not state.done and state.frame >= max_frames
+            truncated[i] = cut
+            dones[i] = state.done or cut
+            if dones[i]:
+                self._observe(i, self._final_obs)
+                self.final_returns[i] = returns[i]
+                self.final_frames[i] = state.frame
+                returns[i] = 0.0
+                self._reset_instance(i)
+            self._observe(i, self._obs)
+        return self.obs, self.rewards, self.dones
+
+    def _observe(self, i, out):
+        """Write instance i's observation row into the flat float view `out`."""
+        match = self.matches[i]
+        base = i * OBS_SIZE
+        left = match.left_paddle
+        right = match.right_paddle
+        out[base] = left.rect.centery / HEIGHT
+        out[base + 1] = left.rect.height / HEIGHT
+        out[base + 2] = right.rect.centery / HEIGHT
+        out[base + 3] = right.rect.height / HEIGHT
+        out[base + 4] = not left.full_height_active and left.cooldown_timer <= 0
+        balls = match.balls
+        out[base + 5] = len(balls) / MAX_BALLS
+        out[base + 6] = match.state.lives / campaign.LIVES_PER_STAGE if self.mode == "campaign" else 0.0
+        if len(balls) > OBS_BALLS:
+            balls = heapq.nsmallest(OBS_BALLS, balls, key=ball_x)
+        j = base + len(HEADER)
+        for ball in balls:
+            out[j] = ball.x / WIDTH
+            out[j + 1] = ball.y / HEIGHT
+            out[j + 2] = ball.dx / BALL_SPEED
+            out[j + 3] = ball.dy / BALL_SPEED
+            j += 4
+        end = base + OBS_SIZE
+        while j < end:
+            out[j] = 0.0
+            j += 1
+
+
+# ---------------------- Throughput ----------------------
+def measure(n=64, steps=2000, mode="ai", seed=1, frame_skip=1):
+    """Env-steps per second of one VecEnv on one core, under a random policy."""
+    env = VecEnv(n, mode=mode, seed=seed, frame_skip=frame_skip)
+    policy = np.random.default_rng(seed).integers(0, ACTIONS, size=(steps, n), dtype=np.int8)
+    episodes = 0
+    start = time.perf_counter()
+    for t in range(steps):
+        env.step(policy[t])
+        episodes += int(env.dones.sum())
+    elapsed = time.perf_counter() - start
+    env.close()
+    return {"env_steps_per_s": n * steps / elapsed, "frames_per_s": n * steps * frame_skip / elapsed,
+            "episodes": episodes}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure VecEnv throughput (env-steps/sec on one core).")
+    parser.add_argument("--envs", type=int, default=64)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--mode", choices=MODES, default="ai")
+    parser.add_argument("--frame-skip", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    result = measure(args.envs, args.steps, args.mode, args.seed, args.frame_skip)
+    print(f"{args.mode}: {args.envs} envs x {args.steps} steps: {result['env_steps_per_s']:.0f} env-steps/s "
+          f"({result['frames_per_s']:.0f} frames/s) per core, {result['episodes']} episodes finished")
+    return 0
+
+
+if __name__ == "__main__":
+    main()